@@ -1,18 +1,64 @@
 import os
 import json
+import time
 import argparse
 import logging
-from openai import OpenAI
-from dotenv import load_dotenv
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from core.encoding import TrackHandles, encode_tool_result
+from core.history import ConversationHistory
+from core.intents import match_control_intent
 from core.logger import log_execution, SpotifyLogger
+from core.metrics import get_metrics, start_metrics_dump, start_metrics_server
+from core.streaming import collect_stream
+from core.tracing import TRACE_PATH, bind_context, get_tracer
 
 # Import function schemas and tools
 from schemas.function_schemas import TOOL_SCHEMAS
-from function_tools.search_songs import search_songs
-from function_tools.play_song import play_song
-from function_tools.player_controls import player_controls
-from function_tools.get_songs import get_songs
-from function_tools.web_search import web_search
+from function_tools.registry import TOOLS
+
+MODEL = "gpt-4o-mini"
+DEFAULT_MAX_STEPS = 6  # Model completions that may request tools in one turn
+DEFAULT_TURN_TIMEOUT = 60.0  # Wall-clock budget for one user turn (seconds)
+DEFAULT_HISTORY_BUDGET = 6000  # Estimated prompt tokens kept in the history
+
+SYSTEM_PROMPT = (
+    "You are a helpful Spotify assistant. You can search for songs, play music, control playback, access liked songs, and search the web. "
+    "Keep responses extremely brief (1-2 short sentences max). Use a casual, friendly tone. "
+    "IMPORTANT BEHAVIORS:\n"
+    "1. For web search results:\n"
+    "   - After getting web search results, IMMEDIATELY:\n"
+    "     * For festivals/concerts: Extract headlining artists and search their songs\n"
+    "     * For artist info: Search their top songs\n"
+    "   - Don't wait for user confirmation, proceed directly to search_songs\n"
+    "2. When searching songs:\n"
+    "   - Show search results to user with artist names\n"
+    "   - When user wants to play music, automatically play top result\n"
+    "3. For multi-step interactions:\n"
+    "   - Always complete the full flow (e.g., web_search → search_songs → play_song)\n"
+    "   - Don't stop after intermediate steps\n"
+    "IMPORTANT SEARCH AND PLAY BEHAVIOR:\n"
+    "1. When user requests a SPECIFIC song:\n"
+    "   - ALWAYS include both song title AND artist in query\n"
+    "   - From search results, select the exact song user requested\n"
+    "   - Consider both song name match and popularity\n"
+    "   - Examples:\n"
+    "     * For 'play never gonna give you up' → search 'never gonna give you up Rick Astley', pick the original song\n"
+    "     * For 'play bohemian rhapsody' → search 'bohemian rhapsody Queen', pick Bohemian Rhapsody (not other Queen songs)\n"
+    "     * For 'play thriller' → search 'thriller Michael Jackson', pick the original Thriller\n"
+    "2. When user wants to BROWSE or DISCOVER music:\n"
+    "   - Results are already sorted by popularity\n"
+    "   - Show users multiple options with artist names\n"
+    "   - Example: 'find me some rock songs' or 'search for dance music'\n"
+    "Always complete the play_song step after searching if the user wants to play music.\n"
+    "When searching without playing, list artist and song names in results. "
+    "When user asks about favorite songs, liked songs, top songs, or music collection - use get_songs. "
+    "For questions about current music events, festivals, or artists - use web_search to get current information, ALWAYS show the search results to the user, "
+    "then offer to play music from discovered artists if relevant. Use search_songs and play_song when the user wants to play music from search results. "
+    "Avoid unnecessary explanations, greetings, or verbose descriptions.\n"
+    "Tool results list items as tables ({columns, rows}). Track ids are short handles like 't12'; "
+    "pass them to play_song exactly as given."
+)
 
 
 def parse_args():
@@ -24,62 +70,438 @@ def parse_args():
         default="ERROR",
         help="Set the logging level (default: ERROR)",
     )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=DEFAULT_MAX_STEPS,
+        help=f"Maximum tool-calling steps per turn (default: {DEFAULT_MAX_STEPS})",
+    )
+    parser.add_argument(
+        "--history-budget",
+        type=int,
+        default=DEFAULT_HISTORY_BUDGET,
+        help=f"Token budget for the conversation history (default: {DEFAULT_HISTORY_BUDGET})",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for complete model responses instead of streaming them",
+    )
+    parser.add_argument(
+        "--no-fast-path",
+        action="store_true",
+        help="Send simple playback commands (pause, skip, ...) to the model too",
+    )
+    parser.add_argument(
+        "--track-playback",
+        action="store_true",
+        help="Poll playback state in the background so controls skip the state read",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Write a JSON metrics snapshot to this file every 30s and on exit",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const=TRACE_PATH,
+        metavar="FILE",
+        help=f"Record per-turn traces as JSON lines (default file: {os.path.relpath(TRACE_PATH)}); "
+        "view them with python -m core.tracing",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report the import time of each module at startup and exit",
+    )
+    parser.add_argument(
+        "--turn-timeout",
+        type=float,
+        default=DEFAULT_TURN_TIMEOUT,
+        help=f"Wall-clock limit per turn in seconds (default: {DEFAULT_TURN_TIMEOUT:.0f})",
+    )
     return parser.parse_args()
 
 
 # Initialize logging
 logger = SpotifyLogger.get_logger()
 
-# Load environment variables
-load_dotenv()
+# OpenAI client, created on first use (importing openai takes ~0.5s)
+_openai_client = None
+_openai_lock = threading.Lock()
 
-# Initialize OpenAI client
-client = OpenAI()
+# Shared pool for running the tool calls of one model response concurrently
+tool_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool")
 
+# Short handles the model sees in place of Spotify track IDs
+track_handles = TrackHandles()
 
-@log_execution
-def handle_conversation():
-    """Main conversation loop for Spotify Assistant"""
-    messages = [
+
+def get_openai_client():
+    """Get the shared OpenAI client, importing openai and creating it on first use"""
+    global _openai_client
+    if _openai_client is None:
+        with _openai_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+
+                _openai_client = OpenAI()
+    return _openai_client
+
+
+def _warm_up_openai():
+    """Create the OpenAI client in the background while the user types"""
+    try:
+        get_openai_client()
+    except Exception as e:
+        logger.warning(f"Could not create the OpenAI client: {str(e)}")
+
+
+def execute_tool_call(tool_call):
+    """
+    Run a single tool call requested by the model
+
+    Args:
+        tool_call: Tool call object from the OpenAI response
+
+    Returns:
+        dict: Tool result, or an error dict if the call couldn't be run
+    """
+    function_name = tool_call.function.name
+    start = time.perf_counter()
+    with get_tracer().span(f"tool {function_name}") as span:
+        try:
+            arguments = json.loads(tool_call.function.arguments or "{}")
+            if "track_id" in arguments:
+                arguments["track_id"] = track_handles.resolve(arguments["track_id"])
+            logger.debug("Function call: %s with args: %s", function_name, arguments)
+
+            function = TOOLS.get(function_name)
+            if function is None:
+                logger.error(f"Unknown tool requested: {function_name}")
+                return {"success": False, "message": f"Unknown tool: {function_name}"}
+
+            result = function(**arguments)
+            # Formatted (and truncated) on the log thread, only if DEBUG is on
+            logger.debug("Function result: %s", result)
+        except Exception as e:
+            logger.error(f"Error running tool {function_name}: {str(e)}", exc_info=True)
+            result = {
+                "success": False,
+                "message": f"Error running {function_name}: {str(e)}",
+            }
+        if span is not None and isinstance(result, dict):
+            span.set("success", result.get("success"))
+
+    metrics = get_metrics()
+    metrics.observe(
+        "tool_duration_seconds", time.perf_counter() - start, tool=function_name
+    )
+    if isinstance(result, dict) and result.get("success") is False:
+        metrics.increment("tool_errors_total", tool=function_name)
+    return result
+
+
+def _print_progress(tool_calls, shown=None):
+    """Print each tool's progress line once, even if it is called several times"""
+    shown = set() if shown is None else shown
+    for tool_call in tool_calls:
+        name = tool_call.function.name
+        progress = TOOLS.progress(name)
+        if progress and name not in shown:
+            shown.add(name)
+            print(f"\n{progress}")
+
+
+def collect_tool_results(tool_calls, futures, deadline=None):
+    """
+    Wait for started tool calls, giving up on those still running at the deadline
+
+    Args:
+        tool_calls: Tool call objects, in the same order as futures
+        futures: Futures of the running tool calls
+        deadline (float): time.monotonic() value to stop waiting at (optional)
+
+    Returns:
+        list: Results in call order; tools that didn't finish in time get an
+              error result
+    """
+    results = []
+    for tool_call, future in zip(tool_calls, futures):
+        timeout = None
+        if deadline is not None:
+            timeout = max(0.0, deadline - time.monotonic())
+        try:
+            results.append(future.result(timeout=timeout))
+        except FutureTimeout:
+            function_name = tool_call.function.name
+            future.cancel()  # Only helps if it hasn't started yet
+            logger.warning(f"Tool {function_name} didn't finish before the deadline")
+            get_metrics().increment("tool_errors_total", tool=function_name)
+            results.append(
+                {
+                    "success": False,
+                    "message": f"{function_name} timed out before finishing",
+                }
+            )
+    return results
+
+
+def execute_tool_calls(tool_calls, deadline=None):
+    """
+    Run all tool calls from one model response at the same time
+
+    Args:
+        tool_calls: Tool call objects from the OpenAI response
+        deadline (float): time.monotonic() value after which unfinished tools
+                          are reported as timed out (optional)
+
+    Returns:
+        list: Results in the same order as tool_calls
+    """
+    _print_progress(tool_calls)
+
+    if len(tool_calls) == 1 and deadline is None:
+        return [execute_tool_call(tool_calls[0])]
+
+    logger.info(f"Running {len(tool_calls)} tool calls concurrently")
+    futures = [
+        tool_executor.submit(bind_context(execute_tool_call), tool_call)
+        for tool_call in tool_calls
+    ]
+    return collect_tool_results(tool_calls, futures, deadline)
+
+
+def request_completion(messages, timeout, use_tools=True, stream=False, on_text=None):
+    """
+    Request one chat completion, optionally streaming it
+
+    When streaming, text deltas go to on_text as they arrive and each tool
+    call is started on the tool pool as soon as its arguments are complete.
+
+    Args:
+        messages (list): Conversation history
+        timeout (float): Request timeout in seconds
+        use_tools (bool): Whether the model may call tools
+        stream (bool): Whether to stream the response
+        on_text (callable): Called with each text delta when streaming
+
+    Returns:
+        tuple: (assistant_message, futures) where futures holds the already
+               started tool calls in order, or None when not streaming
+    """
+    kwargs = {"model": MODEL, "messages": messages, "timeout": timeout}
+    if use_tools:
+        kwargs["tools"] = TOOL_SCHEMAS
+
+    timer = get_metrics().timer(
+        "openai_completion_seconds",
+        error_counter="openai_completion_errors_total",
+        model=MODEL,
+        stream=stream,
+    )
+    span = get_tracer().span("openai completion", stream=stream, tools=use_tools)
+    if not stream:
+        with span, timer:
+            response = get_openai_client().chat.completions.create(**kwargs)
+        return response.choices[0].message, None
+
+    futures = []
+    shown = set()
+
+    def start_tool_call(tool_call):
+        _print_progress([tool_call], shown)
+        futures.append(tool_executor.submit(bind_context(execute_tool_call), tool_call))
+
+    # Timed until the last chunk, not just until the first one arrives
+    with span, timer:
+        chunks = get_openai_client().chat.completions.create(stream=True, **kwargs)
+        message = collect_stream(chunks, on_text=on_text, on_tool_call=start_tool_call)
+    return message, futures
+
+
+def run_tool_calls(messages, assistant_message, futures=None, deadline=None):
+    """
+    Record the assistant's tool calls, run them and append their results
+
+    Args:
+        messages (list): Conversation history, extended in place
+        assistant_message: OpenAI message containing tool_calls
+        futures (list): Already started tool calls, in order (optional)
+        deadline (float): time.monotonic() value to stop waiting for tools at
+
+    Returns:
+        list: (function_name, result) pairs in call order
+    """
+    tool_calls = assistant_message.tool_calls
+    logger.info(
+        f"Assistant requesting to use tools: {', '.join(tc.function.name for tc in tool_calls)}"
+    )
+
+    # Add assistant's message with its tool calls to the conversation
+    messages.append(
         {
-            "role": "system",
-            "content": (
-                "You are a helpful Spotify assistant. You can search for songs, play music, control playback, access liked songs, and search the web. "
-                "Keep responses extremely brief (1-2 short sentences max). Use a casual, friendly tone. "
-                "IMPORTANT BEHAVIORS:\n"
-                "1. For web search results:\n"
-                "   - After getting web search results, IMMEDIATELY:\n"
-                "     * For festivals/concerts: Extract headlining artists and search their songs\n"
-                "     * For artist info: Search their top songs\n"
-                "   - Don't wait for user confirmation, proceed directly to search_songs\n"
-                "2. When searching songs:\n"
-                "   - Show search results to user with artist names\n"
-                "   - When user wants to play music, automatically play top result\n"
-                "3. For multi-step interactions:\n"
-                "   - Always complete the full flow (e.g., web_search → search_songs → play_song)\n"
-                "   - Don't stop after intermediate steps\n"
-                "IMPORTANT SEARCH AND PLAY BEHAVIOR:\n"
-                "1. When user requests a SPECIFIC song:\n"
-                "   - ALWAYS include both song title AND artist in query\n"
-                "   - From search results, select the exact song user requested\n"
-                "   - Consider both song name match and popularity\n"
-                "   - Examples:\n"
-                "     * For 'play never gonna give you up' → search 'never gonna give you up Rick Astley', pick the original song\n"
-                "     * For 'play bohemian rhapsody' → search 'bohemian rhapsody Queen', pick Bohemian Rhapsody (not other Queen songs)\n"
-                "     * For 'play thriller' → search 'thriller Michael Jackson', pick the original Thriller\n"
-                "2. When user wants to BROWSE or DISCOVER music:\n"
-                "   - Results are already sorted by popularity\n"
-                "   - Show users multiple options with artist names\n"
-                "   - Example: 'find me some rock songs' or 'search for dance music'\n"
-                "Always complete the play_song step after searching if the user wants to play music.\n"
-                "When searching without playing, list artist and song names in results. "
-                "When user asks about favorite songs, liked songs, top songs, or music collection - use get_songs. "
-                "For questions about current music events, festivals, or artists - use web_search to get current information, ALWAYS show the search results to the user, "
-                "then offer to play music from discovered artists if relevant. Use search_songs and play_song when the user wants to play music from search results. "
-                "Avoid unnecessary explanations, greetings, or verbose descriptions."
-            ),
+            "role": "assistant",
+            "content": assistant_message.content or "",
+            "tool_calls": [
+                {
+                    "id": tool_call.id,
+                    "type": tool_call.type,
+                    "function": {
+                        "name": tool_call.function.name,
+                        "arguments": tool_call.function.arguments,
+                    },
+                }
+                for tool_call in tool_calls
+            ],
         }
-    ]
+    )
+
+    if futures is not None:
+        results = collect_tool_results(tool_calls, futures, deadline)
+    else:
+        results = execute_tool_calls(tool_calls, deadline)
+
+    # Always send a response for every tool call, in call order
+    for tool_call, result in zip(tool_calls, results):
+        if tool_call.function.name == "web_search":
+            if result.get("success") and result.get("results"):
+                print("\nSearch Results:")
+                for idx, item in enumerate(result["results"], 1):
+                    print(f"\n{idx}. {item['title']}")
+                    print(f"   {item['snippet']}")
+
+        messages.append(
+            {
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "content": encode_tool_result(result, track_handles),
+            }
+        )
+
+    return [(tc.function.name, result) for tc, result in zip(tool_calls, results)]
+
+
+def run_turn(
+    messages,
+    user_input,
+    max_steps=DEFAULT_MAX_STEPS,
+    timeout=DEFAULT_TURN_TIMEOUT,
+    stream=False,
+    on_text=None,
+    fast_path=True,
+):
+    """
+    Handle one user turn: let the model call tools until it answers.
+
+    The model may chain any number of tool calls (e.g. web_search →
+    search_songs → play_song) up to max_steps completions. Once the steps
+    run out the model is asked to answer without tools; once the deadline
+    passes no further completions are requested and tools still running
+    are reported to the model as timed out.
+
+    Simple playback commands ("pause", "skip this song", ...) are matched
+    locally and run player_controls directly without any completion.
+
+    Args:
+        messages (list): Conversation history, extended in place
+        user_input (str): The user's message
+        max_steps (int): Maximum completions that may request tools
+        timeout (float): Wall-clock budget for the whole turn in seconds
+        stream (bool): Stream completions and start tools as they arrive
+        on_text (callable): Called as on_text(delta, first) for streamed text,
+                            where first marks the start of a new message
+        fast_path (bool): Handle simple playback commands without the model
+
+    Returns:
+        tuple: (final_message, function_name, result) where function_name and
+               result belong to the last tool call made, or None
+    """
+    with get_tracer().span("turn", new_trace=True, user_input=user_input[:200]):
+        deadline = time.monotonic() + timeout
+        messages.append({"role": "user", "content": user_input})
+        logger.debug(f"Received user input: {user_input}")
+
+        action = match_control_intent(user_input) if fast_path else None
+        if action:
+            logger.info(f"Handling '{user_input}' locally as player_controls({action})")
+            with get_tracer().span("tool player_controls", fast_path=True):
+                result = TOOLS.get("player_controls")(action=action)
+            final_message = result.get("message", "")
+            messages.append({"role": "assistant", "content": final_message})
+            return final_message, "player_controls", result
+
+        def text_handler():
+            """Wrap on_text so it knows where each streamed message starts"""
+            if on_text is None:
+                return None
+            started = []
+
+            def handle(delta):
+                on_text(delta, not started)
+                started.append(True)
+
+            return handle
+
+        function_name, result = None, None
+        final_message = None
+        for step in range(max_steps):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Turn deadline reached after {step} steps")
+                break
+
+            logger.debug(f"Sending request to OpenAI (step {step + 1}/{max_steps})")
+            assistant_message, futures = request_completion(
+                messages, remaining, stream=stream, on_text=text_handler()
+            )
+
+            if not assistant_message.tool_calls:
+                final_message = assistant_message.content or ""
+                break
+
+            tool_results = run_tool_calls(
+                messages, assistant_message, futures, deadline
+            )
+            function_name, result = tool_results[-1]
+        else:
+            # Out of steps: ask for an answer based on what the tools returned
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                logger.warning(f"Reached {max_steps} steps, requesting a final answer")
+                assistant_message, _ = request_completion(
+                    messages,
+                    remaining,
+                    use_tools=False,
+                    stream=stream,
+                    on_text=text_handler(),
+                )
+                final_message = assistant_message.content or ""
+
+        if final_message is None:
+            final_message = (result or {}).get("message", "")
+
+        logger.info(f"Assistant response: {final_message}")
+        messages.append({"role": "assistant", "content": final_message})
+        return final_message, function_name, result
+
+
+@log_execution
+def handle_conversation(
+    max_steps=DEFAULT_MAX_STEPS,
+    turn_timeout=DEFAULT_TURN_TIMEOUT,
+    stream=True,
+    history_budget=DEFAULT_HISTORY_BUDGET,
+    fast_path=True,
+):
+    """Main conversation loop for Spotify Assistant"""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    history = ConversationHistory(token_budget=history_budget)
 
     # Check if SERPAPI_KEY is set
     if not os.getenv("SERPAPI_KEY"):
@@ -100,229 +522,42 @@ def handle_conversation():
             print("\nGoodbye! Enjoy your music! 🎵")
             break
 
-        # Add user message to conversation
-        messages.append({"role": "user", "content": user_input})
-        logger.debug(f"Received user input: {user_input}")
+        # Print streamed text as it arrives, one line per model message
+        streamed = []  # Deltas of each streamed message
+
+        def print_text(delta, first):
+            if first:
+                print(f"{chr(10) if streamed else ''}🎵 Assistant: ", end="")
+                streamed.append([])
+            print(delta, end="", flush=True)
+            streamed[-1].append(delta)
 
         try:
-            # Get response from OpenAI with our tools
-            logger.debug("Sending request to OpenAI")
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                tools=TOOL_SCHEMAS,
+            # Keep the prompt size flat as the session grows
+            history.compact(messages)
+
+            final_message, function_name, result = run_turn(
+                messages,
+                user_input,
+                max_steps=max_steps,
+                timeout=turn_timeout,
+                stream=stream,
+                on_text=print_text,
+                fast_path=fast_path,
             )
 
-            # Get the assistant's response
-            assistant_message = response.choices[0].message
-            logger.debug("Received response from OpenAI")
-
-            # Check if the model wants to use a tool
-            tool_call = None
-            if assistant_message.tool_calls:
-                tool_call = assistant_message.tool_calls[0]
-                logger.info(
-                    f"Assistant requesting to use tool: {tool_call.function.name}"
-                )
-
-                # Add assistant's message with tool call to the conversation
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": assistant_message.content or "",
-                        "tool_calls": [
-                            {
-                                "id": tool_call.id,
-                                "type": tool_call.type,
-                                "function": {
-                                    "name": tool_call.function.name,
-                                    "arguments": tool_call.function.arguments,
-                                },
-                            }
-                        ],
-                    }
-                )
-
-                # Handle function tools
-                if tool_call.type == "function":
-                    # Parse arguments
-                    function_name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
-                    logger.debug(
-                        f"Function call: {function_name} with args: {arguments}"
-                    )
-
-                    # Execute the appropriate function
-                    result = None
-                    if function_name == "search_songs":
-                        print(f"\n🔍 Searching for songs...")
-                        result = search_songs(**arguments)
-                    elif function_name == "get_songs":
-                        print(f"\n🎵 Fetching your music collection...")
-                        result = get_songs(**arguments)
-                    elif function_name == "play_song":
-                        print(f"\n▶️ Playing music...")
-                        result = play_song(**arguments)
-                    elif function_name == "player_controls":
-                        print(f"\n⏯️ Controlling playback...")
-                        result = player_controls(**arguments)
-                    elif function_name == "web_search":
-                        print(f"\n🌍 Searching the web...")
-                        result = web_search(**arguments)
-                        if result.get("success") and result.get("results"):
-                            print("\nSearch Results:")
-                            for idx, item in enumerate(result["results"], 1):
-                                print(f"\n{idx}. {item['title']}")
-                                print(f"   {item['snippet']}")
-
-                    logger.debug(f"Function result: {result}")
-
-                    # Always send a response for the tool call
-                    result_str = (
-                        json.dumps(result)
-                        if result
-                        else json.dumps({"error": "No result"})
-                    )
-                    messages.append(
-                        {
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "content": result_str,
-                        }
-                    )
-
-                # Get the final response with the function result
-                logger.debug("Getting final response from OpenAI")
-                final_response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=messages,
-                    tools=TOOL_SCHEMAS,
-                )
-
-                # Check if another tool call is needed (e.g., after search_songs → play_song)
-                assistant_message = final_response.choices[0].message
-                if assistant_message.tool_calls:
-                    logger.info("Assistant wants to make another tool call in sequence")
-
-                    # Get the first tool call only
-                    tool_call = assistant_message.tool_calls[0]
-
-                    # Add the assistant's message with tool call
-                    messages.append(
-                        {
-                            "role": "assistant",
-                            "content": assistant_message.content or "",
-                            "tool_calls": [
-                                {
-                                    "id": tool_call.id,
-                                    "type": tool_call.type,
-                                    "function": {
-                                        "name": tool_call.function.name,
-                                        "arguments": tool_call.function.arguments,
-                                    },
-                                }
-                            ],
-                        }
-                    )
-
-                    # Parse and execute the function
-                    function_name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
-                    logger.debug(
-                        f"Follow-up function call: {function_name} with args: {arguments}"
-                    )
-
-                    # Execute the appropriate function
-                    result = None
-                    if function_name == "search_songs":
-                        print(f"\n🔍 Searching for songs...")
-                        result = search_songs(**arguments)
-                        if result.get("success") and result.get("tracks"):
-                            print("\nFound these songs:")
-                            for idx, track in enumerate(result["tracks"][:5], 1):
-                                print(f"{idx}. {track['name']} by {track['artist']}")
-
-                            # Auto-play if this was a play request
-                            if any(
-                                word in user_input.lower()
-                                for word in ["play", "listen", "hear"]
-                            ):
-                                top_track = result["tracks"][0]
-                                play_result = play_song(track_id=top_track["id"])
-                                if play_result and play_result.get("success"):
-                                    result = play_result
-                    elif function_name == "get_songs":
-                        print(f"\n🎵 Fetching your music collection...")
-                        result = get_songs(**arguments)
-                    elif function_name == "play_song":
-                        print(f"\n▶️ Playing music...")
-                        result = play_song(**arguments)
-                    elif function_name == "player_controls":
-                        print(f"\n⏯️ Controlling playback...")
-                        result = player_controls(**arguments)
-                    elif function_name == "web_search":
-                        print(f"\n🌍 Searching the web...")
-                        result = web_search(**arguments)
-                        if result.get("success") and result.get("results"):
-                            print("\nSearch Results:")
-                            for idx, item in enumerate(result["results"], 1):
-                                print(f"\n{idx}. {item['title']}")
-                                print(f"   {item['snippet']}")
-
-                    logger.debug(f"Follow-up function result: {result}")
-
-                    # Add the tool result to conversation
-                    result_str = (
-                        json.dumps(result)
-                        if result
-                        else json.dumps({"error": "No result"})
-                    )
-                    messages.append(
-                        {
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "content": result_str,
-                        }
-                    )
-
-                    # Get the final response after tool call
-                    logger.debug("Getting final response after follow-up action")
-                    final_response = client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=messages,
-                    )
-
-                # Display the assistant's final response
-                final_message = final_response.choices[0].message.content or ""
-                # Include the result message for playback or specific functions
-                if result:
-                    if function_name in ["play_song"] and result.get("success"):
-                        logger.info(f"Playback result: {result['message']}")
-                        print(f"🎵 Assistant: {result['message']}")
-                    elif function_name == "get_songs" and result.get("success"):
-                        total_songs = len(result.get("tracks", []))
-                        sources = ", ".join(result.get("sources", []))
-                        songs_info = f"Found {total_songs} songs in: {sources}"
-                        logger.info(songs_info)
-                        if final_message:
-                            print(f"🎵 Assistant: {final_message}")
-                        else:
-                            print(f"🎵 Assistant: {songs_info}")
-                    elif result.get("message"):
-                        print(f"🎵 Assistant: {result['message']}")
-                    else:
-                        print(f"🎵 Assistant: {final_message or 'Done!'}")
-                else:
-                    print(f"🎵 Assistant: {final_message or 'Done!'}")
-
-                # Add the final response to conversation history
-                messages.append({"role": "assistant", "content": final_message or ""})
+            if streamed:
+                print()
+            # Already on screen if it was streamed; a fallback answer (e.g.
+            # after the deadline) follows text streamed earlier in the turn
+            if streamed and "".join(streamed[-1]) == final_message:
+                continue
+            # Playback confirmations come straight from the tool
+            if function_name == "play_song" and result and result.get("success"):
+                logger.info(f"Playback result: {result['message']}")
+                print(f"🎵 Assistant: {result['message']}")
             else:
-                # Regular response (no function call)
-                assistant_message = response.choices[0].message.content
-                logger.info(f"Assistant response: {assistant_message}")
-                print(f"🎵 Assistant: {assistant_message}")
-                messages.append(response.choices[0].message)
+                print(f"🎵 Assistant: {final_message or 'Done!'}")
 
         except Exception as e:
             logger.error(f"Error in conversation handler: {str(e)}", exc_info=True)
@@ -334,6 +569,11 @@ if __name__ == "__main__":
     # Parse command line arguments
     args = parse_args()
 
+    if args.profile_startup:
+        from core.startup_profile import profile_startup
+
+        exit(profile_startup())
+
     # Set log level from command line argument
     log_level = getattr(logging, args.log_level)
     SpotifyLogger().set_level(log_level)
@@ -347,4 +587,22 @@ if __name__ == "__main__":
         exit(1)
 
     logger.info("Starting Spotify Assistant")
-    handle_conversation()
+    threading.Thread(target=_warm_up_openai, name="openai-warmup", daemon=True).start()
+    if args.track_playback:
+        from core.playback_tracker import get_playback_tracker
+
+        get_playback_tracker().start()
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    if args.metrics_file:
+        start_metrics_dump(args.metrics_file)
+    if args.trace:
+        get_tracer().enable(args.trace)
+
+    handle_conversation(
+        max_steps=args.max_steps,
+        turn_timeout=args.turn_timeout,
+        stream=not args.no_stream,
+        history_budget=args.history_budget,
+        fast_path=not args.no_fast_path,
+    )
@@ -0,0 +1,153 @@
+"""
+Offline end-to-end benchmark of the conversation pipeline.
+
+Runs the scripted conversations in benchmarks.harness through run_turn
+against local fakes of Spotify, OpenAI and SerpAPI, and reports turn latency
+percentiles (overall and per intent), upstream calls per iteration and
+memory, tagged with the git commit so runs can be compared.
+
+Run with:
+    python -m benchmarks.e2e --iterations 5 --output bench.json
+    python -m benchmarks.e2e --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+import psutil
+from benchmarks.harness import (
+    CONVERSATIONS,
+    add_upstream_arguments,
+    git_revision,
+    reset_caches,
+    run_conversation,
+    start_offline_environment,
+    summarize,
+)
+
+
+def compare(baseline, current):
+    """Print the latency and call-count changes against a baseline report"""
+
+    def change(old, new):
+        if not old:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    print(f"baseline {baseline['git']['commit']} → current {current['git']['commit']}")
+    print(f"{'series':<22}{'p50 ms':>20}{'p99 ms':>22}")
+    series = [("all turns", baseline["turns"], current["turns"])] + [
+        (intent, baseline["by_intent"].get(intent), stats)
+        for intent, stats in current["by_intent"].items()
+    ]
+    for label, old, new in series:
+        if not old:
+            continue
+        print(
+            f"{label:<22}"
+            f"{old['p50_ms']:>8.1f} → {new['p50_ms']:>7.1f} {change(old['p50_ms'], new['p50_ms']):>7}"
+            f"{old['p99_ms']:>9.1f} → {new['p99_ms']:>7.1f} {change(old['p99_ms'], new['p99_ms']):>7}"
+        )
+    print(f"\n{'upstream calls / iteration':<40}{'baseline':>10}{'current':>10}")
+    for name in sorted(
+        set(baseline["upstream_calls"]) | set(current["upstream_calls"])
+    ):
+        old = baseline["upstream_calls"].get(name, 0)
+        new = current["upstream_calls"].get(name, 0)
+        marker = "" if old == new else "  *"
+        print(f"{name:<40}{old:>10g}{new:>10g}{marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="Untimed iterations first (library sync, connection pools)",
+    )
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="Clear the search, web and playback caches before every conversation",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Compare against an earlier JSON report")
+    parser.add_argument("--log-level", default="ERROR", help="Assistant log level")
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+
+    fakes, assistant, tmp_dir = start_offline_environment(args)
+    process = psutil.Process()
+    start_rss = process.memory_info().rss
+    try:
+        for _ in range(args.warmup):
+            for turns in CONVERSATIONS.values():
+                run_conversation(assistant, turns, stream=not args.no_stream)
+        fakes.reset_counts()
+
+        timings = []
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for turns in CONVERSATIONS.values():
+                if args.cold:
+                    reset_caches()
+                timings.extend(
+                    run_conversation(assistant, turns, stream=not args.no_stream)
+                )
+        elapsed = time.perf_counter() - started
+    finally:
+        fakes.stop()
+        tmp_dir.cleanup()
+
+    by_intent = {}
+    for timing in timings:
+        by_intent.setdefault(timing["intent"], []).append(timing["seconds"])
+
+    report = {
+        "git": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {
+            k: v for k, v in vars(args).items() if k not in ("output", "compare")
+        },
+        "wall_seconds": round(elapsed, 3),
+        "turns": summarize([t["seconds"] for t in timings]),
+        "by_intent": {
+            intent: summarize(seconds) for intent, seconds in sorted(by_intent.items())
+        },
+        "upstream_calls": {
+            name: round(count / args.iterations, 2)
+            for name, count in sorted(fakes.calls.items())
+        },
+        "memory": {
+            "rss_mb": round(process.memory_info().rss / 2**20, 1),
+            "rss_growth_mb": round((process.memory_info().rss - start_rss) / 2**20, 1),
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+        },
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        compare(baseline, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
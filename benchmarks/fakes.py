@@ -0,0 +1,537 @@
+"""
+Local stand-ins for the Spotify Web API, OpenAI chat completions and SerpAPI.
+
+One threaded HTTP server answers all three under different path prefixes:
+    /spotify/v1/...           Spotify Web API (library, search, player)
+    /openai/v1/chat/completions  OpenAI-compatible chat endpoint (JSON or SSE)
+    /serpapi/search           SerpAPI Google search
+
+Each service sleeps for a configurable latency (plus uniform jitter) before
+answering, and every request is counted. The fake model follows a fixed
+script keyed on the user's message, so runs are reproducible.
+"""
+
+import json
+import random
+import re
+import string
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+from core.metrics import spotify_endpoint
+
+WORDS = (
+    "blue night fire river golden dance heart city summer rain echo wild "
+    "electric midnight love road dream shadow light ocean star young"
+).split()
+
+
+def _track_id(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(22))
+
+
+def make_catalog(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Build a deterministic catalog of Spotify-shaped track objects"""
+    rng = random.Random(seed)
+    artists = [
+        f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}s" for _ in range(40)
+    ]
+    tracks = []
+    for index in range(size):
+        track_id = _track_id(rng)
+        tracks.append(
+            {
+                "id": track_id,
+                "uri": f"spotify:track:{track_id}",
+                "name": " ".join(rng.choice(WORDS) for _ in range(2)).title(),
+                "artists": [{"name": rng.choice(artists)}],
+                "album": {"name": f"{rng.choice(WORDS).title()} Sessions"},
+                "popularity": rng.randint(10, 100),
+                "duration_ms": rng.randint(150_000, 300_000),
+                "external_urls": {
+                    "spotify": f"https://open.spotify.com/track/{track_id}"
+                },
+            }
+        )
+    return tracks
+
+
+class ServiceConfig:
+    """Latency model of one upstream service (seconds)"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+
+    def delay(self, rng: random.Random) -> float:
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+
+class FakeSpotify:
+    """Minimal in-memory Spotify account: saved tracks, devices and a player"""
+
+    def __init__(self, catalog: List[Dict[str, Any]], library_size: int):
+        self.catalog = catalog
+        self.saved = [
+            {"added_at": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}Z", "track": track}
+            for i, track in reversed(list(enumerate(catalog[:library_size])))
+        ]
+        self.devices = [
+            {
+                "id": "a1b2c3d4e5f6a7b8c9d0",
+                "name": "Bench Desktop",
+                "type": "Computer",
+                "is_active": True,
+                "volume_percent": 60,
+            },
+            {
+                "id": "f0e9d8c7b6a5f4e3d2c1",
+                "name": "Bench Phone",
+                "type": "Smartphone",
+                "is_active": False,
+                "volume_percent": 40,
+            },
+        ]
+        self.by_id = {track["id"]: track for track in catalog}
+        self.player = {
+            "is_playing": False,
+            "shuffle_state": False,
+            "repeat_state": "off",
+            "progress_ms": 1000,
+            "device": self.devices[0],
+            "item": catalog[0],
+        }
+        self._lock = threading.Lock()
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Any):
+        """Return (status, payload) for one API request"""
+        with self._lock:
+            if method == "GET" and path == "search":
+                words = set(query.get("q", "").lower().split())
+                limit = int(query.get("limit", 10))
+                matches = [
+                    t
+                    for t in self.catalog
+                    if words
+                    & set(f"{t['name']} {t['artists'][0]['name']}".lower().split())
+                ] or self.catalog
+                return 200, {
+                    "tracks": {"items": matches[:limit], "total": len(matches)}
+                }
+            if method == "GET" and path == "me/tracks":
+                limit = int(query.get("limit", 20))
+                offset = int(query.get("offset", 0))
+                return 200, {
+                    "items": self.saved[offset : offset + limit],
+                    "total": len(self.saved),
+                    "limit": limit,
+                    "offset": offset,
+                }
+            if method == "GET" and path.startswith("tracks/"):
+                track = self.by_id.get(path.split("/", 1)[1])
+                return (200, track) if track else (404, {"error": {"status": 404}})
+            if method == "GET" and path == "me/player/devices":
+                return 200, {"devices": self.devices}
+            if method == "GET" and path == "me/player":
+                return 200, dict(self.player)
+            if method == "GET" and path == "me/player/recently-played":
+                return 200, {"items": [{"track": self.catalog[1]}]}
+            if path == "me/player/play":
+                uris = (body or {}).get("uris")
+                if uris:
+                    self.player["item"] = self.by_id.get(
+                        uris[0].rsplit(":", 1)[-1], self.catalog[0]
+                    )
+                    self.player["progress_ms"] = 0
+                self.player["is_playing"] = True
+                return 204, None
+            if path == "me/player/pause":
+                self.player["is_playing"] = False
+                return 204, None
+            if path in ("me/player/next", "me/player/previous"):
+                index = self.catalog.index(self.player["item"])
+                step = 1 if path.endswith("next") else -1
+                self.player["item"] = self.catalog[(index + step) % len(self.catalog)]
+                return 204, None
+            if path == "me/player/shuffle":
+                self.player["shuffle_state"] = query.get("state") == "true"
+                return 204, None
+            if path == "me/player/repeat":
+                self.player["repeat_state"] = query.get("state", "off")
+                return 204, None
+            return 404, {"error": {"status": 404, "message": f"No fake for {path}"}}
+
+
+def _rows(tool_content: str) -> List[Dict[str, Any]]:
+    """Read the track rows back out of an encoded tool result"""
+    try:
+        result = json.loads(tool_content)
+    except ValueError:
+        return []
+    for key in ("tracks", "songs"):
+        value = result.get(key) if isinstance(result, dict) else None
+        if isinstance(value, dict) and "columns" in value:
+            return [dict(zip(value["columns"], row)) for row in value["rows"]]
+        if isinstance(value, list):
+            return value
+    return []
+
+
+def script_reply(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Decide the fake model's next message from the conversation so far
+
+    Returns:
+        dict: {"content": str} or {"tool_calls": [(name, arguments), ...]}
+    """
+    last_user = max(i for i, m in enumerate(messages) if m["role"] == "user")
+    text = messages[last_user]["content"].lower()
+    turn = messages[last_user + 1 :]
+    done = [
+        call["function"]["name"]
+        for message in turn
+        for call in message.get("tool_calls") or []
+    ]
+    tool_results = [m["content"] for m in turn if m["role"] == "tool"]
+
+    if text.startswith("play "):
+        if not done:
+            return {"tool_calls": [("search_songs", {"query": text[5:], "limit": 5})]}
+        if done[-1] == "search_songs":
+            rows = _rows(tool_results[-1])
+            if rows:
+                return {"tool_calls": [("play_song", {"track_id": rows[0]["id"]})]}
+        return {"content": "Enjoy the music!"}
+
+    if "liked" in text or "favorite" in text:
+        if not done:
+            return {"tool_calls": [("get_songs", {"limit": 20})]}
+        return {
+            "content": f"Here are your liked songs ({len(_rows(tool_results[-1]))} shown)."
+        }
+
+    if "festival" in text or "concert" in text or "news" in text:
+        if not done:
+            return {"tool_calls": [("web_search", {"query": text, "num": 5})]}
+        if done == ["web_search"]:
+            return {
+                "tool_calls": [("search_songs", {"query": "summer dance", "limit": 5})]
+            }
+        return {"content": "Those headliners sound great, want me to play one?"}
+
+    if text.startswith(("find", "search")):
+        if not done:
+            query = re.sub(r"^(find|search)( me)?( for)?( some)?", "", text).strip()
+            return {"tool_calls": [("search_songs", {"query": query, "limit": 10})]}
+        return {"content": "Here are some tracks you might like."}
+
+    if "devices" in text:
+        if not done:
+            return {
+                "tool_calls": [
+                    ("list_devices", {}),
+                    ("player_controls", {"action": "resume"}),
+                ]
+            }
+        return {"content": "Playing on your desktop; your phone is available too."}
+
+    return {"content": "Sure thing!"}
+
+
+class FakeUpstreams:
+    """
+    Threaded HTTP server standing in for Spotify, OpenAI and SerpAPI.
+
+    Args:
+        spotify, openai, serpapi: Latency models of each service
+        catalog_size: Number of tracks in the fake catalog
+        library_size: Number of those saved in the user's library
+        chunk_delay: Seconds between streamed completion chunks
+        spotify_throttle: Fraction of Spotify requests answered with a 429
+        retry_after: Retry-After (seconds) sent with those 429s
+        seed: Seed for the catalog and the jitter
+    """
+
+    def __init__(
+        self,
+        spotify: ServiceConfig = None,
+        openai: ServiceConfig = None,
+        serpapi: ServiceConfig = None,
+        catalog_size: int = 2000,
+        library_size: int = 500,
+        chunk_delay: float = 0.0,
+        spotify_throttle: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+    ):
+        self.services = {
+            "spotify": spotify or ServiceConfig(),
+            "openai": openai or ServiceConfig(),
+            "serpapi": serpapi or ServiceConfig(),
+        }
+        self.chunk_delay = chunk_delay
+        self.spotify_throttle = spotify_throttle
+        self.retry_after = retry_after
+        self.spotify = FakeSpotify(make_catalog(catalog_size, seed), library_size)
+        self.calls = Counter()
+        self.in_flight = Counter()
+        self.peak_in_flight = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables pointing the assistant at this server"""
+        return {
+            "SPOTIFY_API_URL": f"{self.base_url}/spotify/v1/",
+            "OPENAI_BASE_URL": f"{self.base_url}/openai/v1",
+            "OPENAI_API_KEY": "benchmark",
+            "SERPAPI_BASE_URL": f"{self.base_url}/serpapi",
+            "SERPAPI_KEY": "benchmark",
+        }
+
+    def start(self) -> "FakeUpstreams":
+        upstreams = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _dispatch(self, method):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw else None
+                service, _, path = parsed.path.lstrip("/").partition("/")
+                upstreams.route(self, service, method, path, query, body)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PUT(self):
+                self._dispatch("PUT")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, name="fake-upstreams", daemon=True
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _sleep(self, service: str) -> None:
+        with self._lock:
+            delay = self.services[service].delay(self._rng)
+        if delay:
+            time.sleep(delay)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.calls[key] += 1
+
+    def reset_counts(self) -> None:
+        """Forget the call counts and peak concurrency seen so far"""
+        with self._lock:
+            self.calls.clear()
+            self.peak_in_flight = Counter(self.in_flight)
+
+    def route(self, handler, service, method, path, query, body) -> None:
+        """Answer one request for the given service, tracking its concurrency"""
+        with self._lock:
+            self.in_flight[service] += 1
+            self.peak_in_flight[service] = max(
+                self.peak_in_flight[service], self.in_flight[service]
+            )
+        try:
+            self._route(handler, service, method, path, query, body)
+        finally:
+            with self._lock:
+                self.in_flight[service] -= 1
+
+    def _route(self, handler, service, method, path, query, body) -> None:
+        if service == "spotify":
+            path = path[len("v1/") :] if path.startswith("v1/") else path
+            self._count(f"spotify {method} {spotify_endpoint(path)}")
+            self._sleep("spotify")
+            if self._throttled():
+                self._count("spotify 429")
+                self._send_json(
+                    handler,
+                    429,
+                    {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+                return
+            status, payload = self.spotify.handle(method, path, query, body)
+            self._send_json(handler, status, payload)
+        elif service == "openai" and path.endswith("chat/completions"):
+            self._count("openai chat.completions")
+            self._sleep("openai")
+            reply = script_reply(body["messages"])
+            if body.get("stream"):
+                self._send_stream(handler, body["model"], reply)
+            else:
+                self._send_json(handler, 200, self._completion(body["model"], reply))
+        elif service == "serpapi":
+            self._count("serpapi search")
+            self._sleep("serpapi")
+            self._send_json(handler, 200, self._serp_results(query))
+        else:
+            self._send_json(handler, 404, {"error": f"Unknown path {service}/{path}"})
+
+    def _throttled(self) -> bool:
+        if not self.spotify_throttle:
+            return False
+        with self._lock:
+            return self._rng.random() < self.spotify_throttle
+
+    @staticmethod
+    def _send_json(
+        handler,
+        status: int,
+        payload: Optional[Any],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        data = b"" if payload is None else json.dumps(payload).encode()
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    @staticmethod
+    def _tool_calls(reply):
+        return [
+            {
+                "id": f"call_{index}_{name}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }
+            for index, (name, arguments) in enumerate(reply.get("tool_calls", []))
+        ]
+
+    def _completion(self, model: str, reply: Dict[str, Any]) -> Dict[str, Any]:
+        message = {"role": "assistant", "content": reply.get("content")}
+        tool_calls = self._tool_calls(reply)
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if tool_calls else "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def _send_stream(self, handler, model: str, reply: Dict[str, Any]) -> None:
+        """Send the reply as server-sent events, like stream=True"""
+
+        def chunk(delta, finish_reason=None):
+            return {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+
+        chunks = [chunk({"role": "assistant", "content": ""})]
+        for word in re.findall(r"\S+\s*", reply.get("content") or ""):
+            chunks.append(chunk({"content": word}))
+        for index, call in enumerate(self._tool_calls(reply)):
+            arguments = call["function"]["arguments"]
+            chunks.append(
+                chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": index,
+                                "id": call["id"],
+                                "type": "function",
+                                "function": {
+                                    "name": call["function"]["name"],
+                                    "arguments": "",
+                                },
+                            }
+                        ]
+                    }
+                )
+            )
+            # Arguments arrive in a few pieces, as they do from the real API
+            for start in range(0, len(arguments), 16):
+                chunks.append(
+                    chunk(
+                        {
+                            "tool_calls": [
+                                {
+                                    "index": index,
+                                    "function": {
+                                        "arguments": arguments[start : start + 16]
+                                    },
+                                }
+                            ]
+                        }
+                    )
+                )
+        chunks.append(chunk({}, "tool_calls" if reply.get("tool_calls") else "stop"))
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def write(data: bytes):
+            handler.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            handler.wfile.flush()
+
+        for event in chunks:
+            write(f"data: {json.dumps(event)}\n\n".encode())
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+        write(b"data: [DONE]\n\n")
+        handler.wfile.write(b"0\r\n\r\n")
+        handler.wfile.flush()
+
+    @staticmethod
+    def _serp_results(query: Dict[str, str]) -> Dict[str, Any]:
+        num = int(query.get("num", 5))
+        return {
+            "organic_results": [
+                {
+                    "title": f"Result {i + 1} for {query.get('q', '')}",
+                    "snippet": "Headliners include Golden Rivers and Midnight Echoes.",
+                    "link": f"https://example.org/{i + 1}",
+                }
+                for i in range(num)
+            ]
+        }
@@ -0,0 +1,198 @@
+"""Shared setup for the offline benchmarks: fakes, isolated state and turn driving."""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+from benchmarks.fakes import FakeUpstreams, ServiceConfig
+from core.metrics import Histogram
+
+# (intent, user message) pairs of each scripted conversation
+CONVERSATIONS: Dict[str, List[Tuple[str, str]]] = {
+    "play_and_control": [
+        ("play", "play golden river"),
+        ("control", "pause"),
+        ("control", "skip this song"),
+        ("control", "play"),
+    ],
+    "library": [
+        ("library", "show my liked songs"),
+        ("search", "find me some dance songs"),
+        ("play", "play blue night"),
+    ],
+    "web": [
+        ("web", "what festivals are happening this summer"),
+        ("play", "play summer dance"),
+    ],
+    "devices": [
+        ("devices", "resume on one of my devices"),
+        ("control", "next track"),
+    ],
+}
+
+
+def add_upstream_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add latency and jitter options for the fake upstreams"""
+    group = parser.add_argument_group("fake upstreams (seconds)")
+    for service, latency, jitter in (
+        ("spotify", 0.04, 0.01),
+        ("openai", 0.3, 0.1),
+        ("serpapi", 0.5, 0.15),
+    ):
+        group.add_argument(f"--{service}-latency", type=float, default=latency)
+        group.add_argument(f"--{service}-jitter", type=float, default=jitter)
+    group.add_argument(
+        "--chunk-delay",
+        type=float,
+        default=0.005,
+        help="Delay between streamed completion chunks",
+    )
+    group.add_argument(
+        "--spotify-throttle",
+        type=float,
+        default=0.0,
+        help="Fraction of Spotify requests answered with 429 Too Many Requests",
+    )
+    group.add_argument(
+        "--retry-after",
+        type=int,
+        default=1,
+        help="Retry-After seconds sent with those 429s",
+    )
+    group.add_argument("--library-size", type=int, default=500)
+    group.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-stream", action="store_true", help="Request non-streamed completions"
+    )
+
+
+def start_offline_environment(args: argparse.Namespace):
+    """
+    Start the fakes and import the assistant wired to them with isolated state
+
+    Must run before anything imports core.client or assistant, since the
+    upstream URLs are read at import time.
+
+    Returns:
+        tuple: (fakes, assistant module, temporary directory)
+    """
+    fakes = FakeUpstreams(
+        spotify=ServiceConfig(args.spotify_latency, args.spotify_jitter),
+        openai=ServiceConfig(args.openai_latency, args.openai_jitter),
+        serpapi=ServiceConfig(args.serpapi_latency, args.serpapi_jitter),
+        library_size=args.library_size,
+        chunk_delay=args.chunk_delay,
+        spotify_throttle=args.spotify_throttle,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    ).start()
+    os.environ.update(fakes.environment())
+
+    # Keep the user's library, web cache and token out of the benchmark
+    tmp_dir = tempfile.TemporaryDirectory(prefix="spotify-bench-")
+    from core.auth import TokenManager
+    from core.library import LibraryStore
+    from core.logger import SpotifyLogger
+
+    SpotifyLogger().set_level(getattr(args, "log_level", "ERROR"))
+    LibraryStore(os.path.join(tmp_dir.name, "library.db"))
+    importlib.import_module("function_tools.web_search").WEB_CACHE_PATH = os.path.join(
+        tmp_dir.name, "web_cache.db"
+    )
+    TokenManager().set_token(
+        {
+            "access_token": "benchmark",
+            "token_type": "Bearer",
+            "refresh_token": "benchmark",
+            "scope": "",
+            "expires_in": 3600,
+            "expires_at": int(time.time()) + 24 * 3600,
+        }
+    )
+    assistant = importlib.import_module("assistant")
+    return fakes, assistant, tmp_dir
+
+
+def reset_caches() -> None:
+    """Drop every in-process and on-disk cache a cold conversation shouldn't see"""
+    from core.state_cache import get_state_cache
+
+    importlib.import_module("function_tools.search_songs").search_cache.clear()
+    importlib.import_module("function_tools.web_search")._get_web_cache().clear()
+    get_state_cache().clear()
+
+
+def run_conversation(assistant, turns, stream: bool = True) -> List[Dict[str, Any]]:
+    """
+    Run one scripted conversation the way handle_conversation does
+
+    Args:
+        assistant: The imported assistant module
+        turns: (intent, user message) pairs
+        stream: Stream completions
+
+    Returns:
+        list: {"intent", "seconds", "tool"} per turn
+    """
+    from core.history import ConversationHistory
+
+    messages = [{"role": "system", "content": assistant.SYSTEM_PROMPT}]
+    history = ConversationHistory(token_budget=assistant.DEFAULT_HISTORY_BUDGET)
+    timings = []
+    for intent, text in turns:
+        history.compact(messages)
+        start = time.perf_counter()
+        # Progress lines and web results are printed by the pipeline
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, function_name, _ = assistant.run_turn(messages, text, stream=stream)
+        timings.append(
+            {
+                "intent": intent,
+                "seconds": time.perf_counter() - start,
+                "tool": function_name,
+            }
+        )
+    return timings
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    """Count, mean, percentiles and max of durations in seconds, in milliseconds"""
+    histogram = Histogram(window=max(len(seconds), 1))
+    for value in seconds:
+        histogram.observe(value * 1000)
+    summary = histogram.summary()
+    return {
+        "count": summary["count"],
+        "mean_ms": round(summary["sum"] / max(summary["count"], 1), 2),
+        "p50_ms": round(summary["p50"], 2),
+        "p95_ms": round(summary["p95"], 2),
+        "p99_ms": round(summary["p99"], 2),
+        "max_ms": round(summary["max"], 2),
+    }
+
+
+def git_revision() -> Dict[str, Any]:
+    """Commit hash and dirty flag of the working tree, if it is a git checkout"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
@@ -0,0 +1,341 @@
+"""
+Concurrent load test of the conversation pipeline.
+
+Starts N simulated users, each holding its own conversation and sending
+turns drawn from a weighted mix of intents (search, play, control, library,
+web) with random think time in between, against the local upstream fakes.
+Reports throughput, turn latency percentiles (overall and per intent) and
+how saturated the tool thread pools and the Spotify connection pool got, so
+the point where tail latency falls apart can be found by raising --users.
+
+Run with:
+    python -m benchmarks.load --users 16 --duration 60 --think-time 1
+    python -m benchmarks.load --users 32 --mix search=1,play=1,control=4
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict
+from benchmarks.fakes import WORDS
+from benchmarks.harness import (
+    add_upstream_arguments,
+    git_revision,
+    start_offline_environment,
+    summarize,
+)
+
+# Message templates per intent; {a} and {b} are filled with catalog words so
+# searches spread over cache hits and misses
+INTENT_MESSAGES = {
+    "search": ["find me some {a} {b} songs", "search for {a} {b}"],
+    "play": ["play {a} {b}"],
+    "control": ["pause", "play", "skip this song", "next track", "previous song"],
+    "library": ["show my liked songs", "what are my favorite songs"],
+    "web": [
+        "what festivals are happening this summer",
+        "any {a} concert news this week",
+    ],
+}
+
+DEFAULT_MIX = "search=3,play=2,control=3,library=1,web=1"
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "search=3,play=2,..." into intent weights"""
+    mix = {}
+    for part in text.split(","):
+        intent, _, weight = part.partition("=")
+        intent = intent.strip()
+        if intent not in INTENT_MESSAGES:
+            raise argparse.ArgumentTypeError(
+                f"Unknown intent {intent!r} (choose from {', '.join(INTENT_MESSAGES)})"
+            )
+        try:
+            mix[intent] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Bad weight for {intent}: {weight!r}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("At least one intent needs a positive weight")
+    return mix
+
+
+class PoolSampler:
+    """
+    Periodically samples how busy the thread pools and the Spotify
+    connection pool are, keeping the peaks and the time-weighted averages.
+
+    Args:
+        executors: {name: ThreadPoolExecutor} to watch
+        session: requests session of the shared Spotify client
+        interval: Seconds between samples
+    """
+
+    def __init__(self, executors, session, interval: float = 0.02):
+        self.executors = executors
+        self.session = session
+        self.interval = interval
+        self.samples = 0
+        self.peaks: Dict[str, int] = {}
+        self.totals: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _executor_load(executor):
+        # Private attributes, but the only view of a pool's backlog there is
+        threads = len(executor._threads)
+        idle = executor._idle_semaphore._value
+        return max(threads - idle, 0), executor._work_queue.qsize()
+
+    def _connection_pools(self):
+        pools = []
+        for adapter in self.session.adapters.values():
+            manager = adapter.poolmanager
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is not None and pool not in pools:
+                    pools.append(pool)
+        return pools
+
+    def sample(self) -> None:
+        values = {}
+        for name, executor in self.executors.items():
+            busy, queued = self._executor_load(executor)
+            values[f"{name}_busy"] = busy
+            values[f"{name}_queued"] = queued
+        # Idle slots (and unused placeholders) sit in the pool's queue
+        values["spotify_connections_in_use"] = sum(
+            pool.pool.maxsize - pool.pool.qsize()
+            for pool in self._connection_pools()
+            if pool.pool is not None
+        )
+        self.samples += 1
+        for key, value in values.items():
+            self.peaks[key] = max(self.peaks.get(key, 0), value)
+            self.totals[key] = self.totals.get(key, 0) + value
+
+    def start(self) -> "PoolSampler":
+        def run():
+            while not self._stop.wait(self.interval):
+                self.sample()
+
+        self._thread = threading.Thread(target=run, name="pool-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            key: {
+                "peak": peak,
+                "mean": round(self.totals[key] / max(self.samples, 1), 2),
+            }
+            for key, peak in sorted(self.peaks.items())
+        }
+
+    def connections_opened(self) -> int:
+        return sum(pool.num_connections for pool in self._connection_pools())
+
+
+def simulate_user(user_id, assistant, args, start_at, stop_at, results, lock):
+    """
+    Run one user's conversation until stop_at
+
+    Args:
+        user_id: Index of the user (seeds its random choices)
+        assistant: The imported assistant module
+        args: Parsed command-line options
+        start_at: perf_counter time to send the first turn
+        stop_at: perf_counter time after which no new turn is started
+        results: Shared list of per-turn records
+        lock: Guards results
+    """
+    from core.history import ConversationHistory
+
+    rng = random.Random(args.seed * 1000 + user_id)
+    intents = list(args.mix)
+    weights = [args.mix[intent] for intent in intents]
+    messages = [{"role": "system", "content": assistant.SYSTEM_PROMPT}]
+    history = ConversationHistory(token_budget=assistant.DEFAULT_HISTORY_BUDGET)
+
+    time.sleep(max(0.0, start_at - time.perf_counter()))
+    while time.perf_counter() < stop_at:
+        intent = rng.choices(intents, weights)[0]
+        text = rng.choice(INTENT_MESSAGES[intent]).format(
+            a=rng.choice(WORDS), b=rng.choice(WORDS)
+        )
+        history.compact(messages)
+        started = time.perf_counter()
+        error = None
+        try:
+            _, function_name, result = assistant.run_turn(
+                messages, text, stream=not args.no_stream
+            )
+            # A tool that reported failure fails the turn too (the message is
+            # left out so failures of one tool group into one kind)
+            if isinstance(result, dict) and result.get("success") is False:
+                error = f"{function_name} failed"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        record = {
+            "user": user_id,
+            "intent": intent,
+            "started": started,
+            "seconds": time.perf_counter() - started,
+            "error": error,
+        }
+        with lock:
+            results.append(record)
+
+        if args.think_time > 0:
+            time.sleep(rng.expovariate(1 / args.think_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--users", type=int, default=8, help="Concurrent users")
+    parser.add_argument(
+        "--duration", type=float, default=30, help="Seconds of measured load"
+    )
+    parser.add_argument(
+        "--ramp-up",
+        type=float,
+        default=5,
+        help="Seconds over which users join; turns started then are not measured",
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=1.0,
+        help="Mean seconds a user waits between turns (exponential)",
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix(DEFAULT_MIX),
+        help=f"Intent weights, e.g. {DEFAULT_MIX}",
+    )
+    parser.add_argument(
+        "--sample-interval",
+        type=float,
+        default=0.02,
+        help="Seconds between pool saturation samples",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--log-level", default="ERROR", help="Assistant log level")
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+
+    fakes, assistant, tmp_dir = start_offline_environment(args)
+    from core import utils
+    from core.client import SpotifyClientProvider, get_spotify_client
+
+    # Sync the library up front so the first library turn isn't a full sync
+    importlib.import_module("function_tools.get_songs").sync_library(
+        get_spotify_client()
+    )
+    fakes.reset_counts()
+
+    sampler = PoolSampler(
+        {"tool_pool": assistant.tool_executor, "lookup_pool": utils.lookup_executor},
+        SpotifyClientProvider()._session,
+        interval=args.sample_interval,
+    )
+    results = []
+    lock = threading.Lock()
+    begin = time.perf_counter()
+    measure_from = begin + args.ramp_up
+    stop_at = measure_from + args.duration
+    users = [
+        threading.Thread(
+            target=simulate_user,
+            args=(
+                user_id,
+                assistant,
+                args,
+                begin + args.ramp_up * user_id / max(args.users, 1),
+                stop_at,
+                results,
+                lock,
+            ),
+            name=f"user-{user_id}",
+            daemon=True,
+        )
+        for user_id in range(args.users)
+    ]
+
+    sampler.start()
+    try:
+        # Progress lines and web results are printed by the pipeline
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for user in users:
+                user.start()
+            for user in users:
+                user.join()
+    finally:
+        sampler.stop()
+        end = time.perf_counter()
+        fakes.stop()
+        tmp_dir.cleanup()
+
+    measured = [r for r in results if r["started"] >= measure_from]
+    completed = [r for r in measured if not r["error"]]
+    elapsed = max(end - measure_from, 1e-9)
+    by_intent = {}
+    for record in completed:
+        by_intent.setdefault(record["intent"], []).append(record["seconds"])
+    errors = {}
+    for record in measured:
+        if record["error"]:
+            errors[record["error"]] = errors.get(record["error"], 0) + 1
+
+    pools = sampler.report()
+    report = {
+        "git": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            k: v for k, v in vars(args).items() if k not in ("output", "log_level")
+        },
+        "measured_seconds": round(elapsed, 3),
+        "turns": len(measured),
+        "errors": len(measured) - len(completed),
+        "error_kinds": errors,
+        "throughput_turns_per_second": round(len(completed) / elapsed, 3),
+        "latency": summarize([r["seconds"] for r in completed]),
+        "by_intent": {
+            intent: summarize(seconds) for intent, seconds in sorted(by_intent.items())
+        },
+        "saturation": {
+            "tool_pool_workers": assistant.tool_executor._max_workers,
+            "lookup_pool_workers": utils.lookup_executor._max_workers,
+            "spotify_pool_size": SpotifyClientProvider.pool_size,
+            "spotify_connections_opened": sampler.connections_opened(),
+            "samples": pools,
+            "upstream_peak_concurrency": dict(fakes.peak_in_flight),
+        },
+        "upstream_calls": dict(sorted(fakes.calls.items())),
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Microbenchmark of the per-call overhead added by core.logger.log_execution.
+
+Run with: python -m benchmarks.log_overhead [--calls N]
+"""
+
+import argparse
+import logging
+import time
+from functools import wraps
+import psutil
+from core.logger import SpotifyLogger, log_execution
+
+
+def legacy_log_execution(func):
+    """The previous decorator: two psutil.Process() calls and eager f-strings"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        logger = SpotifyLogger.get_logger()
+        start_time = time.time()
+        start_memory = psutil.Process().memory_info().rss
+        logger.debug(f"Entering {func.__name__} with " f"args={args}, kwargs={kwargs}")
+        result = func(*args, **kwargs)
+        execution_time = time.time() - start_time
+        memory_delta = psutil.Process().memory_info().rss - start_memory
+        logger.info(
+            f"Success: {func.__name__} completed in {execution_time:.2f}s, "
+            f"memory delta: {memory_delta/1024/1024:.2f}MB"
+        )
+        return result
+
+    return wrapper
+
+
+def work(track_id, limit=10):
+    return track_id
+
+
+def per_call_ns(function, calls):
+    """Average wall time per call in nanoseconds"""
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        function("4cOdK2wGLETKBW3PvgPWqT", limit=10)
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Measure the decorator, not the handlers
+    logger = SpotifyLogger.get_logger()
+    handlers = logger.handlers[:]
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    variants = {
+        "undecorated": work,
+        "legacy": legacy_log_execution(work),
+        "log_execution": log_execution(work),
+        "log_execution(sample_rate=0.01)": log_execution(sample_rate=0.01)(work),
+        "log_execution(track_memory=True)": log_execution(track_memory=True)(work),
+    }
+    try:
+        for level in ("ERROR", "INFO", "DEBUG"):
+            logger.setLevel(level)
+            baseline = per_call_ns(work, args.calls)
+            print(f"\nlevel={level}")
+            for label, function in variants.items():
+                cost = per_call_ns(function, args.calls)
+                print(f"  {label:34} {cost:10.0f} ns/call  (+{cost - baseline:.0f})")
+    finally:
+        logger.handlers[:] = handlers
+        logger.propagate = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Core functionality of the Spotify assistant"""
+
+from dotenv import load_dotenv
+
+# Load .env once, before any core module reads its settings from the environment
+load_dotenv()
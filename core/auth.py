@@ -1,65 +1,234 @@
 import os
 import sys
+import json
+import time
+import tempfile
+import threading
 import spotipy
+from spotipy.cache_handler import CacheHandler
 from spotipy.oauth2 import SpotifyOAuth
-from dotenv import load_dotenv
+from core.logger import SpotifyLogger
 
-# Load environment variables from .env file
-load_dotenv()
+logger = SpotifyLogger.get_logger()
 
+TOKEN_CACHE_PATH = ".spotify_token_cache"
 
-def create_spotify_oauth():
+
+class AtomicCacheFileHandler(CacheHandler):
+    """
+    Token cache that keeps the token in memory and only touches disk when the
+    token actually changes. Writes go to a temporary file that is atomically
+    renamed over the cache file, so a crash never leaves a truncated cache.
+    """
+
+    def __init__(self, cache_path=TOKEN_CACHE_PATH):
+        self.cache_path = cache_path
+        self._token_info = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get_cached_token(self):
+        """Return the in-memory token, reading the cache file only once"""
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                try:
+                    with open(self.cache_path) as f:
+                        self._token_info = json.load(f)
+                except FileNotFoundError:
+                    self._token_info = None
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Couldn't read token cache: {str(e)}")
+                    self._token_info = None
+            return self._token_info
+
+    def save_token_to_cache(self, token_info):
+        """Store the token in memory and persist it atomically if it changed"""
+        with self._lock:
+            self._loaded = True
+            if token_info == self._token_info:
+                return
+            self._token_info = token_info
+
+            cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".token-")
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(token_info, f)
+                    os.replace(tmp_path, self.cache_path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            except OSError as e:
+                logger.warning(f"Couldn't write token cache: {str(e)}")
+
+
+def create_spotify_oauth(cache_handler=None):
     """Create and return a SpotifyOAuth instance for authentication"""
     return SpotifyOAuth(
         client_id=os.getenv("SPOTIPY_CLIENT_ID").strip(),
         client_secret=os.getenv("SPOTIPY_CLIENT_SECRET").strip(),
         redirect_uri=os.getenv("SPOTIPY_REDIRECT_URI").strip(),
         scope="user-library-read user-top-read user-modify-playback-state user-read-playback-state",
-        cache_path=".spotify_token_cache",
+        cache_handler=cache_handler or AtomicCacheFileHandler(),
     )
 
 
-def get_token():
-    """Get an access token for the Spotify API"""
-    sp_oauth = create_spotify_oauth()
-    token_info = sp_oauth.get_cached_token()
-
-    if not token_info:
-        max_attempts = 3
-        attempt = 0
-
-        while attempt < max_attempts:
-            attempt += 1
-            auth_url = sp_oauth.get_authorize_url()
-            print(
-                f"Please navigate to this URL to authorize the application:\n{auth_url}"
-            )
-            print(
-                "After authorizing, you'll be redirected to a page that may show an error - this is normal."
-            )
-            print(
-                "Copy the FULL URL from your browser's address bar and paste it here."
-            )
+def _authorize_interactively(sp_oauth):
+    """Walk the user through the OAuth flow in the terminal"""
+    max_attempts = 3
+    attempt = 0
+    token_info = None
+
+    while attempt < max_attempts:
+        attempt += 1
+        auth_url = sp_oauth.get_authorize_url()
+        print(f"Please navigate to this URL to authorize the application:\n{auth_url}")
+        print(
+            "After authorizing, you'll be redirected to a page that may show an error - this is normal."
+        )
+        print("Copy the FULL URL from your browser's address bar and paste it here.")
+
+        response = input("Enter the URL you were redirected to: ")
+
+        try:
+            code = sp_oauth.parse_response_code(response)
+            # Use get_access_token without as_dict for future compatibility
+            token_info = sp_oauth.get_access_token(code, as_dict=True)
+            break
+        except Exception as e:
+            print(f"Error getting token: {e}")
+            print(f"Attempt {attempt} of {max_attempts} failed.")
+
+            if attempt < max_attempts:
+                print("Let's try again.")
+            else:
+                print("Maximum attempts reached. Could not authenticate.")
+                raise
+
+    return token_info
+
 
-            response = input("Enter the URL you were redirected to: ")
+class TokenManager:
+    """
+    Keeps the Spotify token in memory and refreshes it on a background timer
+    shortly before it expires, so tool calls never wait on a refresh.
+    """
 
+    _instance = None
+    _lock = threading.Lock()
+    refresh_margin = 120  # Seconds before expires_at to refresh
+    retry_delay = 30  # Seconds to wait before retrying a failed refresh
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._sp_oauth = None
+                    instance._token_info = None
+                    instance._timer = None
+                    instance._token_lock = threading.RLock()
+                    cls._instance = instance
+        return cls._instance
+
+    def get_token(self):
+        """
+        Get the current access token info.
+
+        Returns:
+            dict: Token info with at least access_token and expires_at
+
+        Raises:
+            Exception: The token had expired and refreshing it failed
+        """
+        token_info = self._token_info
+        if token_info and not SpotifyOAuth.is_token_expired(token_info):
+            return token_info
+
+        with self._token_lock:
+            # Another thread may have loaded the token while we waited
+            if self._token_info and not SpotifyOAuth.is_token_expired(self._token_info):
+                return self._token_info
+
+            if self._sp_oauth is None:
+                self._sp_oauth = create_spotify_oauth()
+
+            if self._token_info and self._token_info.get("refresh_token"):
+                # The background refresh didn't run in time (e.g. the machine slept)
+                logger.warning("Access token expired, refreshing in the foreground")
+                self._refresh_token()
+            else:
+                token_info = self._sp_oauth.get_cached_token()
+                if not token_info:
+                    token_info = _authorize_interactively(self._sp_oauth)
+                self._set_token(token_info)
+
+            return self._token_info
+
+    def set_token(self, token_info):
+        """
+        Use a token obtained elsewhere instead of the OAuth flow
+
+        Args:
+            token_info (dict): Token info with at least access_token and expires_at
+        """
+        with self._token_lock:
+            self._set_token(token_info)
+
+    def _set_token(self, token_info):
+        """Publish a new token and schedule its refresh"""
+        self._token_info = token_info
+        if not token_info.get("refresh_token"):
+            # Nothing to refresh with; get_token reauthorizes once it expires
+            self.stop()
+            return
+        self._schedule_refresh(
+            token_info["expires_at"] - time.time() - self.refresh_margin
+        )
+
+    def _schedule_refresh(self, delay):
+        """(Re)start the background refresh timer"""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(delay, 0), self._refresh)
+        self._timer.daemon = True
+        self._timer.start()
+        logger.debug(f"Next token refresh in {max(delay, 0):.0f}s")
+
+    def _refresh_token(self):
+        """Refresh the token, raising if Spotify doesn't issue a new one"""
+        with self._token_lock:
+            logger.debug("Refreshing Spotify access token")
+            if self._sp_oauth is None:
+                # The token came from set_token rather than the OAuth flow
+                self._sp_oauth = create_spotify_oauth()
+            token_info = self._sp_oauth.refresh_access_token(
+                self._token_info["refresh_token"]
+            )
+            self._set_token(token_info)
+            logger.info("Spotify access token refreshed")
+
+    def _refresh(self):
+        """Background refresh; on failure keep the old token and retry later"""
+        with self._token_lock:
             try:
-                code = sp_oauth.parse_response_code(response)
-                # Use get_access_token without as_dict for future compatibility
-                token_info = sp_oauth.get_access_token(code, as_dict=True)
-                break
+                self._refresh_token()
             except Exception as e:
-                print(f"Error getting token: {e}")
-                print(f"Attempt {attempt} of {max_attempts} failed.")
+                logger.error(f"Error refreshing access token: {str(e)}")
+                self._schedule_refresh(self.retry_delay)
 
-                if attempt < max_attempts:
-                    print("Let's try again.")
-                else:
-                    print("Maximum attempts reached. Could not authenticate.")
-                    raise
+    def stop(self):
+        """Cancel the background refresh timer"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
 
-    # If we reach here, we have a valid token_info
-    return token_info
+
+def get_token():
+    """Get an access token for the Spotify API"""
+    return TokenManager().get_token()
 
 
 def main():
@@ -0,0 +1,202 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a free-text query for use as a cache key.
+
+    Case-folds, drops punctuation, collapses whitespace and sorts the words,
+    so "Bohemian  Rhapsody, Queen" and "queen bohemian rhapsody" share a key.
+    """
+    return " ".join(sorted(_WORD_RE.findall(query.casefold())))
+
+
+class TTLCache:
+    """
+    Thread-safe bounded cache with per-entry expiry and LRU eviction.
+
+    Args:
+        maxsize: Maximum number of entries before the least recently used is evicted
+        ttl: Seconds an entry stays valid
+        clock: Monotonic time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 600,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a live entry, or None on a miss"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store an entry, evicting the least recently used one if full"""
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class PersistentCache:
+    """
+    SQLite-backed cache for JSON-serializable values that survives restarts.
+
+    Each entry carries its own TTL and a query class label, and entries are
+    indexed by creation time so the oldest ones can be listed or purged
+    cheaply. Expired entries are purged when the cache is opened and every
+    purge_every writes after that, so the file doesn't grow without bound.
+
+    Args:
+        db_path: Path of the SQLite database file
+        clock: Wall-clock time source, injectable for tests
+        purge_every: Writes between purges of expired entries
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        clock: Callable[[], float] = time.time,
+        purge_every: int = 100,
+    ):
+        self.db_path = db_path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.purge_every = purge_every
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    query_class TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    value TEXT NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_created_at "
+                "ON entries (created_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_expires_at "
+                "ON entries (expires_at)"
+            )
+        purged = self.purge_expired()
+        if purged:
+            logger.debug(f"Purged {purged} expired entries from {db_path}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live entry, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] > self._clock():
+                self.hits += 1
+                return json.loads(row[1])
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl: float, query_class: str = "") -> None:
+        """Store an entry that expires after ttl seconds"""
+        now = self._clock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, query_class, created_at, expires_at, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, query_class, now, now + ttl, json.dumps(value)),
+            )
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge_expired()
+
+    def entries_by_age(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """List entries oldest first with their class, age and time to live"""
+        now = self._clock()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, query_class, created_at, expires_at FROM entries "
+                "ORDER BY created_at LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {
+                "key": key,
+                "query_class": query_class,
+                "age": now - created_at,
+                "expires_in": expires_at - now,
+            }
+            for key, query_class, created_at, expires_at in rows
+        ]
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE expires_at <= ?", (self._clock(),)
+            )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """Delete all entries and reset the counters"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,160 @@
+import math
+import os
+import threading
+import requests
+import spotipy
+import urllib3
+from spotipy.exceptions import SpotifyException
+from core.auth import get_token
+from core.logger import SpotifyLogger
+from core.metrics import get_metrics, spotify_endpoint
+from core.rate_limit import (
+    RateLimitExceeded,
+    current_priority,
+    get_request_scheduler,
+    parse_retry_after,
+)
+from core.tracing import get_tracer
+
+logger = SpotifyLogger.get_logger()
+
+# Base URL of the Web API (overridable to point at a local stand-in)
+SPOTIFY_API_URL = os.getenv("SPOTIFY_API_URL", "https://api.spotify.com/v1/")
+
+
+class InstrumentedSpotify(spotipy.Spotify):
+    """
+    Spotify client that schedules, times and traces every API request.
+
+    Each request waits for the shared RequestScheduler (in the priority class
+    of the calling context) and is retried after a 429 once Spotify's
+    Retry-After has passed.
+    """
+
+    def _internal_call(self, method, url, payload, params):
+        endpoint = spotify_endpoint(url, self.prefix)
+        scheduler = get_request_scheduler()
+        priority = current_priority()
+        metrics = get_metrics()
+        with get_tracer().span(
+            f"spotify {method} {endpoint}", priority=priority.name
+        ), metrics.timer(
+            "spotify_request_seconds",
+            error_counter="spotify_request_errors_total",
+            method=method,
+            endpoint=endpoint,
+        ):
+            for attempt in range(scheduler.max_retries + 1):
+                try:
+                    waited = scheduler.acquire(priority)
+                except RateLimitExceeded as e:
+                    raise SpotifyException(
+                        429,
+                        -1,
+                        f"{url}:\n {str(e)}",
+                        headers={"Retry-After": str(math.ceil(e.retry_after))},
+                    )
+                metrics.observe(
+                    "spotify_scheduler_wait_seconds",
+                    waited,
+                    priority=priority.name.lower(),
+                )
+
+                try:
+                    return super()._internal_call(method, url, payload, params)
+                except SpotifyException as e:
+                    if e.http_status != 429 or attempt == scheduler.max_retries:
+                        raise
+                    retry_after = parse_retry_after(
+                        (e.headers or {}).get("Retry-After")
+                    )
+                    metrics.increment("spotify_rate_limited_total", endpoint=endpoint)
+                    scheduler.on_rate_limited(retry_after)
+
+
+class SpotifyClientProvider:
+    """
+    Process-wide provider for a single authenticated Spotify client.
+
+    The client is backed by one keep-alive requests session, so every tool call
+    reuses the same connection pool instead of paying a new TLS handshake. When
+    the access token changes only the client's auth header is swapped.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+    pool_size = 10  # Max keep-alive connections to api.spotify.com
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._client = None
+                    instance._session = None
+                    instance._access_token = None
+                    cls._instance = instance
+        return cls._instance
+
+    def _build_session(self):
+        """Create a pooled HTTP session with the same retry policy spotipy uses"""
+        session = requests.Session()
+        retry = urllib3.Retry(
+            total=spotipy.Spotify.max_retries,
+            connect=None,
+            read=False,
+            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+            status=spotipy.Spotify.max_retries,
+            backoff_factor=0.3,
+            # 429s are left to the request scheduler, which honours Retry-After
+            # for every thread; urllib3 would otherwise retry them itself
+            status_forcelist=[
+                code for code in spotipy.Spotify.default_retry_codes if code != 429
+            ],
+            respect_retry_after_header=False,
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def get_client(self) -> spotipy.Spotify:
+        """
+        Get the shared Spotify client, refreshing its token if needed.
+
+        Returns:
+            spotipy.Spotify: Authenticated client backed by the shared session
+        """
+        token_info = get_token()
+        access_token = token_info["access_token"]
+
+        with self._lock:
+            if self._client is None:
+                logger.debug("Creating shared Spotify client")
+                self._session = self._build_session()
+                self._client = InstrumentedSpotify(
+                    auth=access_token, requests_session=self._session
+                )
+                self._client.prefix = SPOTIFY_API_URL
+                self._access_token = access_token
+            elif access_token != self._access_token:
+                logger.debug("Access token changed, updating shared Spotify client")
+                self._client.set_auth(access_token)
+                self._access_token = access_token
+            return self._client
+
+    def reset(self) -> None:
+        """Close the shared session and drop the client"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._client = None
+            self._session = None
+            self._access_token = None
+
+
+def get_spotify_client() -> spotipy.Spotify:
+    """Get the shared, pooled Spotify client"""
+    return SpotifyClientProvider().get_client()
@@ -0,0 +1,126 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+# Result lists whose "id" column holds Spotify track IDs
+TRACK_LIST_KEYS = ("tracks", "songs")
+
+
+class TrackHandles:
+    """
+    Maps Spotify track IDs to short handles ("t1", "t2", ...) shown to the model.
+
+    A 22-character track ID costs several tokens and is easy for the model to
+    mangle; a handle costs one or two. Handles stay valid across turns so the
+    model can still refer to earlier results, and the least recently used
+    ones are forgotten once max_size is reached.
+
+    Args:
+        max_size: Maximum number of handles remembered
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._by_id: "OrderedDict[str, str]" = OrderedDict()
+        self._by_handle: Dict[str, str] = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def handle_for(self, track_id: str) -> str:
+        """Get the handle for a track ID, issuing a new one if needed"""
+        with self._lock:
+            handle = self._by_id.get(track_id)
+            if handle is None:
+                self._counter += 1
+                handle = f"t{self._counter}"
+                self._by_id[track_id] = handle
+                self._by_handle[handle] = track_id
+                while len(self._by_id) > self.max_size:
+                    _, old_handle = self._by_id.popitem(last=False)
+                    del self._by_handle[old_handle]
+            else:
+                self._by_id.move_to_end(track_id)
+            return handle
+
+    def resolve(self, value: str) -> str:
+        """Map a handle back to its track ID; anything else is returned unchanged"""
+        with self._lock:
+            return self._by_handle.get(value, value)
+
+
+def _is_table(value: Any) -> bool:
+    """Check if a value is a list of two or more dicts sharing the same keys"""
+    return (
+        isinstance(value, list)
+        and len(value) > 1
+        and all(isinstance(row, dict) for row in value)
+        and all(row.keys() == value[0].keys() for row in value)
+    )
+
+
+def _to_table(rows: List[Dict[str, Any]], handles: TrackHandles = None):
+    """Turn a list of dicts into columns and rows, dropping all-empty columns"""
+    columns = [
+        column
+        for column in rows[0]
+        if any(row[column] not in (None, "", [], {}) for row in rows)
+    ]
+    table_rows = []
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row[column]
+            if handles is not None and column == "id" and value:
+                value = handles.handle_for(value)
+            values.append(value)
+        table_rows.append(values)
+    return {"columns": columns, "rows": table_rows}
+
+
+def compact_result(result: Any, handles: TrackHandles = None) -> Any:
+    """
+    Rewrite a tool result into a compact form for the model.
+
+    Lists of uniform dicts become {"columns": [...], "rows": [[...], ...]}
+    so keys are sent once per list instead of once per item, and the IDs in
+    track lists are replaced with short handles.
+
+    Args:
+        result: Tool result (JSON-serializable)
+        handles: Track handle table, or None to keep raw IDs
+
+    Returns:
+        The compacted result
+    """
+    if isinstance(result, dict):
+        compacted = {}
+        for key, value in result.items():
+            key_handles = handles if key in TRACK_LIST_KEYS else None
+            if _is_table(value):
+                compacted[key] = _to_table(value, key_handles)
+            elif key_handles is not None and isinstance(value, list):
+                # A single track still gets a handle
+                compacted[key] = [
+                    (
+                        {**item, "id": handles.handle_for(item["id"])}
+                        if isinstance(item, dict) and item.get("id")
+                        else item
+                    )
+                    for item in value
+                ]
+            else:
+                compacted[key] = compact_result(value, handles)
+        return compacted
+    if isinstance(result, list):
+        return [compact_result(item, handles) for item in result]
+    return result
+
+
+def encode_tool_result(result: Any, handles: TrackHandles = None) -> str:
+    """Serialize a tool result compactly for the model"""
+    if not result:
+        result = {"error": "No result"}
+    return json.dumps(
+        compact_result(result, handles), separators=(",", ":"), ensure_ascii=False
+    )
@@ -0,0 +1,135 @@
+import json
+from typing import Any, Dict, List
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+
+def estimate_tokens(message: Dict[str, Any]) -> int:
+    """Roughly estimate the prompt tokens of a message (~4 characters per token)"""
+    return len(json.dumps(message, ensure_ascii=False)) // 4 + 4
+
+
+def _shorten(text: str, limit: int) -> str:
+    """Cut text to limit characters, marking the cut"""
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+class ConversationHistory:
+    """
+    Keeps the message list sent to the model within a token budget.
+
+    The system prompt and the most recent turns are always kept whole. Tool
+    results from older turns are replaced with one-line stubs, and once the
+    history is still over budget the oldest turns are folded into a short
+    summary message.
+
+    Args:
+        token_budget: Target size of the history in estimated tokens
+        keep_turns: Number of most recent turns kept untouched
+        max_summary_lines: Oldest summary lines are dropped beyond this
+    """
+
+    def __init__(
+        self, token_budget: int = 6000, keep_turns: int = 2, max_summary_lines: int = 20
+    ):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.max_summary_lines = max_summary_lines
+
+    @staticmethod
+    def _split_turns(messages: List[Dict[str, Any]]):
+        """Split messages into (head, turns), a turn starting at each user message"""
+        head, turns = [], []
+        for message in messages:
+            if message["role"] == "user":
+                turns.append([message])
+            elif turns:
+                turns[-1].append(message)
+            else:
+                head.append(message)
+        return head, turns
+
+    @staticmethod
+    def _stub(tool_name: str, content: str) -> str:
+        """Describe a tool result in one line"""
+        try:
+            result = json.loads(content)
+        except (TypeError, ValueError):
+            return f"[{tool_name} result omitted: {_shorten(content, 80)}]"
+        if isinstance(result, dict) and result.get("message"):
+            return f"[{tool_name} result omitted: {_shorten(result['message'], 120)}]"
+        return f"[{tool_name} result omitted]"
+
+    def _stub_tool_results(self, turn: List[Dict[str, Any]]) -> int:
+        """Replace tool payloads in a turn with stubs, returning how many changed"""
+        tool_names = {}
+        stubbed = 0
+        for message in turn:
+            for tool_call in message.get("tool_calls") or []:
+                tool_names[tool_call["id"]] = tool_call["function"]["name"]
+            name = tool_names.get(message.get("tool_call_id"), "tool")
+            if message["role"] == "tool" and not message["content"].startswith(
+                f"[{name} result omitted"
+            ):
+                message["content"] = self._stub(name, message["content"])
+                stubbed += 1
+        return stubbed
+
+    @staticmethod
+    def _summarize_turn(turn: List[Dict[str, Any]]) -> str:
+        """Summarize a turn as the user's request and the final answer"""
+        request = _shorten(turn[0]["content"], 120)
+        answer = next(
+            (
+                m["content"]
+                for m in reversed(turn)
+                if m["role"] == "assistant" and m.get("content")
+            ),
+            "",
+        )
+        return f"- User: {request} → Assistant: {_shorten(answer, 160)}"
+
+    def compact(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Compact the history in place so it fits the token budget
+
+        Args:
+            messages: Conversation history starting with the system prompt
+        """
+        head, turns = self._split_turns(messages)
+        old_turns = turns[: -self.keep_turns] if self.keep_turns else turns
+        recent_turns = turns[len(old_turns) :]
+
+        stubbed = sum(self._stub_tool_results(turn) for turn in old_turns)
+
+        def total_tokens():
+            return sum(estimate_tokens(m) for m in head + [m for t in turns for m in t])
+
+        summarized = []
+        while old_turns and total_tokens() > self.token_budget:
+            summarized.append(self._summarize_turn(old_turns[0]))
+            old_turns = old_turns[1:]
+            turns = old_turns + recent_turns
+
+        if summarized:
+            summary = next(
+                (m for m in head if m["content"].startswith(SUMMARY_PREFIX)), None
+            )
+            lines = summary["content"].splitlines()[1:] if summary else []
+            lines = (lines + summarized)[-self.max_summary_lines :]
+            content = "\n".join([SUMMARY_PREFIX] + lines)
+            if summary:
+                summary["content"] = content
+            else:
+                head.append({"role": "system", "content": content})
+
+        if stubbed or summarized:
+            logger.debug(
+                f"Compacted history: {stubbed} tool results stubbed, "
+                f"{len(summarized)} turns summarized, ~{total_tokens()} tokens"
+            )
+            messages[:] = head + [m for turn in turns for m in turn]
@@ -0,0 +1,69 @@
+import re
+from typing import Optional
+
+# Filler words that don't change a control command's meaning
+_FILLER_RE = re.compile(
+    r"\b(please|pls|plz|can you|could you|would you|will you|hey|ok|okay|"
+    r"spotify|assistant|now|thanks|thank you|just)\b"
+)
+
+_OBJECT = r"(?: (?:the |this |that )?(?:music|song|track|playback|one|it))?"
+# "play that one" or "play it again" may point at a listed result, so play
+# only takes objects that can't mean a particular track
+_PLAY_OBJECT = r"(?: (?:the )?(?:music|playback))?"
+
+# Each pattern must match the whole (normalized) utterance
+CONTROL_INTENTS = [
+    ("pause", re.compile(rf"(?:pause|stop|hold){_OBJECT}")),
+    (
+        "resume",
+        re.compile(
+            rf"(?:resume|unpause|continue){_OBJECT}(?: again)?"
+            rf"|play{_PLAY_OBJECT}|keep playing"
+        ),
+    ),
+    (
+        "next",
+        re.compile(
+            rf"(?:skip|next){_OBJECT}|(?:play )?(?:the )?next (?:song|track|one)"
+        ),
+    ),
+    (
+        "previous",
+        re.compile(
+            rf"(?:previous|prev|back|go back){_OBJECT}"
+            r"|(?:play )?(?:the )?previous (?:song|track|one)"
+        ),
+    ),
+    ("shuffle", re.compile(r"(?:toggle )?shuffle")),
+    ("repeat", re.compile(r"(?:toggle )?repeat")),
+]
+
+
+def normalize_command(text: str) -> str:
+    """Lowercase, drop punctuation and filler words, and collapse whitespace"""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    text = _FILLER_RE.sub(" ", text)
+    return " ".join(text.split())
+
+
+def match_control_intent(text: str) -> Optional[str]:
+    """
+    Match a simple playback command without asking the model.
+
+    Only short utterances that are entirely a control command match, so
+    "play bohemian rhapsody" or "turn shuffle off" fall through to the model.
+
+    Args:
+        text: The user's message
+
+    Returns:
+        str: A player_controls action, or None if the text isn't a clear command
+    """
+    command = normalize_command(text)
+    if not command or len(command.split()) > 4:
+        return None
+    for action, pattern in CONTROL_INTENTS:
+        if pattern.fullmatch(command):
+            return action
+    return None
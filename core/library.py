@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+LIBRARY_DB_PATH = ".spotify_library.db"
+
+
+class LibraryStore:
+    """
+    Durable local copy of the user's liked songs, backed by SQLite.
+
+    Tracks are stored with the fields get_songs returns plus added_at, which
+    lets a sync fetch only the tracks added since the newest stored one.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, db_path: str = LIBRARY_DB_PATH):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._setup(db_path)
+                    cls._instance = instance
+        return cls._instance
+
+    def _setup(self, db_path: str) -> None:
+        """Open the database and create the schema if needed"""
+        self.db_path = db_path
+        self.synced_at = None  # Last successful sync in this process
+        self.version = 0  # Bumped on every write so derived indexes can rebuild
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS tracks (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    artist TEXT NOT NULL,
+                    album TEXT NOT NULL,
+                    added_at TEXT NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tracks_added_at ON tracks (added_at)"
+            )
+
+    def newest_added_at(self) -> Optional[str]:
+        """Get the added_at timestamp of the most recently liked stored track"""
+        with self._db_lock:
+            row = self._conn.execute("SELECT MAX(added_at) FROM tracks").fetchone()
+        return row[0]
+
+    def count(self) -> int:
+        """Get the number of stored tracks"""
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    def add_tracks(self, tracks: List[Dict[str, Any]]) -> None:
+        """Insert or update tracks"""
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tracks (id, name, artist, album, added_at) "
+                "VALUES (:id, :name, :artist, :album, :added_at)",
+                tracks,
+            )
+            self.version += 1
+
+    def replace_all(self, tracks: List[Dict[str, Any]]) -> None:
+        """Replace the whole library in a single transaction"""
+        with self._db_lock, self._conn:
+            self._conn.execute("DELETE FROM tracks")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tracks (id, name, artist, album, added_at) "
+                "VALUES (:id, :name, :artist, :album, :added_at)",
+                tracks,
+            )
+            self.version += 1
+
+    def get_tracks(
+        self, limit: Optional[int] = None, offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Get stored tracks, most recently liked first
+
+        Args:
+            limit: Maximum number of tracks to return (default: all)
+            offset: Number of tracks to skip
+
+        Returns:
+            List of dicts with name, artist, album and id
+        """
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT name, artist, album, id FROM tracks "
+                "ORDER BY added_at DESC, rowid LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+        return [
+            {"name": name, "artist": artist, "album": album, "id": track_id}
+            for name, artist, album, track_id in rows
+        ]
+
+    def mark_synced(self) -> None:
+        """Record that the store was synced with Spotify in this process"""
+        self.synced_at = time.time()
+
+    def clear(self) -> None:
+        """Delete all stored tracks"""
+        with self._db_lock, self._conn:
+            self._conn.execute("DELETE FROM tracks")
+            self.version += 1
+        self.synced_at = None
@@ -1,15 +1,95 @@
+import atexit
 import logging
+import queue
 import time
-import psutil
 import os
+import random
 from functools import wraps
-from logging.handlers import RotatingFileHandler
-import colorlog
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Longest log message written as-is; longer ones are truncated (0 = no limit)
+LOG_MAX_MESSAGE_CHARS = int(os.getenv("LOG_MAX_MESSAGE_CHARS", "2000"))
+# Fraction of over-long messages that are kept (truncated); the rest are dropped
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "1.0"))
+
+
+class PayloadLimitFilter(logging.Filter):
+    """
+    Truncates over-long log messages, optionally keeping only a sample of them.
+
+    Args:
+        max_chars: Longest message kept whole (0 disables the limit)
+        sample_rate: Fraction of over-long messages kept
+    """
+
+    def __init__(self, max_chars=LOG_MAX_MESSAGE_CHARS, sample_rate=1.0):
+        super().__init__()
+        self.max_chars = max_chars
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if not self.max_chars:
+            return True
+        message = record.getMessage()
+        if len(message) <= self.max_chars:
+            return True
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        record.msg = (
+            f"{message[: self.max_chars]}... "
+            f"[truncated {len(message) - self.max_chars} chars]"
+        )
+        record.args = None
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queues records without formatting them.
+
+    The stock QueueHandler formats each message on the calling thread; here
+    records are handed over as they are so formatting, truncation and disk
+    writes all happen on the listener thread. Arguments are formatted
+    shortly after the call, so they shouldn't be mutated right after logging.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class LazyColoredFormatter(logging.Formatter):
+    """Console formatter that imports colorlog only when the first record is shown"""
+
+    def __init__(self, fmt, **kwargs):
+        super().__init__()
+        self._colored_args = (fmt, kwargs)
+        self._colored = None
+
+    def format(self, record):
+        if self._colored is None:
+            import colorlog
+
+            fmt, kwargs = self._colored_args
+            self._colored = colorlog.ColoredFormatter(fmt, **kwargs)
+        return self._colored.format(record)
+
+
+class FilteringQueueListener(QueueListener):
+    """Queue listener that applies a filter once before dispatching a record"""
+
+    def __init__(self, queue, *handlers, record_filter=None, **kwargs):
+        super().__init__(queue, *handlers, **kwargs)
+        self.record_filter = record_filter
+
+    def handle(self, record):
+        if self.record_filter is None or self.record_filter.filter(record):
+            super().handle(record)
 
 
 class SpotifyLogger:
     _instance = None
     _logger = None
+    _listener = None
     _default_level = logging.INFO  # Set default to INFO
 
     def __new__(cls):
@@ -50,7 +130,7 @@ class SpotifyLogger:
             )
 
             # Console formatter with colors
-            console_formatter = colorlog.ColoredFormatter(
+            console_formatter = LazyColoredFormatter(
                 "%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s%(reset)s",
                 log_colors={
                     "DEBUG": "cyan",
@@ -66,9 +146,28 @@ class SpotifyLogger:
             file_handler.setFormatter(file_formatter)
             console_handler.setFormatter(console_formatter)
 
-            # Add handlers to the logger
-            self._logger.addHandler(file_handler)
-            self._logger.addHandler(console_handler)
+            # Request threads only enqueue records; a listener thread formats
+            # them and does the (possibly rotating) writes
+            log_queue = queue.SimpleQueue()
+            self._listener = FilteringQueueListener(
+                log_queue,
+                file_handler,
+                console_handler,
+                record_filter=PayloadLimitFilter(
+                    LOG_MAX_MESSAGE_CHARS, LOG_PAYLOAD_SAMPLE_RATE
+                ),
+                respect_handler_level=True,
+            )
+            self._listener.start()
+            atexit.register(self.stop)
+
+            self._logger.addHandler(DeferredQueueHandler(log_queue))
+
+    def stop(self):
+        """Write out all queued records and stop the listener thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
 
     @classmethod
     def get_logger(cls):
@@ -78,41 +177,84 @@ class SpotifyLogger:
         return cls._instance._logger
 
 
-def log_execution(func):
-    """Decorator to log function execution and performance metrics"""
+# Fraction of calls whose timing is logged (errors are always logged)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+# Also log the RSS delta of each call (costs two syscalls per call)
+LOG_MEMORY = os.getenv("LOG_MEMORY", "").lower() in ("1", "true", "yes")
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        logger = SpotifyLogger.get_logger()
-        start_time = time.time()
-        start_memory = psutil.Process().memory_info().rss
+_process = None
 
-        # Log function entry
-        logger.debug(f"Entering {func.__name__} with " f"args={args}, kwargs={kwargs}")
 
-        try:
-            result = func(*args, **kwargs)
+def _rss():
+    """Resident set size of this process, via a cached psutil handle"""
+    global _process
+    if _process is None:
+        import psutil
 
-            # Calculate metrics
-            execution_time = time.time() - start_time
-            end_memory = psutil.Process().memory_info().rss
-            memory_delta = end_memory - start_memory
+        _process = psutil.Process()
+    return _process.memory_info().rss
 
-            # Log success with metrics
-            logger.info(
-                f"Success: {func.__name__} completed in {execution_time:.2f}s, "
-                f"memory delta: {memory_delta/1024/1024:.2f}MB"
-            )
 
-            return result
+def log_execution(func=None, *, sample_rate=None, track_memory=None):
+    """
+    Decorator to log function execution and performance metrics.
 
+    Nearly free when INFO is disabled: arguments are only formatted if DEBUG
+    is enabled, timing uses perf_counter_ns and memory is only sampled on
+    request. Can be used bare (@log_execution) or with options
+    (@log_execution(sample_rate=0.1)).
+
+    Args:
+        func: The function to wrap (when used bare)
+        sample_rate (float): Fraction of calls logged (default: LOG_SAMPLE_RATE)
+        track_memory (bool): Log the RSS delta of each call (default: LOG_MEMORY)
+    """
+    if func is None:
+        return lambda f: log_execution(
+            f, sample_rate=sample_rate, track_memory=track_memory
+        )
+
+    name = func.__name__
+    logger = SpotifyLogger.get_logger()
+    rate = LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    memory = LOG_MEMORY if track_memory is None else track_memory
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        sampled = logger.isEnabledFor(logging.INFO) and (
+            rate >= 1 or random.random() < rate
+        )
+        start_memory = _rss() if sampled and memory else None
+        if sampled:
+            logger.debug("Entering %s with args=%r, kwargs=%r", name, args, kwargs)
+        start_time = time.perf_counter_ns()
+
+        try:
+            result = func(*args, **kwargs)
         except Exception as e:
-            # Log failure with metrics
-            execution_time = time.time() - start_time
+            # Failures are always logged, sampled or not
+            execution_time = (time.perf_counter_ns() - start_time) / 1e9
             logger.error(
-                f"Failed: {func.__name__} error after {execution_time:.2f}s: {str(e)}",
+                "Failed: %s error after %.2fs: %s",
+                name,
+                execution_time,
+                e,
                 exc_info=True,
             )
             raise
 
+        if sampled:
+            execution_time = (time.perf_counter_ns() - start_time) / 1e9
+            if start_memory is not None:
+                memory_delta = _rss() - start_memory
+                logger.info(
+                    "Success: %s completed in %.2fs, memory delta: %.2fMB",
+                    name,
+                    execution_time,
+                    memory_delta / 1024 / 1024,
+                )
+            else:
+                logger.info("Success: %s completed in %.2fs", name, execution_time)
+        return result
+
     return wrapper
@@ -0,0 +1,272 @@
+import atexit
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_ID_SEGMENT_RE = re.compile(r"^(?:[0-9A-Za-z]{22}|\d+)$")
+
+
+def spotify_endpoint(url: str, prefix: str = "https://api.spotify.com/v1/") -> str:
+    """
+    Turn a Spotify API URL into a low-cardinality endpoint label.
+
+    "tracks/4cOdK2wGLETKBW3PvgPWqT" and "https://api.spotify.com/v1/me/tracks?limit=50"
+    become "tracks/{id}" and "me/tracks".
+    """
+    if url.startswith(prefix):
+        url = url[len(prefix) :]
+    path = url.split("?", 1)[0].strip("/")
+    return "/".join(
+        "{id}" if _ID_SEGMENT_RE.match(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+class Histogram:
+    """
+    Latency distribution of one series.
+
+    Keeps an exact count and sum, plus the most recent observations from
+    which the percentiles are computed, so tail latency reflects current
+    behaviour rather than the whole process lifetime.
+
+    Args:
+        window: Number of recent observations kept for percentiles
+    """
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        """Record one observation"""
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self._recent.append(value)
+
+    @staticmethod
+    def _nearest_rank(ordered, q: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile of the recent observations"""
+        return self._nearest_rank(sorted(self._recent), q)
+
+    def summary(self) -> Dict[str, float]:
+        """Count, sum, max and the standard percentiles (p50, p95, p99)"""
+        ordered = sorted(self._recent)
+        summary = {"count": self.count, "sum": self.sum, "max": self.max}
+        for q in QUANTILES:
+            summary[f"p{int(q * 100)}"] = self._nearest_rank(ordered, q)
+        return summary
+
+
+class MetricsRegistry:
+    """
+    In-process registry of latency histograms and counters.
+
+    Series are identified by a metric name and keyword labels, e.g.
+    observe("tool_duration_seconds", 0.42, tool="search_songs").
+
+    Args:
+        window: Recent observations kept per histogram for percentiles
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> Tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one observation (e.g. a duration in seconds)"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.window)
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        """Add to a counter"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str, error_counter: Optional[str] = None, **labels):
+        """
+        Time a block into a histogram
+
+        Args:
+            name: Histogram to record the duration (seconds) in
+            error_counter: Counter incremented if the block raises
+            **labels: Labels of both series
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if error_counter:
+                self.increment(error_counter, **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get all series as plain data"""
+        with self._lock:
+            return {
+                "histograms": {
+                    name: [
+                        {"labels": dict(key), **histogram.summary()}
+                        for key, histogram in series.items()
+                    ]
+                    for name, series in self._histograms.items()
+                },
+                "counters": {
+                    name: [
+                        {"labels": dict(key), "value": value}
+                        for key, value in series.items()
+                    ]
+                    for name, series in self._counters.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format"""
+
+        def label_text(labels, **extra):
+            pairs = list(labels) + [(k, str(v)) for k, v in extra.items()]
+            if not pairs:
+                return ""
+            escaped = (
+                (k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs
+            )
+            return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} summary")
+                for key, histogram in series.items():
+                    for q in QUANTILES:
+                        lines.append(
+                            f"{name}{label_text(key, quantile=q)} {histogram.quantile(q)}"
+                        )
+                    lines.append(f"{name}_sum{label_text(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{label_text(key)} {histogram.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{label_text(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write a JSON snapshot to path (atomically)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"timestamp": time.time(), **self.snapshot()}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def reset(self) -> None:
+        """Drop all series"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    return _metrics
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """
+    Serve the registry in Prometheus text format at http://host:port/metrics
+
+    Args:
+        port: Port to listen on
+        host: Interface to bind (local only by default)
+
+    Returns:
+        ThreadingHTTPServer: The running server (call shutdown() to stop it)
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = get_metrics().render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("Metrics request: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    logger.info(f"Serving metrics at http://{host}:{port}/metrics")
+    return server
+
+
+def start_metrics_dump(path: str, interval: float = 30.0) -> threading.Event:
+    """
+    Write the registry to a JSON file every interval seconds
+
+    Args:
+        path: File to (over)write
+        interval: Seconds between dumps
+
+    Returns:
+        threading.Event: Set it to stop dumping
+    """
+    stop = threading.Event()
+
+    def dump():
+        try:
+            get_metrics().dump(path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {str(e)}")
+
+    def run():
+        while not stop.wait(interval):
+            dump()
+
+    # Keep the final numbers when the process exits between dumps
+    atexit.register(dump)
+    threading.Thread(target=run, name="metrics-dump", daemon=True).start()
+    logger.info(f"Dumping metrics to {path} every {interval:.0f}s")
+    return stop
@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from core.client import get_spotify_client
+from core.logger import SpotifyLogger
+from core.rate_limit import Priority, request_priority
+from core.state_cache import get_state_cache
+
+logger = SpotifyLogger.get_logger()
+
+# Default freshness callers accept from a snapshot (seconds)
+SNAPSHOT_MAX_AGE = float(os.getenv("PLAYBACK_SNAPSHOT_MAX_AGE", "5"))
+
+
+class PlaybackSnapshot(NamedTuple):
+    """
+    Immutable view of the playback state at one point in time.
+
+    playback holds the raw Spotify object the fields were read from; it is
+    shared between readers and must be treated as read-only.
+    """
+
+    fetched_at: float
+    is_playing: bool = False
+    shuffle_state: bool = False
+    repeat_state: str = "off"
+    device_id: Optional[str] = None
+    device_name: Optional[str] = None
+    track_id: Optional[str] = None
+    progress_ms: int = 0
+    duration_ms: int = 0
+    playback: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_playback(cls, playback, fetched_at):
+        """Build a snapshot from a current_playback() response (None if idle)"""
+        if not playback:
+            return cls(fetched_at=fetched_at)
+        device = playback.get("device") or {}
+        item = playback.get("item") or {}
+        return cls(
+            fetched_at=fetched_at,
+            is_playing=bool(playback.get("is_playing")),
+            shuffle_state=bool(playback.get("shuffle_state")),
+            repeat_state=playback.get("repeat_state") or "off",
+            device_id=device.get("id"),
+            device_name=device.get("name"),
+            track_id=item.get("id"),
+            progress_ms=playback.get("progress_ms") or 0,
+            duration_ms=item.get("duration_ms") or 0,
+            playback=playback,
+        )
+
+
+class PlaybackTracker:
+    """
+    Background thread that keeps a fresh playback snapshot.
+
+    It polls current_playback() quickly for a few seconds after each playback
+    command (when the state is changing) and slowly otherwise, waking up
+    early when the current track is about to end. Readers get the latest
+    snapshot without any request, and can bound how old it may be.
+
+    Args:
+        client_factory: Returns the Spotify client to poll with
+        fast_interval: Poll interval right after a command (seconds)
+        slow_interval: Poll interval when idle (seconds)
+        fast_period: How long to keep polling fast after a command (seconds)
+        clock: Monotonic time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        fast_interval: float = 0.5,
+        slow_interval: float = 3.0,
+        fast_period: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client_factory = client_factory
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.fast_period = fast_period
+        self._clock = clock
+        self._snapshot: Optional[PlaybackSnapshot] = None
+        self._command_at = float("-inf")
+        self._fast_until = float("-inf")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the polling thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start polling in a daemon thread and follow playback commands"""
+        if self.running:
+            return
+        get_state_cache().on_invalidate(self.notify_command)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="playback-tracker", daemon=True
+        )
+        self._thread.start()
+        logger.info("Playback tracker started")
+
+    def stop(self) -> None:
+        """Stop the polling thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        logger.info("Playback tracker stopped")
+
+    def notify_command(self) -> None:
+        """
+        Mark the snapshot as outdated by a playback command and poll fast.
+
+        Snapshots fetched before the command are no longer handed out.
+        """
+        now = self._clock()
+        self._command_at = now
+        self._fast_until = now + self.fast_period
+        self._wake.set()
+
+    def snapshot(self, max_age: float = SNAPSHOT_MAX_AGE) -> Optional[PlaybackSnapshot]:
+        """
+        Get the latest snapshot if it is fresh enough
+
+        Args:
+            max_age: Oldest acceptable snapshot in seconds
+
+        Returns:
+            PlaybackSnapshot: The snapshot, or None if there is none, it is
+                              older than max_age or predates the last command
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.fetched_at < self._command_at:
+            return None
+        if self._clock() - snapshot.fetched_at > max_age:
+            return None
+        return snapshot
+
+    def poll(self) -> PlaybackSnapshot:
+        """Fetch the playback state once and publish it"""
+        started = self._clock()
+        playback = self.client_factory().current_playback()
+        snapshot = PlaybackSnapshot.from_playback(playback, started)
+        self._snapshot = snapshot
+        # A state fetched before the latest command may already be outdated
+        if started >= self._command_at:
+            get_state_cache().set_playback(playback)
+        return snapshot
+
+    def next_interval(self, snapshot: Optional[PlaybackSnapshot]) -> float:
+        """Seconds until the next poll"""
+        if self._clock() < self._fast_until:
+            return self.fast_interval
+        interval = self.slow_interval
+        if snapshot is not None and snapshot.is_playing and snapshot.duration_ms:
+            # Catch the track change shortly after the current track ends
+            remaining = (snapshot.duration_ms - snapshot.progress_ms) / 1000
+            interval = min(interval, max(remaining + 0.2, self.fast_interval))
+        return interval
+
+    @request_priority(Priority.BULK)
+    def _run(self):
+        """Poll until stopped (as background traffic, behind user commands)"""
+        snapshot = None
+        while not self._stop.is_set():
+            try:
+                snapshot = self.poll()
+            except Exception as e:
+                logger.warning(f"Playback tracker poll failed: {str(e)}")
+            if self._wake.wait(self.next_interval(snapshot)):
+                self._wake.clear()
+                # Give Spotify a moment to apply the command before re-reading
+                self._stop.wait(self.fast_interval)
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_playback_tracker() -> PlaybackTracker:
+    """Get the shared playback tracker (not started until start() is called)"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = PlaybackTracker(get_spotify_client)
+    return _tracker
@@ -0,0 +1,44 @@
+import time
+from typing import Any, Callable, Optional
+
+
+def wait_for(
+    predicate: Callable[[], Any],
+    timeout: float = 2.0,
+    initial_delay: float = 0.03,
+    factor: float = 2.0,
+    max_delay: float = 0.5,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Optional[Any]:
+    """
+    Poll predicate with exponential backoff until it returns a truthy value.
+
+    The first check happens after initial_delay, and the delay doubles (by
+    factor) up to max_delay, so a state change that lands quickly is seen
+    within tens of milliseconds while a slow one isn't polled too hard. The
+    last check happens at the deadline.
+
+    Args:
+        predicate: Called with no arguments; a truthy return value ends the wait
+        timeout: Overall deadline in seconds
+        initial_delay: Delay before the first check in seconds
+        factor: Multiplier applied to the delay after each check
+        max_delay: Upper bound for a single delay in seconds
+        clock: Monotonic time source, injectable for tests
+        sleep: Sleep function, injectable for tests
+
+    Returns:
+        The first truthy value returned by predicate, or None on timeout
+    """
+    deadline = clock() + timeout
+    delay = initial_delay
+    while True:
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return None
+        sleep(min(delay, remaining))
+        value = predicate()
+        if value:
+            return value
+        delay = min(delay * factor, max_delay)
@@ -0,0 +1,248 @@
+"""
+Shared scheduling of Spotify API requests.
+
+Every request takes a token from a bucket before it is sent. Requests
+waiting for a token are served by priority class (then arrival), so
+playback control the user is waiting on goes ahead of library pagination.
+Bulk requests draw from a bucket of their own: a library sync never uses
+up the tokens interactive requests need, and runs at its own rate while
+nothing more urgent is waiting. When Spotify answers 429 all requests
+pause until its Retry-After has passed.
+
+The priority class travels in a contextvar:
+    with request_priority(Priority.BULK):
+        sync_library(sp)
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Callable, Optional
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+# Sustained requests per second, and how many may be sent in a burst
+REQUEST_RATE = float(os.getenv("SPOTIFY_REQUEST_RATE", "10"))
+REQUEST_BURST = float(os.getenv("SPOTIFY_REQUEST_BURST", "20"))
+# Budget of BULK requests (library pagination); bounds the time of a full sync
+BULK_REQUEST_RATE = float(os.getenv("SPOTIFY_BULK_REQUEST_RATE", "25"))
+BULK_REQUEST_BURST = float(os.getenv("SPOTIFY_BULK_REQUEST_BURST", "50"))
+# Longest Retry-After a request waits out; longer ones fail immediately
+MAX_RETRY_WAIT = float(os.getenv("SPOTIFY_MAX_RETRY_WAIT", "30"))
+
+
+class Priority(IntEnum):
+    """Request classes, served lowest value first"""
+
+    INTERACTIVE = 0  # Playback control and device lookups the user waits on
+    DEFAULT = 1
+    BULK = 2  # Library pagination and background polling
+
+
+class RateLimitExceeded(Exception):
+    """Spotify asked to back off for longer than a request is allowed to wait"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Spotify rate limit reached, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.DEFAULT
+)
+
+
+def current_priority() -> Priority:
+    """Get the priority class of requests made in the current context"""
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority):
+    """
+    Send the Spotify requests of a block in the given priority class
+
+    Also usable as a decorator. Work handed to a thread pool keeps the class
+    when submitted through core.tracing.bind_context.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """
+    Read a Retry-After header (seconds or an HTTP date)
+
+    Args:
+        value: Header value, or None if it was missing
+        default: Seconds to use if the header is missing or unreadable
+
+    Returns:
+        float: Seconds to wait (never negative)
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class _TokenBucket:
+    """Tokens added at rate per second, up to burst (rate <= 0: unlimited)"""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        if self.rate <= 0:
+            self.tokens = self.burst
+        elif now > self.updated:
+            elapsed = now - self.updated
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def time_to_token(self) -> float:
+        """Seconds until a whole token is available (after a refill)"""
+        if self.rate <= 0:
+            return 0.0
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def restart(self, at: float) -> None:
+        """Start again from one token at the given time"""
+        self.tokens = min(1.0, self.burst)
+        self.updated = at
+
+
+class RequestScheduler:
+    """
+    Token buckets with priority-ordered waiting and Retry-After pauses.
+
+    Interactive and default requests share one bucket, bulk requests use
+    their own. A bulk request still waits while any request of a more urgent
+    class is waiting.
+
+    Args:
+        rate: Tokens added per second (<= 0 disables the bucket)
+        burst: Bucket capacity
+        bulk_rate: Tokens added per second to the BULK bucket
+        bulk_burst: Capacity of the BULK bucket
+        max_retries: Times a request is retried after a 429
+        max_wait: Longest Retry-After pause a request waits out
+        clock: Monotonic time source
+    """
+
+    def __init__(
+        self,
+        rate: float = REQUEST_RATE,
+        burst: float = REQUEST_BURST,
+        bulk_rate: float = BULK_REQUEST_RATE,
+        bulk_burst: float = BULK_REQUEST_BURST,
+        max_retries: int = 3,
+        max_wait: float = MAX_RETRY_WAIT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self._clock = clock
+        now = clock()
+        self._bucket = _TokenBucket(rate, burst, now)
+        self._bulk_bucket = _TokenBucket(bulk_rate, bulk_burst, now)
+        self._blocked_until = 0.0
+        self._waiting = []  # Heap of (priority, arrival) tickets
+        self._arrivals = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, priority: Optional[Priority] = None) -> float:
+        """
+        Wait until a request of this priority may be sent
+
+        Args:
+            priority: Request class (default: the one of the current context)
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: Spotify asked to back off for longer than max_wait
+        """
+        priority = current_priority() if priority is None else priority
+        bucket = self._bulk_bucket if priority == Priority.BULK else self._bucket
+        start = self._clock()
+
+        with self._cond:
+            ticket = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    blocked = self._blocked_until - now
+                    if blocked > self.max_wait:
+                        raise RateLimitExceeded(blocked)
+
+                    timeout = None  # Not first in line: wait to be notified
+                    if self._waiting[0] == ticket:
+                        bucket.refill(now)
+                        if blocked <= 0 and bucket.tokens >= 1:
+                            bucket.tokens -= 1
+                            heapq.heappop(self._waiting)
+                            # Let the next in line check its bucket
+                            self._cond.notify_all()
+                            return now - start
+                        timeout = max(blocked, bucket.time_to_token())
+                    self._cond.wait(timeout)
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def on_rate_limited(self, retry_after: float) -> None:
+        """
+        Pause all requests after a 429
+
+        Args:
+            retry_after: Seconds Spotify asked to wait
+        """
+        with self._cond:
+            now = self._clock()
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+            # The buckets were fuller than Spotify's: once the pause is over,
+            # start again from one token instead of a full burst
+            self._bucket.restart(self._blocked_until)
+            self._bulk_bucket.restart(self._blocked_until)
+            self._cond.notify_all()
+        logger.warning(
+            f"Spotify rate limit hit, pausing requests for {retry_after:.1f}s"
+        )
+
+    def waiting(self) -> int:
+        """Number of requests currently waiting for a token"""
+        with self._cond:
+            return len(self._waiting)
+
+
+_scheduler = RequestScheduler()
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """Get the process-wide Spotify request scheduler"""
+    return _scheduler
@@ -0,0 +1,183 @@
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+from core.library import LibraryStore
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, strip accents and split text into alphanumeric tokens"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(text)
+
+
+def _trigrams(term: str) -> set:
+    """Get the padded character trigrams of a term"""
+    padded = f"${term}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class LibraryIndex:
+    """
+    In-memory inverted index over track name, artist and album.
+
+    Ranking is BM25 with per-field weights. Query terms that don't occur in
+    the library are expanded to vocabulary terms they prefix, or failing
+    that to terms with similar character trigrams, so partial words and
+    typos still match. A trailing "*" forces a prefix query.
+    """
+
+    k1 = 1.2
+    b = 0.75
+    field_weights = {"name": 3.0, "artist": 2.0, "album": 1.0}
+    max_expansions = 20  # Vocabulary terms a prefix/fuzzy term may expand to
+    min_similarity = 0.3  # Minimum trigram Jaccard similarity for fuzzy matches
+
+    def __init__(self, tracks: List[Dict[str, Any]]):
+        self.tracks = tracks
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_lengths: List[float] = []
+
+        for doc_id, track in enumerate(tracks):
+            doc_length = 0.0
+            for field, weight in self.field_weights.items():
+                for term in tokenize(track.get(field) or ""):
+                    postings = self._postings[term]
+                    postings[doc_id] = postings.get(doc_id, 0.0) + weight
+                    doc_length += weight
+            self._doc_lengths.append(doc_length)
+
+        avg_length = sum(self._doc_lengths) / len(tracks) if tracks else 1.0
+        self._length_norms = [
+            1 - self.b + self.b * length / (avg_length or 1.0)
+            for length in self._doc_lengths
+        ]
+        self._vocabulary = sorted(self._postings)
+        self._trigram_index: Dict[str, set] = defaultdict(set)
+        for term in self._vocabulary:
+            for gram in _trigrams(term):
+                self._trigram_index[gram].add(term)
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def _idf(self, term: str) -> float:
+        """BM25 inverse document frequency"""
+        n = len(self._postings[term])
+        return math.log(1 + (len(self.tracks) - n + 0.5) / (n + 0.5))
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        """Get vocabulary terms starting with prefix"""
+        terms = []
+        i = bisect_left(self._vocabulary, prefix)
+        while (
+            i < len(self._vocabulary)
+            and self._vocabulary[i].startswith(prefix)
+            and len(terms) < self.max_expansions
+        ):
+            terms.append(self._vocabulary[i])
+            i += 1
+        return terms
+
+    def _fuzzy_terms(self, term: str) -> List[Tuple[str, float]]:
+        """Get vocabulary terms whose trigrams are similar to term's"""
+        grams = _trigrams(term)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._trigram_index.get(gram, ()):
+                shared[candidate] += 1
+
+        matches = []
+        for candidate, common in shared.items():
+            similarity = common / (len(grams) + len(_trigrams(candidate)) - common)
+            if similarity >= self.min_similarity:
+                matches.append((candidate, similarity))
+        matches.sort(key=lambda m: -m[1])
+        return matches[: self.max_expansions]
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Map a query term to (vocabulary term, match weight) pairs"""
+        if term.endswith("*"):
+            return [(t, 0.9) for t in self._prefix_terms(term.rstrip("*"))]
+        if term in self._postings:
+            return [(term, 1.0)]
+        prefix_terms = self._prefix_terms(term) if len(term) >= 2 else []
+        if prefix_terms:
+            return [(t, 0.9) for t in prefix_terms]
+        if len(term) >= 3:
+            return [(t, 0.8 * sim) for t, sim in self._fuzzy_terms(term)]
+        return []
+
+    def search(
+        self, query: str, limit: int = 10, min_coverage: float = 1.0
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Search the index.
+
+        Args:
+            query: Free-text query; a trailing "*" on a word makes it a prefix
+            limit: Maximum number of results to return
+            min_coverage: Fraction of query words a track must match
+
+        Returns:
+            List of (score, track) tuples, best match first
+        """
+        query_terms = [
+            t + "*" if word.endswith("*") else t
+            for word in query.split()
+            for t in tokenize(word)
+        ]
+        if not query_terms or not self.tracks:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        matched_terms: Dict[int, int] = defaultdict(int)
+        for query_term in query_terms:
+            term_scores: Dict[int, float] = {}
+            for term, weight in self._expand(query_term):
+                idf = self._idf(term)
+                for doc_id, tf in self._postings[term].items():
+                    norm = self._length_norms[doc_id]
+                    score = weight * idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+                    # Count each query term once, using its best expansion
+                    if score > term_scores.get(doc_id, 0.0):
+                        term_scores[doc_id] = score
+            for doc_id, score in term_scores.items():
+                scores[doc_id] += score
+                matched_terms[doc_id] += 1
+
+        required = min_coverage * len(query_terms)
+        results = [
+            (score, self.tracks[doc_id])
+            for doc_id, score in scores.items()
+            if matched_terms[doc_id] >= required
+        ]
+        results.sort(key=lambda r: -r[0])
+        return results[:limit]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_library_index() -> LibraryIndex:
+    """Get an index over the library store, rebuilding it if the store changed"""
+    global _index, _index_version
+    store = LibraryStore()
+    with _index_lock:
+        if _index is None or _index_version != store.version:
+            version = store.version
+            _index = LibraryIndex(store.get_tracks())
+            _index_version = version
+            logger.debug(f"Built library search index over {len(_index)} tracks")
+        return _index
@@ -0,0 +1,130 @@
+"""
+Import-time profiling of the assistant's startup.
+
+Runs a fresh interpreter with ``-X importtime`` and summarizes where the
+time before the first prompt goes, by module and by top-level package.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple
+
+
+class ImportTiming(NamedTuple):
+    """One line of -X importtime output (times in microseconds)"""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """
+    Parse the stderr of ``python -X importtime``
+
+    Args:
+        output: Captured stderr; lines that aren't import timings are skipped
+
+    Returns:
+        list: One ImportTiming per imported module, in completion order
+    """
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # The column header
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped,
+                self_us=int(parts[0]),
+                cumulative_us=int(parts[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def package_totals(timings: List[ImportTiming]) -> Dict[str, int]:
+    """Self time summed per top-level package (microseconds), slowest first"""
+    totals: Dict[str, int] = {}
+    for timing in timings:
+        package = timing.module.split(".", 1)[0]
+        totals[package] = totals.get(package, 0) + timing.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def format_report(
+    timings: List[ImportTiming], wall_seconds: float, target: str, top: int = 15
+) -> str:
+    """
+    Render the startup report
+
+    Args:
+        timings: Parsed import timings
+        wall_seconds: Wall-clock time of the whole child interpreter
+        target: Module whose import was profiled
+        top: Rows shown per table
+
+    Returns:
+        str: Report text
+    """
+    roots = [t for t in timings if t.depth == 0]
+    target_us = next((t.cumulative_us for t in roots if t.module == target), 0)
+    lines = [
+        f"Startup profile of 'import {target}'",
+        f"  interpreter + imports: {wall_seconds * 1000:8.1f} ms (wall clock)",
+        f"  import {target}: {target_us / 1000:13.1f} ms "
+        f"({len(timings)} modules imported)",
+        "",
+        "Slowest packages (self time of all their modules):",
+    ]
+    for package, total_us in list(package_totals(timings).items())[:top]:
+        lines.append(f"  {total_us / 1000:8.1f} ms  {package}")
+
+    lines += ["", "Slowest modules (including what they import):"]
+    by_cumulative = sorted(timings, key=lambda t: t.cumulative_us, reverse=True)
+    for timing in by_cumulative[:top]:
+        lines.append(
+            f"  {timing.cumulative_us / 1000:8.1f} ms  "
+            f"{'  ' * timing.depth}{timing.module}"
+            f"  (self {timing.self_us / 1000:.1f} ms)"
+        )
+    return "\n".join(lines)
+
+
+def profile_startup(target: str = "assistant", top: int = 15) -> int:
+    """
+    Import target in a fresh interpreter under -X importtime and print a report
+
+    Args:
+        target: Module to import
+        top: Rows shown per table
+
+    Returns:
+        int: Exit code of the child interpreter
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+    )
+    wall_seconds = time.perf_counter() - start
+
+    timings = parse_importtime(child.stderr)
+    if child.returncode != 0:
+        errors = [
+            line for line in child.stderr.splitlines() if "import time:" not in line
+        ]
+        print("\n".join(errors), file=sys.stderr)
+    print(format_report(timings, wall_seconds, target, top))
+    return child.returncode
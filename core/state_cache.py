@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import spotipy
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+
+class PlaybackStateCache:
+    """
+    Process-wide short-lived cache of the device list and playback state.
+
+    One playback command used to fetch current_playback() and devices()
+    several times; with the cache they are fetched at most once per TTL and
+    shared by player_controls, play_song and ensure_playback. Entries are
+    dropped whenever we change playback, and the last device we played on
+    is remembered so it can be preferred next time.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+    playback_ttl = float(os.getenv("PLAYBACK_STATE_TTL", "3"))
+    devices_ttl = float(os.getenv("DEVICE_LIST_TTL", "30"))
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._entries = {}
+                    instance._entries_lock = threading.Lock()
+                    instance._last_device = (None, None)
+                    instance._listeners = []
+                    instance._clock = time.monotonic
+                    cls._instance = instance
+        return cls._instance
+
+    def _get(self, key: str, ttl: float, fetch):
+        """Get a live entry, fetching and storing it on a miss"""
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                logger.debug(f"Using cached {key}")
+                return entry[1]
+
+        value = fetch()
+        with self._entries_lock:
+            self._entries[key] = (self._clock() + ttl, value)
+        return value
+
+    def get_devices(self, sp: spotipy.Spotify) -> List[Dict[str, Any]]:
+        """
+        Get the available devices
+
+        Args:
+            sp (spotipy.Spotify): Authenticated Spotify client
+
+        Returns:
+            list: Device dicts as returned by the Spotify API
+        """
+        return self._get(
+            "devices",
+            self.devices_ttl,
+            lambda: (sp.devices() or {}).get("devices", []),
+        )
+
+    def get_playback(self, sp: spotipy.Spotify) -> Optional[Dict[str, Any]]:
+        """
+        Get the current playback state
+
+        Args:
+            sp (spotipy.Spotify): Authenticated Spotify client
+
+        Returns:
+            dict: Current playback object, or None if nothing is playing
+        """
+        return self._get("playback", self.playback_ttl, sp.current_playback)
+
+    def set_playback(self, playback: Optional[Dict[str, Any]]) -> None:
+        """Store a playback state fetched elsewhere"""
+        with self._entries_lock:
+            self._entries["playback"] = (self._clock() + self.playback_ttl, playback)
+
+    def invalidate(self, devices: bool = False) -> None:
+        """
+        Drop the cached playback state after a playback command
+
+        Args:
+            devices (bool): Also drop the device list (e.g. after a transfer)
+        """
+        with self._entries_lock:
+            self._entries.pop("playback", None)
+            if devices:
+                self._entries.pop("devices", None)
+        for listener in list(self._listeners):
+            listener()
+
+    def on_invalidate(self, listener) -> None:
+        """Register a callback run after every invalidation (i.e. every command)"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remember_device(self, device_id: str, device_name: str) -> None:
+        """Record the device playback was last started on"""
+        self._last_device = (device_id, device_name)
+
+    @property
+    def last_device(self) -> Tuple[Optional[str], Optional[str]]:
+        """(device_id, device_name) of the last device used, or (None, None)"""
+        return self._last_device
+
+    def clear(self) -> None:
+        """Forget everything, including the last device"""
+        with self._entries_lock:
+            self._entries.clear()
+        self._last_device = (None, None)
+
+
+def get_state_cache() -> PlaybackStateCache:
+    """Get the shared playback state cache"""
+    return PlaybackStateCache()
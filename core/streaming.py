@@ -0,0 +1,91 @@
+from typing import Any, Callable, Iterable, List, Optional
+
+
+class StreamedFunction:
+    """Function name and JSON arguments of a tool call assembled from deltas"""
+
+    def __init__(self):
+        self.name = ""
+        self.arguments = ""
+
+
+class StreamedToolCall:
+    """Tool call assembled from streamed deltas, shaped like the OpenAI object"""
+
+    def __init__(self):
+        self.id = None
+        self.type = "function"
+        self.function = StreamedFunction()
+
+
+class StreamedMessage:
+    """Assistant message assembled from a streamed completion"""
+
+    def __init__(self, content: str, tool_calls: List[StreamedToolCall]):
+        self.content = content
+        self.tool_calls = tool_calls or None
+
+
+def collect_stream(
+    chunks: Iterable[Any],
+    on_text: Optional[Callable[[str], None]] = None,
+    on_tool_call: Optional[Callable[[StreamedToolCall], None]] = None,
+) -> StreamedMessage:
+    """
+    Assemble a streamed chat completion into a message.
+
+    Text deltas are passed to on_text as they arrive. Tool calls stream one
+    after another by index, so a tool call is complete as soon as the next
+    one starts (or the stream ends); on_tool_call is invoked at that point
+    so the tool can start while the rest of the response is still streaming.
+
+    Args:
+        chunks: Chat completion chunks from a stream=True request
+        on_text: Called with each text delta
+        on_tool_call: Called with each tool call once its arguments are complete
+
+    Returns:
+        StreamedMessage: The full content and tool calls
+    """
+    content = []
+    tool_calls: List[StreamedToolCall] = []
+    index_map = {}  # Delta index -> position in tool_calls
+    completed = 0  # Tool calls already handed to on_tool_call
+
+    def complete_up_to(count):
+        nonlocal completed
+        while completed < count:
+            if on_tool_call:
+                on_tool_call(tool_calls[completed])
+            completed += 1
+
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            content.append(delta.content)
+            if on_text:
+                on_text(delta.content)
+
+        for tool_delta in delta.tool_calls or []:
+            if tool_delta.index not in index_map:
+                # A new tool call means every earlier one is complete
+                complete_up_to(len(tool_calls))
+                index_map[tool_delta.index] = len(tool_calls)
+                tool_calls.append(StreamedToolCall())
+
+            tool_call = tool_calls[index_map[tool_delta.index]]
+            if tool_delta.id:
+                tool_call.id = tool_delta.id
+            if tool_delta.type:
+                tool_call.type = tool_delta.type
+            if tool_delta.function:
+                if tool_delta.function.name:
+                    tool_call.function.name += tool_delta.function.name
+                if tool_delta.function.arguments:
+                    tool_call.function.arguments += tool_delta.function.arguments
+
+    complete_up_to(len(tool_calls))
+    return StreamedMessage("".join(content), tool_calls)
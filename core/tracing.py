@@ -0,0 +1,289 @@
+"""
+Span-based tracing of conversation turns.
+
+Each turn is a trace; completions, tool calls, Spotify and SerpAPI requests
+and the slow parts of playback recovery are nested spans. The current span
+travels in a contextvar, so work handed to a thread pool through
+bind_context() is attributed to the span that submitted it. Finished spans
+are appended to a JSON-lines file.
+
+Print a per-turn waterfall of the recorded traces with:
+    python -m core.tracing [--file PATH] [--last N] [--trace ID]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+TRACE_PATH = os.path.join(os.path.dirname(__file__), "logs", "traces.jsonl")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation within a trace.
+
+    Args:
+        name: Operation name, e.g. "tool search_songs"
+        trace_id: ID shared by every span of the trace
+        parent_id: span_id of the enclosing span, or None for the root
+        attributes: Extra key/value details
+    """
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration = None
+        self.status = "ok"
+        self.error = None
+        self.thread = threading.current_thread().name
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span"""
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._start_perf
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "thread": self.thread,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Creates spans and exports finished ones as JSON lines.
+
+    Disabled by default; a disabled tracer's span() does nothing but yield None.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = TRACE_PATH
+        self._file = None
+        self._lock = threading.Lock()
+
+    def enable(self, path: str = TRACE_PATH) -> None:
+        """Start recording spans to path (appending)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            self.path = path
+            self._file = open(path, "a", encoding="utf-8")
+            self.enabled = True
+        logger.info(f"Tracing to {path}")
+
+    def disable(self) -> None:
+        """Stop recording spans"""
+        with self._lock:
+            self.enabled = False
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @contextmanager
+    def span(self, name: str, new_trace: bool = False, **attributes):
+        """
+        Time a block as a span, nested under the current span
+
+        Args:
+            name: Operation name
+            new_trace: Start a new trace even if a span is active
+            **attributes: Details recorded with the span
+
+        Yields:
+            Span: The active span, or None if tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = None if new_trace else _current_span.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = str(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self._export(span, flush=parent is None)
+
+    def _export(self, span: Span, flush: bool) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            if flush:
+                self._file.flush()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer"""
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    """Get the active span, if any"""
+    return _current_span.get()
+
+
+def bind_context(function: Callable) -> Callable:
+    """
+    Bind function to a copy of the current context (and so the current span)
+
+    Use when handing work to a thread pool:
+        executor.submit(bind_context(function), *args)
+    """
+    context = copy_context()
+
+    @wraps(function)
+    def run(*args, **kwargs):
+        return context.run(function, *args, **kwargs)
+
+    return run
+
+
+def traced(name: Optional[str] = None):
+    """Decorator that wraps each call of a function in a span"""
+
+    def decorate(function):
+        span_name = name or function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with _tracer.span(span_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def load_traces(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Read a trace file into {trace_id: [span, ...]} in file order"""
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                span = json.loads(line)
+            except ValueError:
+                continue
+            traces.setdefault(span["trace_id"], []).append(span)
+    return traces
+
+
+def format_waterfall(spans: List[Dict[str, Any]], width: int = 40) -> str:
+    """
+    Render one trace as an indented waterfall
+
+    Args:
+        spans: All spans of one trace
+        width: Width of the timeline bars in characters
+
+    Returns:
+        str: One line per span, children under their parents
+    """
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    span_ids = {span["span_id"] for span in spans}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in span_ids else None
+        children.setdefault(parent, []).append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda s: s["start"])
+
+    start = min(span["start"] for span in spans)
+    end = max(span["start"] + span["duration_ms"] / 1000 for span in spans)
+    total = max(end - start, 1e-9)
+    root = children.get(None, [spans[0]])[0]
+
+    lines = [
+        f"trace {root['trace_id']}  {root['name']}  {total * 1000:.0f}ms"
+        + (f"  {json.dumps(root['attributes'])}" if root["attributes"] else "")
+    ]
+
+    def render(span, depth):
+        offset = span["start"] - start
+        left = int(offset / total * width)
+        length = max(1, round(span["duration_ms"] / 1000 / total * width))
+        bar = " " * left + "█" * min(length, width - left)
+        marker = " !" if span["status"] == "error" else ""
+        lines.append(
+            f"{offset * 1000:8.0f}ms |{bar:<{width}}| {span['duration_ms']:8.1f}ms "
+            f"{'  ' * depth}{span['name']}{marker}"
+        )
+        for child in children.get(span["span_id"], []):
+            render(child, depth + 1)
+
+    for top in children.get(None, []):
+        render(top, 0)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print recorded traces as waterfalls")
+    parser.add_argument("--file", default=TRACE_PATH, help="Trace file to read")
+    parser.add_argument(
+        "--last", type=int, default=5, help="Number of most recent traces to show"
+    )
+    parser.add_argument("--trace", help="Show only this trace ID")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"No trace file at {args.file} (run the assistant with --trace)")
+        return
+
+    traces = load_traces(args.file)
+    if args.trace:
+        selected = [traces[args.trace]] if args.trace in traces else []
+    else:
+        selected = list(traces.values())[-args.last :]
+    if not selected:
+        print("No matching traces")
+    for spans in selected:
+        print(format_waterfall(spans))
+        print()
+
+
+if __name__ == "__main__":
+    main()
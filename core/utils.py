@@ -1,14 +1,26 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import spotipy
-import time
 from core.logger import SpotifyLogger, log_execution
+from core.polling import wait_for
+from core.state_cache import get_state_cache
+from core.tracing import bind_context, traced
 
 logger = SpotifyLogger.get_logger()
 
+# Seconds to wait for Spotify to report a started playback
+PLAYBACK_CONFIRM_TIMEOUT = float(os.getenv("PLAYBACK_CONFIRM_TIMEOUT", "2"))
 
+# Runs the independent Spotify lookups of a playback recovery in parallel
+lookup_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lookup")
+
+
+@traced()
 def get_best_device(sp: spotipy.Spotify):
     """
     Get the best available device based on prioritized device types.
-    Prioritizes desktop clients over mobile, and both over web players.
+    Prioritizes the device we last played on if it is still available, then
+    desktop clients over mobile, and both over web players.
 
     Args:
         sp (spotipy.Spotify): Authenticated Spotify client
@@ -17,14 +29,21 @@ def get_best_device(sp: spotipy.Spotify):
         tuple: (device_id, device_name) of the best device, or (None, None) if no devices available
     """
     try:
-        # Get available devices
-        devices = sp.devices()
-        available_devices = devices.get("devices", [])
+        # Get available devices (shared with the other tools for a short TTL)
+        state = get_state_cache()
+        available_devices = state.get_devices(sp)
 
         if not available_devices:
             logger.info("No active devices found")
             return None, None
 
+        # Stick with the device we last played on
+        last_id, _ = state.last_device
+        last_device = next((d for d in available_devices if d["id"] == last_id), None)
+        if last_device:
+            logger.debug(f"Reusing last device: {last_device['name']}")
+            return last_device["id"], last_device["name"]
+
         # Device type priorities (lower number = higher priority)
         device_priority = {
             "Computer": 1,  # Desktop client
@@ -70,13 +89,70 @@ def get_best_device(sp: spotipy.Spotify):
         return None, None
 
 
+def start_playback(sp: spotipy.Spotify, device_id, device_name, uris=None):
+    """
+    Start playback on a device and record it in the playback state cache
+
+    Args:
+        sp (spotipy.Spotify): Authenticated Spotify client
+        device_id (str): Device to play on (None for the active device)
+        device_name (str): Device name, remembered alongside the ID
+        uris (list, optional): Track URIs to play; resumes the current item if omitted
+    """
+    state = get_state_cache()
+    try:
+        sp.start_playback(device_id=device_id, uris=uris)
+    finally:
+        state.invalidate()
+    if device_id:
+        state.remember_device(device_id, device_name)
+
+
+@traced()
+def wait_until_playing(sp: spotipy.Spotify, timeout=PLAYBACK_CONFIRM_TIMEOUT):
+    """
+    Poll the playback state until Spotify reports that something is playing
+
+    Args:
+        sp (spotipy.Spotify): Authenticated Spotify client
+        timeout (float): Seconds to wait before giving up
+
+    Returns:
+        dict: Current playback object, or None if playback didn't start in time
+    """
+    state = get_state_cache()
+
+    def check():
+        playback = sp.current_playback()
+        state.set_playback(playback)
+        return playback if playback and playback.get("is_playing") else None
+
+    return wait_for(check, timeout=timeout)
+
+
+def _first_track_id(future, source):
+    """Get the first track ID from a recently played/saved tracks lookup"""
+    try:
+        tracks = future.result()
+        if tracks and tracks.get("items"):
+            return tracks["items"][0]["track"]["id"]
+    except Exception as e:
+        logger.warning(f"Error looking up {source}: {str(e)}")
+    return None
+
+
 @log_execution
+@traced()
 def ensure_playback(sp: spotipy.Spotify, track_id=None):
     """
     Ensures there's an active playback by attempting recovery strategies.
     First tries to resume currently paused playback, then tries playing most recently played track,
     and finally plays a new track if needed.
 
+    Everything the strategies need (devices, playback state, the most recently
+    played and the newest saved track) is looked up concurrently up front, so
+    a recovery costs one round trip plus one playback start.
+
     Args:
         sp (spotipy.Spotify): Authenticated Spotify client
         track_id (str, optional): Specific track ID to play if no current playback
@@ -86,14 +162,24 @@ def ensure_playback(sp: spotipy.Spotify, track_id=None):
         dict: Current playback object from Spotify if successful
     """
     try:
+        state = get_state_cache()
+        device_future = lookup_executor.submit(bind_context(get_best_device), sp)
+        playback_future = lookup_executor.submit(bind_context(state.get_playback), sp)
+        recent_future = lookup_executor.submit(
+            bind_context(sp.current_user_recently_played), limit=1
+        )
+        saved_future = lookup_executor.submit(
+            bind_context(sp.current_user_saved_tracks), limit=1
+        )
+
         # Get best device
-        device_id, device_name = get_best_device(sp)
+        device_id, device_name = device_future.result()
         if not device_id:
             logger.warning("No available devices found")
             return False, None
 
         # Check current playback state
-        current_playback = sp.current_playback()
+        current_playback = playback_future.result()
 
         # If already playing, nothing to do
         if current_playback and current_playback.get("is_playing"):
@@ -102,66 +188,37 @@ def ensure_playback(sp: spotipy.Spotify, track_id=None):
             )
             return True, current_playback
 
-        # Strategy 1: Resume if we have a paused track
-        if current_playback and current_playback.get("item"):
-            logger.info("Found paused playback, resuming")
-            sp.start_playback(device_id=device_id)
-            time.sleep(1)
-            current_playback = sp.current_playback()
-            if current_playback and current_playback.get("is_playing"):
-                logger.info(f"Successfully resumed playback on {device_name}")
-                return True, current_playback
-
-        # Strategy 2: Use provided track ID if available
-        if track_id:
-            logger.info(f"Playing specified track {track_id}")
-            sp.start_playback(device_id=device_id, uris=[f"spotify:track:{track_id}"])
-            time.sleep(1)
-            current_playback = sp.current_playback()
-            if current_playback and current_playback.get("is_playing"):
-                logger.info(
-                    f"Successfully started playback of provided track on {device_name}"
-                )
+        def strategies():
+            """Yield (description, uris) in order of preference"""
+            # Strategy 1: Resume if we have a paused track
+            if current_playback and current_playback.get("item"):
+                yield "paused playback", None
+            # Strategy 2: Use provided track ID if available
+            if track_id:
+                yield f"provided track {track_id}", [f"spotify:track:{track_id}"]
+            # Strategy 3: Try to play recently played track
+            recent_id = _first_track_id(recent_future, "recently played tracks")
+            if recent_id:
+                yield f"recently played track {recent_id}", [
+                    f"spotify:track:{recent_id}"
+                ]
+            # Strategy 4: As a last resort, try to play user's saved tracks
+            saved_id = _first_track_id(saved_future, "saved tracks")
+            if saved_id:
+                yield f"saved track {saved_id}", [f"spotify:track:{saved_id}"]
+
+        for description, uris in strategies():
+            logger.info(f"Trying to start {description} on {device_name}")
+            try:
+                start_playback(sp, device_id, device_name, uris=uris)
+                current_playback = wait_until_playing(sp)
+            except Exception as e:
+                logger.warning(f"Error trying to play {description}: {str(e)}")
+                continue
+            if current_playback:
+                logger.info(f"Successfully started {description} on {device_name}")
                 return True, current_playback
 
-        # Strategy 3: Try to play recently played track
-        try:
-            recent_tracks = sp.current_user_recently_played(limit=1)
-            if recent_tracks and recent_tracks.get("items"):
-                recent_id = recent_tracks["items"][0]["track"]["id"]
-                logger.info(f"Playing recently played track {recent_id}")
-                sp.start_playback(
-                    device_id=device_id, uris=[f"spotify:track:{recent_id}"]
-                )
-                time.sleep(1)
-                current_playback = sp.current_playback()
-                if current_playback and current_playback.get("is_playing"):
-                    logger.info(
-                        f"Successfully started playback of recent track on {device_name}"
-                    )
-                    return True, current_playback
-        except Exception as e:
-            logger.warning(f"Error trying to play recently played tracks: {str(e)}")
-
-        # Strategy 4: As a last resort, try to play user's saved tracks
-        try:
-            saved_tracks = sp.current_user_saved_tracks(limit=1)
-            if saved_tracks and saved_tracks.get("items"):
-                saved_id = saved_tracks["items"][0]["track"]["id"]
-                logger.info(f"Playing a track from user's saved tracks: {saved_id}")
-                sp.start_playback(
-                    device_id=device_id, uris=[f"spotify:track:{saved_id}"]
-                )
-                time.sleep(1)
-                current_playback = sp.current_playback()
-                if current_playback and current_playback.get("is_playing"):
-                    logger.info(
-                        f"Successfully started playback from saved tracks on {device_name}"
-                    )
-                    return True, current_playback
-        except Exception as e:
-            logger.warning(f"Error trying to play saved tracks: {str(e)}")
-
         logger.error("All playback recovery strategies failed")
         return False, None
 
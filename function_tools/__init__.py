@@ -1,19 +1,32 @@
-"""Initialize tools package"""
+"""Initialize tools package
 
-from .search_songs import search_songs
-from .play_song import play_song
-from .player_controls import player_controls
-from .get_songs import get_songs
-from .web_search import web_search
-from .list_devices import list_devices
-from core.utils import get_best_device
+Tools are imported on first access (e.g. ``from function_tools import
+search_songs``), so importing the package or its registry stays cheap.
+"""
 
-__all__ = [
-    "search_songs",
-    "play_song",
-    "player_controls",
-    "get_songs",
-    "web_search",
-    "list_devices",
-    "get_best_device",
-]
+import importlib
+
+# Public name -> module it lives in
+_EXPORTS = {
+    "search_songs": ".search_songs",
+    "play_song": ".play_song",
+    "player_controls": ".player_controls",
+    "get_songs": ".get_songs",
+    "web_search": ".web_search",
+    "list_devices": ".list_devices",
+    "get_best_device": "core.utils",
+    "TOOLS": ".registry",
+    "ToolRegistry": ".registry",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
@@ -1,11 +1,19 @@
-from typing import Dict, List, Any
-from core.auth import get_token
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+from core.client import get_spotify_client
+from core.library import LibraryStore
 import spotipy
 from core.logger import log_execution, SpotifyLogger
+from core.rate_limit import Priority, request_priority
+from core.tracing import bind_context
 import requests
 
 logger = SpotifyLogger.get_logger()
 
+# Concurrent page requests for full library pulls (<= the client's pool size)
+PAGE_FETCH_WORKERS = 8
+
 
 class SongCache:
     _instance = None
@@ -41,26 +49,84 @@ class SongCache:
         cls._cache["liked"] = {"songs": None, "total": 0, "last_offset": 0}
 
 
+def _extract_song(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the essential fields from a saved-track item"""
+    return {
+        "name": item["track"]["name"],
+        "artist": item["track"]["artists"][0]["name"],
+        "album": item["track"]["album"]["name"],
+        "id": item["track"]["id"],
+        "added_at": item["added_at"],
+    }
+
+
+def _fetch_pages_parallel(
+    sp: spotipy.Spotify, start: int, end: int, max_workers: int
+) -> List[Dict[str, Any]]:
+    """
+    Fetch the saved-track pages covering [start, end) concurrently
+
+    Args:
+        sp: Spotify client
+        start: Offset of the first track to fetch
+        end: Offset just past the last track to fetch
+        max_workers: Maximum number of concurrent page requests
+
+    Returns:
+        List of song dictionaries in library order
+    """
+
+    def fetch_page(page_offset):
+        results = sp.current_user_saved_tracks(
+            limit=min(50, end - page_offset), offset=page_offset, market="US"
+        )
+        return [_extract_song(item) for item in results["items"]]
+
+    page_offsets = range(start, end, 50)
+    logger.debug(f"Fetching {len(page_offsets)} pages with {max_workers} workers")
+
+    # Pages are collected in submission order, so the library order is kept
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(bind_context(fetch_page), page_offset)
+            for page_offset in page_offsets
+        ]
+        return [song for future in futures for song in future.result()]
+
+
 @log_execution
+@request_priority(Priority.BULK)
 def _fetch_songs(
-    sp: spotipy.Spotify, limit: int = 50, offset: int = 0
+    sp: spotipy.Spotify,
+    limit: Optional[int] = 50,
+    offset: int = 0,
+    parallel: bool = False,
+    max_workers: int = PAGE_FETCH_WORKERS,
 ) -> Dict[str, Any]:
     """
     Fetch user's saved tracks from Spotify with pagination support
 
     Args:
         sp: Spotify client
-        limit: Maximum number of songs to fetch (default: 50)
+        limit: Maximum number of songs to fetch (default: 50, None for all)
         offset: Starting position for fetch (default: 0)
+        parallel: Fetch all pages concurrently once the total is known
+        max_workers: Maximum number of concurrent page requests in parallel mode
 
     Returns:
         Dict containing:
-        - songs: List of song dictionaries
+        - songs: List of song dictionaries (including added_at)
         - total: Total number of available songs
         - offset: Current offset after fetch
+
+    Raises:
+        Any error of a page request, so a failed page never passes for a
+        short library
     """
     try:
         songs = []
+        if limit is None:
+            limit = float("inf")
         batch_size = min(50, limit)  # Use Spotify's max limit of 50
         current_offset = offset
 
@@ -73,9 +139,15 @@ def _fetch_songs(
         else:
             # Use cached total when extending
             cache = SongCache()
-            total_available = cache.get_cached_songs()["total"]
+            total_available = cache.get_cache_info()["total"]
+
+        if parallel:
+            songs = _fetch_pages_parallel(
+                sp, offset, min(total_available, offset + limit), max_workers
+            )
+            current_offset = offset + len(songs)
 
-        while len(songs) < limit:
+        while not parallel and len(songs) < limit:
             logger.debug(f"Fetching tracks batch from offset {current_offset}")
             results = sp.current_user_saved_tracks(
                 limit=batch_size, offset=current_offset, market="US"
@@ -85,15 +157,7 @@ def _fetch_songs(
                 break
 
             # Process tracks - only include essential fields
-            batch_songs = [
-                {
-                    "name": item["track"]["name"],
-                    "artist": item["track"]["artists"][0]["name"],
-                    "album": item["track"]["album"]["name"],
-                    "id": item["track"]["id"],
-                }
-                for item in results["items"]
-            ]
+            batch_songs = [_extract_song(item) for item in results["items"]]
 
             songs.extend(batch_songs)
             current_offset += len(batch_songs)
@@ -110,13 +174,116 @@ def _fetch_songs(
 
     except Exception as e:
         logger.error(f"Error fetching saved tracks: {str(e)}", exc_info=True)
-        return {"songs": [], "total": 0, "offset": offset}
+        raise
+
+
+@log_execution
+def _fetch_songs_since(sp: spotipy.Spotify, since: str) -> Dict[str, Any]:
+    """
+    Fetch saved tracks added at or after a given timestamp.
+
+    Saved tracks come back most recently added first, so paging stops at the
+    first track older than `since`. When nothing new was liked this costs a
+    single request.
+
+    Args:
+        sp: Spotify client
+        since: ISO-8601 added_at timestamp of the newest stored track
+
+    Returns:
+        Dict containing:
+        - songs: List of song dictionaries (including added_at)
+        - total: Total number of available songs
+    """
+    songs = []
+    offset = 0
+    while True:
+        logger.debug(f"Fetching new saved tracks from offset {offset}")
+        results = sp.current_user_saved_tracks(limit=50, offset=offset, market="US")
+        total = results["total"]
+
+        # ISO-8601 UTC timestamps compare correctly as strings
+        batch_songs = [
+            _extract_song(item)
+            for item in results["items"]
+            if item["added_at"] >= since
+        ]
+        songs.extend(batch_songs)
+        offset += len(results["items"])
+
+        # Stop once we reach tracks we already have or run out of pages
+        if len(batch_songs) < len(results["items"]) or offset >= total:
+            break
+
+    return {"songs": songs, "total": total}
+
+
+@log_execution
+@request_priority(Priority.BULK)
+def sync_library(sp: spotipy.Spotify) -> int:
+    """
+    Bring the local library store up to date with the user's liked songs.
+
+    An empty store is filled with a full pull. Otherwise only tracks added
+    since the newest stored one are fetched; if the remote total still
+    differs afterwards (songs were unliked) the store is rebuilt.
+
+    The store is only written, and marked synced, once the whole pull has
+    succeeded; a failed request propagates and leaves it as it was.
+
+    Args:
+        sp: Spotify client
+
+    Returns:
+        int: Number of tracks in the store after syncing
+    """
+    store = LibraryStore()
+    newest = store.newest_added_at()
+
+    if newest is None:
+        logger.info("Library store is empty, fetching all liked songs")
+        store.replace_all(_fetch_songs(sp, limit=None, parallel=True)["songs"])
+    else:
+        result = _fetch_songs_since(sp, newest)
+        store.add_tracks(result["songs"])
+        logger.info(f"Synced {len(result['songs'])} new liked songs")
+
+        if store.count() != result["total"]:
+            logger.info("Library store is out of date, rebuilding it")
+            store.replace_all(_fetch_songs(sp, limit=None, parallel=True)["songs"])
+
+    store.mark_synced()
+    return store.count()
+
+
+def ensure_library_synced() -> None:
+    """
+    Sync the library store the first time it is used in a process
+
+    If Spotify can't be reached the songs stored by a previous session are
+    used; the error is only raised when there are none.
+    """
+    store = LibraryStore()
+    if store.synced_at is not None:
+        return
+    try:
+        sync_library(get_spotify_client())
+    except (
+        requests.exceptions.RequestException,
+        spotipy.exceptions.SpotifyException,
+    ) as e:
+        if not store.count():
+            raise
+        logger.warning(f"Library sync failed, using stored songs: {str(e)}")
 
 
 @log_execution
 def get_songs(limit: int = 50, extend: bool = False) -> Dict[str, Any]:
     """
-    Get liked songs from Spotify with pagination support.
+    Get liked songs with pagination support.
+
+    Songs are served from the local library store, which is synced with
+    Spotify incrementally the first time it is used in a process.
 
     Args:
         limit (int): Number of songs to fetch (max 50 per request)
@@ -142,23 +309,10 @@ def get_songs(limit: int = 50, extend: bool = False) -> Dict[str, Any]:
     )
 
     try:
-        # Get token and create Spotify client
-        token_info = get_token()
-        sp = spotipy.Spotify(auth=token_info["access_token"])
-
-        # Use spotipy client to get tracks
-        data = sp.current_user_saved_tracks(
-            limit=limit, offset=offset, market="US"
-        )  # Extract song information
-        new_songs = [
-            {
-                "name": item["track"]["name"],
-                "artist": item["track"]["artists"][0]["name"],
-                "album": item["track"]["album"]["name"],
-                "id": item["track"]["id"],
-            }
-            for item in data["items"]
-        ]
+        ensure_library_synced()
+        store = LibraryStore()
+        new_songs = store.get_tracks(limit=limit, offset=offset)
+        total = store.count()
 
         # Extend existing songs or create new list
         if extend and cache_info["songs"] is not None:
@@ -167,14 +321,18 @@ def get_songs(limit: int = 50, extend: bool = False) -> Dict[str, Any]:
             combined_songs = new_songs
 
         # Update cache with new data
-        cache.set_cached_songs(combined_songs, data["total"], offset + len(new_songs))
+        cache.set_cached_songs(combined_songs, total, offset + len(new_songs))
 
         return {
             "songs": combined_songs,
-            "total": data["total"],
-            "has_more": (offset + len(new_songs)) < data["total"],
+            "total": total,
+            "has_more": (offset + len(new_songs)) < total,
         }
 
-    except requests.exceptions.RequestException as e:
+    except (
+        requests.exceptions.RequestException,
+        spotipy.exceptions.SpotifyException,
+        sqlite3.Error,
+    ) as e:
         logger.error(f"Error fetching liked songs: {str(e)}")
         return {"songs": [], "total": 0, "has_more": False, "error": str(e)}
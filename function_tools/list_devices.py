@@ -1,11 +1,14 @@
-from core.auth import get_token
+from core.client import get_spotify_client
 import spotipy
 from core.logger import log_execution, SpotifyLogger
+from core.rate_limit import Priority, request_priority
+from core.state_cache import get_state_cache
 
 logger = SpotifyLogger.get_logger()
 
 
 @log_execution
+@request_priority(Priority.INTERACTIVE)
 def list_devices():
     """
     List all available Spotify devices with their details.
@@ -14,18 +17,13 @@ def list_devices():
         dict: Dictionary containing success status, message, and list of devices
     """
     try:
-        # Get authentication token
-        logger.debug("Getting authentication token")
-        token_info = get_token()
-
-        # Create a Spotify client
-        sp = spotipy.Spotify(auth=token_info["access_token"])
+        # Get the shared Spotify client
+        logger.debug("Getting shared Spotify client")
+        sp = get_spotify_client()
 
         # Get available devices
         logger.debug("Fetching available devices")
-        devices = sp.devices()
-
-        available_devices = devices.get("devices", [])
+        available_devices = get_state_cache().get_devices(sp)
 
         if not available_devices:
             logger.info("No active Spotify devices found")
@@ -1,8 +1,9 @@
 import webbrowser
-from core.auth import get_token
+from core.client import get_spotify_client
 import spotipy
 from core.logger import log_execution, SpotifyLogger
-from core.utils import get_best_device
+from core.rate_limit import Priority, request_priority
+from core.utils import get_best_device, start_playback
 
 logger = SpotifyLogger.get_logger()
 
@@ -39,6 +40,7 @@ def get_track_info(sp, track_id=None):
 
 
 @log_execution
+@request_priority(Priority.INTERACTIVE)
 def play_song(track_id):
     """
     Play a specific song on an available Spotify device or open in browser as fallback
@@ -50,12 +52,9 @@ def play_song(track_id):
         dict: Dictionary containing success status and message
     """
     try:
-        # Get authentication token
-        logger.debug("Getting authentication token")
-        token_info = get_token()
-
-        # Create a Spotify client
-        sp = spotipy.Spotify(auth=token_info["access_token"])
+        # Get the shared Spotify client
+        logger.debug("Getting shared Spotify client")
+        sp = get_spotify_client()
 
         # Get track information
         logger.debug(f"Getting track information for ID: {track_id}")
@@ -85,7 +84,9 @@ def play_song(track_id):
         # Start playback on the device
         logger.debug(f"Starting playback of '{track_info['name']}' on {device_name}")
         try:
-            sp.start_playback(device_id=device_id, uris=[f"spotify:track:{track_id}"])
+            start_playback(
+                sp, device_id, device_name, uris=[f"spotify:track:{track_id}"]
+            )
             logger.info(f"Successfully playing '{track_info['name']}' on {device_name}")
             return {
                 "success": True,
@@ -1,13 +1,16 @@
-from core.auth import get_token
+from core.client import get_spotify_client
 import spotipy
-import time
 from core.logger import log_execution, SpotifyLogger
-from core.utils import get_best_device, ensure_playback
+from core.playback_tracker import get_playback_tracker
+from core.rate_limit import Priority, request_priority
+from core.state_cache import get_state_cache
+from core.utils import get_best_device, ensure_playback, start_playback
 
 logger = SpotifyLogger.get_logger()
 
 
 @log_execution
+@request_priority(Priority.INTERACTIVE)
 def player_controls(action):
     """
     Control Spotify playback (pause, resume, next, previous, shuffle, repeat)
@@ -19,19 +22,21 @@ def player_controls(action):
         dict: Dictionary containing success status and message
     """
     try:
-        # Get authentication token
-        logger.debug("Getting authentication token")
-        token_info = get_token()
-
-        # Create a Spotify client
-        sp = spotipy.Spotify(auth=token_info["access_token"])
-
-        # Get current playback state to check if there's an active device
-        logger.debug("Checking current playback state")
-        current_playback = sp.current_playback()
-
-        # Select the best device for operations if needed
-        device_id, device_name = get_best_device(sp)
+        # Get the shared Spotify client
+        logger.debug("Getting shared Spotify client")
+        sp = get_spotify_client()
+
+        # Playback state and devices are shared with the other tools for a
+        # short TTL, so a command usually costs a single API request
+        state = get_state_cache()
+        snapshot = get_playback_tracker().snapshot()
+        if snapshot is not None:
+            # The background tracker already knows the state; no read needed
+            logger.debug("Using playback snapshot from the tracker")
+            current_playback = snapshot.playback
+        else:
+            logger.debug("Checking current playback state")
+            current_playback = state.get_playback(sp)
 
         # If no active playback and the action is not resume, try to revive the playback
         if (
@@ -49,23 +54,23 @@ def player_controls(action):
                     "message": "No active playback could be restored. Please start playing something first.",
                 }
 
-        # Get the best available device for playback operations
-        device_id = None
-        if action == "resume":
-            # Only get a specific device for resume action (others work on current device)
-            device_id, device_name = get_best_device(sp)
-            if device_id:
-                logger.debug(f"Using device {device_name} for playback")
+        # Skip/previous/pause act on the device that is currently playing
+        device_name = ((current_playback or {}).get("device") or {}).get("name")
 
         # Handle the requested action
         logger.debug(f"Executing playback action: {action}")
         if action == "pause":
             sp.pause_playback()
+            state.invalidate()
             logger.info("Playback paused")
             return {"success": True, "message": "Playback paused"}
 
         elif action == "resume":
-            sp.start_playback(device_id=device_id if device_id else None)
+            # Only resume needs to pick a device (others work on the current one)
+            device_id, device_name = get_best_device(sp)
+            if device_id:
+                logger.debug(f"Using device {device_name} for playback")
+            start_playback(sp, device_id, device_name)
             logger.info(f"Playback resumed{f' on {device_name}' if device_id else ''}")
             return {
                 "success": True,
@@ -73,27 +78,8 @@ def player_controls(action):
             }
 
         elif action == "next":
-            # Ensure the device is active before trying to skip
-            if not current_playback or device_id != current_playback.get(
-                "device", {}
-            ).get("id"):
-                logger.debug(f"Activating device {device_name} before skipping")
-                try:
-                    # Restart playback on the desired device to make it active
-                    # We transfer to the device but don't change what's playing
-                    if current_playback:
-                        track_id = current_playback.get("item", {}).get("id")
-                        if track_id:
-                            sp.start_playback(
-                                device_id=device_id, uris=[f"spotify:track:{track_id}"]
-                            )
-                            # Brief pause to let API register
-                            time.sleep(0.5)
-                except Exception as e:
-                    logger.warning(f"Couldn't activate device before skip: {str(e)}")
-
-            # Now skip to next track
             sp.next_track()
+            state.invalidate()
             logger.info(f"Skipped to next track on {device_name}")
             return {
                 "success": True,
@@ -101,26 +87,8 @@ def player_controls(action):
             }
 
         elif action == "previous":
-            # Similar device activation logic for previous
-            if not current_playback or device_id != current_playback.get(
-                "device", {}
-            ).get("id"):
-                logger.debug(
-                    f"Activating device {device_name} before going to previous track"
-                )
-                try:
-                    if current_playback:
-                        current_uri = current_playback.get("item", {}).get("uri")
-                        if current_uri:
-                            sp.start_playback(device_id=device_id, uris=[current_uri])
-                            # Brief pause to let API register
-                            time.sleep(0.5)
-                except Exception as e:
-                    logger.warning(
-                        f"Couldn't activate device before previous: {str(e)}"
-                    )
-
             sp.previous_track()
+            state.invalidate()
             logger.info(f"Returned to previous track on {device_name}")
             return {
                 "success": True,
@@ -131,6 +99,7 @@ def player_controls(action):
             # Toggle shuffle state
             current_state = current_playback.get("shuffle_state", False)
             sp.shuffle(not current_state)
+            state.invalidate()
             new_state = "on" if not current_state else "off"
             logger.info(f"Shuffle turned {new_state}")
             return {"success": True, "message": f"Shuffle turned {new_state}"}
@@ -145,6 +114,7 @@ def player_controls(action):
             }.get(current_state, "off")
 
             sp.repeat(next_state)
+            state.invalidate()
             state_desc = {
                 "context": "playlist/album repeat",
                 "track": "track repeat",
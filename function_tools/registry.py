@@ -0,0 +1,83 @@
+"""Registry of the tools the assistant can call"""
+
+import importlib
+from typing import Callable, Dict, List, Optional, Union
+
+
+class ToolRegistry:
+    """
+    Maps tool names from the function schemas to their implementations.
+
+    Tools can be registered as "module:function" paths, which are imported
+    on first use, so startup doesn't pay for tools (and their dependencies)
+    a session never calls.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, Union[Callable, str]] = {}
+        self._progress: Dict[str, Optional[str]] = {}
+
+    def register(
+        self,
+        name: str,
+        function: Union[Callable, str],
+        progress: Optional[str] = None,
+    ) -> None:
+        """
+        Register a tool
+
+        Args:
+            name: Tool name as used in the function schemas
+            function: Implementation called with the model's arguments, or
+                its "module:function" path to import on first use
+            progress: Line printed to the user when the tool starts
+        """
+        self._tools[name] = function
+        self._progress[name] = progress
+
+    def get(self, name: str) -> Optional[Callable]:
+        """Get a tool implementation, importing it on first use; None if unknown"""
+        function = self._tools.get(name)
+        if isinstance(function, str):
+            module_name, _, attribute = function.partition(":")
+            function = getattr(importlib.import_module(module_name), attribute)
+            self._tools[name] = function
+        return function
+
+    def progress(self, name: str) -> Optional[str]:
+        """Get the progress line for a tool"""
+        return self._progress.get(name)
+
+    def names(self) -> List[str]:
+        """Get the names of all registered tools"""
+        return list(self._tools)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+
+TOOLS = ToolRegistry()
+TOOLS.register(
+    "search_songs",
+    "function_tools.search_songs:search_songs",
+    "🔍 Searching for songs...",
+)
+TOOLS.register(
+    "get_songs",
+    "function_tools.get_songs:get_songs",
+    "🎵 Fetching your music collection...",
+)
+TOOLS.register("play_song", "function_tools.play_song:play_song", "▶️ Playing music...")
+TOOLS.register(
+    "player_controls",
+    "function_tools.player_controls:player_controls",
+    "⏯️ Controlling playback...",
+)
+TOOLS.register(
+    "web_search", "function_tools.web_search:web_search", "🌍 Searching the web..."
+)
+TOOLS.register(
+    "list_devices",
+    "function_tools.list_devices:list_devices",
+    "📱 Checking your devices...",
+)
@@ -1,12 +1,45 @@
-from core.auth import get_token
-import spotipy
+import copy
+import os
+from core.cache import TTLCache, normalize_query
+from core.client import get_spotify_client
 from core.logger import log_execution, SpotifyLogger
+from core.metrics import get_metrics
+from core.search_index import get_library_index
+from function_tools.get_songs import ensure_library_synced
 
 logger = SpotifyLogger.get_logger()
 
+# Remote search results keyed by (normalized query, limit)
+search_cache = TTLCache(
+    maxsize=int(os.getenv("SEARCH_CACHE_SIZE", 256)),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", 600)),
+)
+
+
+def _search_library(query, limit):
+    """
+    Search the user's liked songs in the local index
+
+    The library store is synced first, like get_songs does, so the index
+    isn't built over an empty or stale store.
+
+    Args:
+        query (str): Search query for songs
+        limit (int): Maximum number of results to return
+
+    Returns:
+        list: Matching tracks (id, name, artist, album), best match first
+    """
+    try:
+        ensure_library_synced()
+        return [track for _, track in get_library_index().search(query, limit)]
+    except Exception as e:
+        logger.warning(f'Library search failed for query "{query}": {str(e)}')
+        return []
+
 
 @log_execution
-def search_songs(query, limit=10):
+def search_songs(query, limit=10, library_first=False):
     """
     Search for songs on Spotify and return essential track information.
     Results are sorted by popularity and relevance.
@@ -14,6 +47,8 @@ def search_songs(query, limit=10):
     Args:
         query (str): Search query for songs
         limit (int): Maximum number of results to return (default: 10)
+        library_first (bool): Answer from the user's liked songs when they match,
+                              only searching Spotify on a miss (default: False)
 
     Returns:
         dict: Dictionary containing success status, message, and list of tracks
@@ -21,13 +56,38 @@ def search_songs(query, limit=10):
     """
     # Cap limit at 50 (Spotify API maximum)
     limit = min(int(limit), 50)
-    try:
-        # Get authentication token
-        logger.debug("Getting authentication token")
-        token_info = get_token()
 
-        # Create a Spotify client
-        sp = spotipy.Spotify(auth=token_info["access_token"])
+    if library_first:
+        tracks = _search_library(query, limit)
+        if tracks:
+            logger.info(f'Found {len(tracks)} library tracks matching "{query}"')
+            return {
+                "success": True,
+                "message": f"Found {len(tracks)} tracks in your library matching '{query}'",
+                "tracks": tracks,
+            }
+        logger.debug(f'No library match for "{query}", searching Spotify')
+
+    cache_key = (normalize_query(query), limit)
+    tracks = search_cache.get(cache_key)
+    get_metrics().increment(
+        "cache_requests_total",
+        cache="search_songs",
+        result="miss" if tracks is None else "hit",
+    )
+    if tracks is not None:
+        logger.debug(f'Search cache hit for "{query}"')
+        return {
+            "success": True,
+            "message": f"Found {len(tracks)} tracks matching '{query}'",
+            # Callers may edit the result; the cached tracks must not change
+            "tracks": copy.deepcopy(list(tracks)),
+        }
+
+    try:
+        # Get the shared Spotify client
+        logger.debug("Getting shared Spotify client")
+        sp = get_spotify_client()
 
         # Search for tracks
         logger.debug(f'Searching for tracks with query: "{query}", limit: {limit}')
@@ -77,6 +137,7 @@ def search_songs(query, limit=10):
 
         # Sort tracks by popularity (highest first)
         tracks.sort(key=lambda x: (-x["popularity"], x["name"]))
+        search_cache.set(cache_key, tuple(copy.deepcopy(tracks)))
 
         logger.info(f'Found {len(tracks)} tracks matching "{query}"')
         return {
@@ -1,22 +1,68 @@
 """Web search functionality using SerpAPI."""
 
 import os
+import re
+import threading
 from typing import Dict, Any, List
-from serpapi import GoogleSearch
-from dotenv import load_dotenv
+from core.cache import PersistentCache, normalize_query
 from core.logger import log_execution, SpotifyLogger
+from core.metrics import get_metrics
+from core.tracing import get_tracer
 
 logger = SpotifyLogger.get_logger()
-load_dotenv()
+
+WEB_CACHE_PATH = ".web_search_cache.db"
+
+# How long results stay fresh, by query class (seconds)
+WEB_CACHE_TTLS = {
+    "news": 60 * 60,  # Latest news and releases change hourly
+    "event": 6 * 60 * 60,  # Festival lineups, tours and tickets
+    "general": 7 * 24 * 60 * 60,  # Artist bios and other stable facts
+}
+
+_QUERY_CLASS_PATTERNS = [
+    ("news", re.compile(r"\b(news|latest|today|tonight|this week|new release)\b")),
+    (
+        "event",
+        re.compile(r"\b(festival|concert|tour|lineup|line-up|tickets|gig|setlist)s?\b"),
+    ),
+]
+
+_web_cache = None
+_web_cache_lock = threading.Lock()
+
+
+def _get_web_cache() -> PersistentCache:
+    """Open the web search cache on first use"""
+    global _web_cache
+    if _web_cache is None:
+        # Concurrent web_search calls must share one connection
+        with _web_cache_lock:
+            if _web_cache is None:
+                _web_cache = PersistentCache(WEB_CACHE_PATH)
+    return _web_cache
+
+
+def classify_query(query: str) -> str:
+    """Classify a query to pick its cache TTL"""
+    lowered = query.lower()
+    for query_class, pattern in _QUERY_CLASS_PATTERNS:
+        if pattern.search(lowered):
+            return query_class
+    return "general"
 
 
 @log_execution
-def web_search(query: str) -> Dict[str, Any]:
+def web_search(query: str, num: int = 5) -> Dict[str, Any]:
     """
     Search the web using SerpAPI.
 
+    Successful responses are cached on disk, keyed by the normalized query
+    and num, for a TTL that depends on the query class.
+
     Args:
         query (str): The search query
+        num (int): Number of results to request (default: 5)
 
     Returns:
         dict: Dictionary containing search results and status
@@ -24,6 +70,20 @@ def web_search(query: str) -> Dict[str, Any]:
     logger = SpotifyLogger.get_logger()
     logger.debug(f"Entering web_search with query={query}")
 
+    cache_key = f"{normalize_query(query)}|{num}"
+    try:
+        cached = _get_web_cache().get(cache_key)
+        get_metrics().increment(
+            "cache_requests_total",
+            cache="web_search",
+            result="miss" if cached is None else "hit",
+        )
+        if cached is not None:
+            logger.info(f'Web search cache hit for query: "{query}"')
+            return cached
+    except Exception as e:
+        logger.warning(f"Web search cache unavailable: {str(e)}")
+
     try:
         # Get API key from environment variables
         logger.debug("Getting API key from environment variables")
@@ -36,15 +96,21 @@ def web_search(query: str) -> Dict[str, Any]:
                 "results": [],
             }
 
+        # Imported here so sessions without a web search never load serpapi
+        from serpapi import GoogleSearch
+
         # Initialize search
         logger.debug(f'Performing web search for query: "{query}"')
-        search = GoogleSearch(
-            {"q": query, "api_key": api_key, "num": 5}  # Limit to top 5 results
-        )
+        search = GoogleSearch({"q": query, "api_key": api_key, "num": num})
+        if os.getenv("SERPAPI_BASE_URL"):
+            search.BACKEND = os.getenv("SERPAPI_BASE_URL")
 
         # Get results
         logger.debug("Fetching search results")
-        results = search.get_dict()
+        with get_tracer().span("serpapi search"), get_metrics().timer(
+            "serpapi_request_seconds", error_counter="serpapi_request_errors_total"
+        ):
+            results = search.get_dict()
 
         # Extract organic results
         organic_results = results.get("organic_results", [])
@@ -69,12 +135,22 @@ def web_search(query: str) -> Dict[str, Any]:
         logger.info(
             f'Successfully found {len(formatted_results)} results for query: "{query}"'
         )
-        return {
+        response = {
             "success": True,
             "message": "Search completed successfully",
             "results": formatted_results,
         }
 
+        query_class = classify_query(query)
+        try:
+            _get_web_cache().set(
+                cache_key, response, WEB_CACHE_TTLS[query_class], query_class
+            )
+        except Exception as e:
+            logger.warning(f"Couldn't cache web search results: {str(e)}")
+
+        return response
+
     except Exception as e:
         logger.error(
             f'Error performing web search for query "{query}": {str(e)}', exc_info=True
@@ -35,6 +35,11 @@ TOOL_SCHEMAS = [
                         "minimum": 1,
                         "maximum": 50,
                     },
+                    "library_first": {
+                        "type": "boolean",
+                        "description": "Look in the user's liked songs first and only search Spotify if nothing matches. Use when the user refers to songs they have liked or saved.",
+                        "default": False,
+                    },
                 },
                 "required": ["query"],
             },
@@ -69,7 +74,7 @@ TOOL_SCHEMAS = [
                 "properties": {
                     "track_id": {
                         "type": "string",
-                        "description": "The Spotify track ID (not URI). For example: '4cOdK2wGLETKBW3PvgPWqT'",
+                        "description": "The track id exactly as shown in search or liked-songs results (a short handle such as 't3', or a Spotify track ID like '4cOdK2wGLETKBW3PvgPWqT')",
                     }
                 },
                 "required": ["track_id"],
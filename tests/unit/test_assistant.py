@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+from types import SimpleNamespace as NS
+import pytest
+import assistant
+from core.logger import SpotifyLogger
+from function_tools.registry import ToolRegistry
+
+logger = SpotifyLogger.get_logger()
+
+
+def _tool_call(id, name, **arguments):
+    return NS(
+        id=id, type="function", function=NS(name=name, arguments=json.dumps(arguments))
+    )
+
+
+def _message(content=None, tool_calls=None):
+    return NS(content=content, tool_calls=tool_calls)
+
+
+class FakeOpenAI:
+    """Chat client answering with scripted messages (the last one repeats)"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.chat = NS(completions=NS(create=self.create))
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        return NS(choices=[NS(message=reply)])
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    registry = ToolRegistry()
+    monkeypatch.setattr(assistant, "TOOLS", registry)
+    return registry
+
+
+def _use_client(monkeypatch, replies):
+    client = FakeOpenAI(replies)
+    monkeypatch.setattr(assistant, "_openai_client", client)
+    return client
+
+
+def test_turn_chains_tools_across_steps(tools, monkeypatch):
+    """Each step's tool results go back to the model until it answers"""
+    tools.register("web_search", lambda query: {"success": True, "message": "Blur"})
+    tools.register("search_songs", lambda query: {"success": True, "songs": []})
+    client = _use_client(
+        monkeypatch,
+        [
+            _message(tool_calls=[_tool_call("c1", "web_search", query="headliners")]),
+            _message(tool_calls=[_tool_call("c2", "search_songs", query="Blur")]),
+            _message("Found some Blur songs."),
+        ],
+    )
+    messages = []
+
+    final, function_name, result = assistant.run_turn(
+        messages, "who headlines?", fast_path=False
+    )
+
+    assert final == "Found some Blur songs."
+    assert function_name == "search_songs" and result["success"]
+    assert len(client.requests) == 3
+    assert [m.get("tool_call_id") for m in messages if m["role"] == "tool"] == [
+        "c1",
+        "c2",
+    ]
+
+
+def test_turn_stops_calling_tools_at_the_step_cap(tools, monkeypatch):
+    """After max_steps the model must answer without tools"""
+    calls = []
+    tools.register("get_songs", lambda: calls.append(1) or {"success": True})
+    loop = _message(tool_calls=[_tool_call("c", "get_songs")])
+    client = _use_client(monkeypatch, [loop, loop, _message("Here you go.")])
+
+    final, _, _ = assistant.run_turn([], "my songs", max_steps=2, fast_path=False)
+
+    assert final == "Here you go."
+    assert len(calls) == 2
+    assert len(client.requests) == 3
+    assert "tools" in client.requests[1] and "tools" not in client.requests[2]
+
+
+def test_turn_deadline_cuts_off_slow_tools(tools, monkeypatch):
+    """A tool still running at the deadline is reported as timed out"""
+    release = threading.Event()
+    tools.register("play_song", lambda: release.wait(5) and {"success": True})
+    client = _use_client(
+        monkeypatch, [_message(tool_calls=[_tool_call("c", "play_song")])]
+    )
+    messages = []
+
+    start = time.monotonic()
+    try:
+        final, function_name, result = assistant.run_turn(
+            messages, "play", timeout=0.2, fast_path=False
+        )
+    finally:
+        release.set()
+
+    assert time.monotonic() - start < 1
+    assert function_name == "play_song" and result["success"] is False
+    assert "timed out" in final
+    # The deadline has passed, so no completion follows the tool results
+    assert len(client.requests) == 1
+    assert "timed out" in messages[-2]["content"]
+
+
+def test_fallback_answer_is_printed_after_streamed_text(monkeypatch, capsys):
+    """A final message that wasn't streamed is still shown to the user"""
+    # The first turn's answer is streamed; the second runs out of time after
+    # streaming text that came with its tool calls
+    replies = iter([("Jazz is on.", "Jazz is on."), ("Let me check.", "Out of time.")])
+
+    def fake_turn(messages, user_input, on_text=None, **kwargs):
+        streamed, final = next(replies)
+        on_text(streamed, True)
+        return final, None, None
+
+    inputs = iter(["what's on?", "again", "exit"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(inputs))
+    monkeypatch.setattr(assistant, "run_turn", fake_turn)
+    monkeypatch.setenv("SERPAPI_KEY", "key")
+
+    assistant.handle_conversation()
+
+    output = capsys.readouterr().out
+    assert output.count("Jazz is on.") == 1
+    assert output.count("Let me check.") == 1
+    assert "🎵 Assistant: Out of time." in output
+
+
+def test_tool_calls_run_concurrently_in_call_order(tools):
+    """All calls of one response run at once; results keep the call order"""
+    barrier = threading.Barrier(3, timeout=2)
+
+    def lookup(label, delay):
+        barrier.wait()  # Raises BrokenBarrierError unless all 3 run together
+        time.sleep(delay)
+        return {"success": True, "message": label}
+
+    tools.register("lookup", lookup)
+    calls = [
+        _tool_call(f"c{i}", "lookup", label=f"r{i}", delay=delay)
+        for i, delay in enumerate([0.05, 0, 0.02])
+    ]
+
+    results = assistant.execute_tool_calls(calls)
+
+    assert [r["message"] for r in results] == ["r0", "r1", "r2"]
+
+
+def test_failing_tool_call_doesnt_affect_the_others(tools):
+    """Errors and unknown tools become error results for their own call only"""
+
+    def broken():
+        raise RuntimeError("boom")
+
+    tools.register("ok", lambda: {"success": True, "message": "fine"})
+    tools.register("broken", broken)
+    calls = [
+        _tool_call("c0", "broken"),
+        _tool_call("c1", "ok"),
+        _tool_call("c2", "missing"),
+    ]
+
+    results = assistant.execute_tool_calls(calls)
+
+    assert [r["success"] for r in results] == [False, True, False]
+    assert "boom" in results[0]["message"]
+    assert results[2]["message"] == "Unknown tool: missing"
+
+
+def test_every_tool_call_gets_a_reply_message(tools):
+    """The history gets one tool message per call id, in call order"""
+    tools.register("ok", lambda: {"success": True, "message": "fine"})
+    calls = [_tool_call("c0", "ok"), _tool_call("c1", "missing")]
+    messages = []
+
+    assistant.run_tool_calls(messages, _message(tool_calls=calls))
+
+    assert messages[0]["role"] == "assistant"
+    assert [m["id"] for m in messages[0]["tool_calls"]] == ["c0", "c1"]
+    assert [m["tool_call_id"] for m in messages[1:]] == ["c0", "c1"]
@@ -0,0 +1,121 @@
+import json
+import os
+import time
+import pytest
+import core.auth
+from core.auth import AtomicCacheFileHandler, TokenManager
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+
+def _token(access_token, expires_in):
+    return {
+        "access_token": access_token,
+        "refresh_token": "refresh",
+        "expires_at": int(time.time() + expires_in),
+    }
+
+
+class FakeOAuth:
+    """Issues fresh tokens, failing the first `failures` refreshes"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.refreshes = 0
+
+    def refresh_access_token(self, refresh_token):
+        self.refreshes += 1
+        if self.refreshes <= self.failures:
+            raise ConnectionError("Spotify accounts service is down")
+        return _token(f"token{self.refreshes}", 3600)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """A TokenManager in place of the singleton, with its timer stopped after"""
+    monkeypatch.setattr(TokenManager, "_instance", None)
+    manager = TokenManager()
+    yield manager
+    manager.stop()
+
+
+def _wait_for_token(manager, access_token, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if manager.get_token()["access_token"] == access_token:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_token_is_refreshed_before_it_expires(manager):
+    """The timer refreshes refresh_margin seconds before expires_at"""
+    manager._sp_oauth = FakeOAuth()
+    # Still valid for get_token, but already inside the refresh margin
+    manager.set_token(_token("token0", manager.refresh_margin - 1))
+
+    assert _wait_for_token(manager, "token1")
+    assert manager._sp_oauth.refreshes == 1
+
+
+def test_failed_background_refresh_is_retried(manager):
+    """The old token stays in use until a retry succeeds"""
+    manager._sp_oauth = FakeOAuth(failures=1)
+    manager.retry_delay = 0.05
+    manager.set_token(_token("token0", manager.refresh_margin - 1))
+
+    assert manager.get_token()["access_token"] == "token0"
+    assert _wait_for_token(manager, "token2")
+
+
+def test_set_token_is_refreshed_without_the_oauth_flow(manager, monkeypatch):
+    """A token installed with set_token gets its OAuth helper on refresh"""
+    oauth = FakeOAuth()
+    monkeypatch.setattr(core.auth, "create_spotify_oauth", lambda: oauth)
+    manager.set_token(_token("token0", manager.refresh_margin - 1))
+
+    assert _wait_for_token(manager, "token1")
+
+    # Without a refresh token there is nothing to schedule
+    token = _token("static", 3600)
+    del token["refresh_token"]
+    manager.set_token(token)
+    assert manager._timer is None
+
+
+def test_failed_foreground_refresh_raises(manager):
+    """An expired token is never handed out when it can't be refreshed"""
+    manager._sp_oauth = FakeOAuth(failures=1)
+    manager._token_info = _token("expired", -10)
+
+    with pytest.raises(ConnectionError):
+        manager.get_token()
+    assert manager.get_token()["access_token"] == "token2"
+
+
+def test_cache_file_is_replaced_atomically(tmp_path, monkeypatch):
+    """The file is only rewritten when the token changes, never left partial"""
+    cache_path = str(tmp_path / "token_cache")
+    handler = AtomicCacheFileHandler(cache_path)
+    handler.save_token_to_cache(_token("a", 3600))
+    assert AtomicCacheFileHandler(cache_path).get_cached_token()["access_token"] == "a"
+
+    writes = []
+    real_replace = os.replace
+    monkeypatch.setattr(
+        os, "replace", lambda src, dst: writes.append(dst) or real_replace(src, dst)
+    )
+    handler.save_token_to_cache(handler.get_cached_token())
+    assert writes == []
+
+    # A write that fails half way leaves the previous file and no temp files
+    def broken_dump(obj, f):
+        f.write('{"access_token": ')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(json, "dump", broken_dump)
+    handler.save_token_to_cache(_token("b", 3600))
+    with open(cache_path) as f:
+        assert json.load(f)["access_token"] == "a"
+    assert os.listdir(tmp_path) == ["token_cache"]
@@ -0,0 +1,152 @@
+import threading
+import time
+import function_tools.search_songs
+import function_tools.web_search as web_search
+from core.cache import PersistentCache, TTLCache, normalize_query
+from core.logger import SpotifyLogger
+from function_tools.search_songs import search_songs
+
+logger = SpotifyLogger.get_logger()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_query():
+    """Case, punctuation, spacing and word order don't change the key"""
+    assert normalize_query("Bohemian  Rhapsody, Queen") == normalize_query(
+        "queen bohemian rhapsody"
+    )
+    assert normalize_query("Queen") != normalize_query("Queen Bohemian")
+
+
+def test_ttl_expiry():
+    """Entries expire after the TTL and count as misses"""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    clock.now = 5.1
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted first"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_persistent_cache(tmp_path):
+    """Entries survive reopening the database and expire per entry"""
+    clock = FakeClock()
+    db_path = str(tmp_path / "cache.db")
+    cache = PersistentCache(db_path, clock=clock)
+    cache.set("festival", {"results": [1]}, ttl=10, query_class="event")
+    cache.set("artist", {"results": [2]}, ttl=100, query_class="general")
+
+    reopened = PersistentCache(db_path, clock=clock)
+    assert reopened.get("festival") == {"results": [1]}
+    assert [e["key"] for e in reopened.entries_by_age()] == ["festival", "artist"]
+
+    clock.now = 50
+    assert reopened.get("festival") is None
+    assert reopened.get("artist") == {"results": [2]}
+    assert reopened.purge_expired() == 1
+
+
+def test_persistent_cache_purges_expired_entries(tmp_path):
+    """Expired entries are dropped on open and every purge_every writes"""
+    clock = FakeClock()
+    db_path = str(tmp_path / "cache.db")
+    cache = PersistentCache(db_path, clock=clock, purge_every=4)
+    cache.set("old", 1, ttl=10)
+    clock.now = 20
+
+    assert PersistentCache(db_path, clock=clock).entries_by_age() == []
+
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=100)
+    clock.now = 40
+    cache.set("c", 3, ttl=100)  # Fourth write: "a" has expired and is purged
+    assert [e["key"] for e in cache.entries_by_age()] == ["b", "c"]
+
+
+class SearchSpotify:
+    """Answers every track search with one result"""
+
+    def __init__(self):
+        self.searches = 0
+
+    def search(self, q, type, limit):
+        self.searches += 1
+        artist = {"name": "Queen", "genres": ["rock"]}
+        track = {
+            "id": "1",
+            "name": "Bohemian Rhapsody",
+            "artists": [artist],
+            "album": {"name": "A Night at the Opera"},
+            "popularity": 90,
+        }
+        return {"tracks": {"items": [track]}}
+
+
+def test_search_results_are_copied_out_of_the_cache(monkeypatch):
+    """Editing a returned result doesn't change what later hits return"""
+    sp = SearchSpotify()
+    monkeypatch.setattr(function_tools.search_songs, "get_spotify_client", lambda: sp)
+    monkeypatch.setattr(
+        function_tools.search_songs, "search_cache", TTLCache(maxsize=10, ttl=60)
+    )
+
+    first = search_songs("bohemian rhapsody")
+    first["tracks"][0]["name"] = "edited"
+    second = search_songs("bohemian rhapsody")
+    second["tracks"][0]["genres"].append("edited")
+    third = search_songs("bohemian rhapsody")
+
+    assert sp.searches == 1
+    assert third["tracks"][0]["name"] == "Bohemian Rhapsody"
+    assert third["tracks"][0]["genres"] == ["rock"]
+
+
+def test_web_cache_is_opened_once(tmp_path, monkeypatch):
+    """Concurrent first web searches share one PersistentCache"""
+    opened = []
+    barrier = threading.Barrier(4, timeout=2)
+
+    class SlowCache(PersistentCache):
+        def __init__(self, db_path):
+            opened.append(db_path)
+            time.sleep(0.05)  # Widen the window between check and assignment
+            super().__init__(db_path)
+
+    monkeypatch.setattr(web_search, "_web_cache", None)
+    monkeypatch.setattr(web_search, "PersistentCache", SlowCache)
+    monkeypatch.setattr(web_search, "WEB_CACHE_PATH", str(tmp_path / "web.db"))
+    caches = []
+
+    def open_cache():
+        barrier.wait()
+        caches.append(web_search._get_web_cache())
+
+    threads = [threading.Thread(target=open_cache) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(opened) == 1
+    assert all(cache is caches[0] for cache in caches)
@@ -0,0 +1,44 @@
+import pytest
+import core.client
+from core.client import InstrumentedSpotify, SpotifyClientProvider
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """A SpotifyClientProvider in place of the singleton, with a settable token"""
+    token = {"access_token": "token1"}
+    monkeypatch.setattr(core.client, "get_token", lambda: dict(token))
+    monkeypatch.setattr(SpotifyClientProvider, "_instance", None)
+    provider = SpotifyClientProvider()
+    provider.token = token
+    yield provider
+    provider.reset()
+
+
+def test_client_and_session_are_shared(provider):
+    """Every caller gets the same client; a new token only swaps its header"""
+    sp = core.client.get_spotify_client()
+    assert isinstance(sp, InstrumentedSpotify)
+    assert SpotifyClientProvider().get_client() is sp
+    assert sp._session is provider._session
+
+    provider.token["access_token"] = "token2"
+    assert core.client.get_spotify_client() is sp
+    assert sp._auth == "token2"
+
+
+def test_session_pool_and_retry_policy(provider):
+    """One pool of pool_size connections; urllib3 leaves 429s to the scheduler"""
+    session = provider.get_client()._session
+    adapter = session.get_adapter("https://api.spotify.com/v1/me")
+
+    assert session.get_adapter("http://127.0.0.1/v1/") is adapter
+    assert adapter._pool_maxsize == SpotifyClientProvider.pool_size
+    retry = adapter.max_retries
+    assert 429 not in retry.status_forcelist
+    assert 500 in retry.status_forcelist
+    assert retry.respect_retry_after_header is False
+    assert retry.is_retry("GET", 429, has_retry_after=True) is False
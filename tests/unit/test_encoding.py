@@ -0,0 +1,65 @@
+import json
+from core.encoding import TrackHandles, compact_result, encode_tool_result
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+
+def _songs(count):
+    return [
+        {
+            "name": f"Song {i}",
+            "artist": "Artist",
+            "album": "Album",
+            "id": f"4cOdK2wGLETKBW3Pvg{i:04d}",
+        }
+        for i in range(count)
+    ]
+
+
+def test_track_lists_become_tables_with_handles():
+    """Keys are sent once and track IDs become short handles"""
+    handles = TrackHandles()
+    result = {"songs": _songs(3), "total": 3, "has_more": False}
+    compacted = compact_result(result, handles)
+
+    assert compacted["songs"]["columns"] == ["name", "artist", "album", "id"]
+    assert [row[3] for row in compacted["songs"]["rows"]] == ["t1", "t2", "t3"]
+    assert handles.resolve("t2") == "4cOdK2wGLETKBW3Pvg0001"
+    assert handles.resolve("4cOdK2wGLETKBW3PvgPWqT") == "4cOdK2wGLETKBW3PvgPWqT"
+
+
+def test_empty_columns_and_device_ids_are_kept_raw():
+    """All-empty columns are dropped and only track IDs get handles"""
+    handles = TrackHandles()
+    tracks = [
+        {"id": "a", "name": "x", "genres": []},
+        {"id": "b", "name": "y", "genres": []},
+    ]
+    devices = [{"id": "dev1", "name": "Laptop"}, {"id": "dev2", "name": "Phone"}]
+    compacted = compact_result({"tracks": tracks, "devices": devices}, handles)
+
+    assert compacted["tracks"] == {
+        "columns": ["id", "name"],
+        "rows": [["t1", "x"], ["t2", "y"]],
+    }
+    assert compacted["devices"]["rows"] == [["dev1", "Laptop"], ["dev2", "Phone"]]
+
+
+def test_encoding_is_much_smaller():
+    """A 50-track page shrinks substantially compared to plain JSON"""
+    result = {"songs": _songs(50), "total": 50, "has_more": False}
+    assert len(encode_tool_result(result, TrackHandles())) < 0.6 * len(
+        json.dumps(result)
+    )
+
+
+def test_handles_are_bounded():
+    """The least recently used handles are forgotten past max_size"""
+    handles = TrackHandles(max_size=2)
+    handles.handle_for("a")
+    handles.handle_for("b")
+    handles.handle_for("a")
+    handles.handle_for("c")
+    assert handles.resolve("t2") == "t2"
+    assert handles.resolve("t1") == "a"
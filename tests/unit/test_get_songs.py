@@ -0,0 +1,58 @@
+import random
+import threading
+import time
+import pytest
+from core.logger import SpotifyLogger
+from function_tools.get_songs import _fetch_songs
+
+logger = SpotifyLogger.get_logger()
+
+
+def _saved_track(index):
+    return {
+        "added_at": f"2024-01-01T00:00:{index:02d}Z",
+        "track": {
+            "id": f"id{index}",
+            "name": f"Song {index}",
+            "artists": [{"name": "Artist"}],
+            "album": {"name": "Album"},
+        },
+    }
+
+
+class FakeSpotify:
+    """Saved tracks endpoint whose pages finish in random order"""
+
+    def __init__(self, size, fail_offset=None):
+        self.items = [_saved_track(i) for i in range(size)]
+        self.fail_offset = fail_offset
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def current_user_saved_tracks(self, limit=20, offset=0, market=None):
+        with self._lock:
+            self.requests.append((offset, limit))
+        if limit > 1:
+            time.sleep(random.uniform(0, 0.02))
+        if offset == self.fail_offset:
+            raise ConnectionError("page failed")
+        return {"items": self.items[offset : offset + limit], "total": len(self.items)}
+
+
+def test_parallel_pages_keep_library_order():
+    """Pages cover the library exactly once and are joined in offset order"""
+    sp = FakeSpotify(size=120)
+    result = _fetch_songs(sp, limit=None, parallel=True, max_workers=4)
+
+    assert [song["id"] for song in result["songs"]] == [f"id{i}" for i in range(120)]
+    assert result["total"] == 120 and result["offset"] == 120
+    # One count request, then pages at offsets 0, 50 and 100
+    assert sorted(sp.requests[1:]) == [(0, 50), (50, 50), (100, 20)]
+
+
+def test_failed_page_fails_the_fetch():
+    """A page error propagates instead of returning a short library"""
+    sp = FakeSpotify(size=120, fail_offset=50)
+
+    with pytest.raises(ConnectionError):
+        _fetch_songs(sp, limit=None, parallel=True, max_workers=4)
@@ -0,0 +1,63 @@
+import json
+from core.history import ConversationHistory, SUMMARY_PREFIX
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+
+def _turn(i, payload_size=0):
+    """Build a user turn with one search_songs tool call"""
+    result = {
+        "success": True,
+        "message": f"Found tracks {i}",
+        "tracks": ["x"] * payload_size,
+    }
+    return [
+        {"role": "user", "content": f"request {i}"},
+        {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [
+                {
+                    "id": f"call{i}",
+                    "type": "function",
+                    "function": {"name": "search_songs", "arguments": "{}"},
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": f"call{i}", "content": json.dumps(result)},
+        {"role": "assistant", "content": f"answer {i}"},
+    ]
+
+
+def test_old_tool_results_are_stubbed():
+    """Tool payloads outside the recent turns become one-line stubs"""
+    messages = [{"role": "system", "content": "prompt"}]
+    for i in range(3):
+        messages += _turn(i, payload_size=100)
+    ConversationHistory(token_budget=100000, keep_turns=1).compact(messages)
+
+    tool_contents = [m["content"] for m in messages if m["role"] == "tool"]
+    assert tool_contents[0] == "[search_songs result omitted: Found tracks 0]"
+    assert tool_contents[1] == "[search_songs result omitted: Found tracks 1]"
+    assert json.loads(tool_contents[2])["tracks"] == ["x"] * 100
+
+
+def test_old_turns_are_summarized_over_budget():
+    """Over budget, the oldest turns fold into a summary after the system prompt"""
+    messages = [{"role": "system", "content": "prompt"}]
+    for i in range(10):
+        messages += _turn(i)
+    ConversationHistory(token_budget=300, keep_turns=2).compact(messages)
+
+    assert messages[0] == {"role": "system", "content": "prompt"}
+    assert messages[1]["content"].startswith(SUMMARY_PREFIX)
+    assert "request 0" in messages[1]["content"]
+    assert "answer 0" in messages[1]["content"]
+    assert [m["content"] for m in messages if m["role"] == "user"][-2:] == [
+        "request 8",
+        "request 9",
+    ]
+    # Every remaining tool result still follows its tool call
+    call_ids = {tc["id"] for m in messages for tc in m.get("tool_calls") or []}
+    assert all(m["tool_call_id"] in call_ids for m in messages if m["role"] == "tool")
@@ -0,0 +1,47 @@
+from core.intents import match_control_intent
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+
+def test_simple_commands_match():
+    """Short, unambiguous control commands map to player_controls actions"""
+    cases = {
+        "pause": "pause",
+        "Pause the music please": "pause",
+        "stop": "pause",
+        "skip": "next",
+        "Skip this song!": "next",
+        "next track": "next",
+        "can you play the next song": "next",
+        "resume": "resume",
+        "play": "resume",
+        "play the music": "resume",
+        "resume it": "resume",
+        "keep playing": "resume",
+        "go back": "previous",
+        "previous song": "previous",
+        "shuffle": "shuffle",
+        "toggle repeat": "repeat",
+    }
+    for text, action in cases.items():
+        assert match_control_intent(text) == action, text
+
+
+def test_ambiguous_requests_fall_through():
+    """Anything that needs the model returns None"""
+    for text in [
+        "play bohemian rhapsody",
+        "turn shuffle off",
+        "what song is this",
+        "skip to the chorus of this song please",
+        "repeat the last thing you said",
+        "play that one",
+        "play this one",
+        "play that song",
+        "play the last one",
+        "play the last song",
+        "play it again",
+        "",
+    ]:
+        assert match_control_intent(text) is None, text
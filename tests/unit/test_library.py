@@ -0,0 +1,132 @@
+import pytest
+import core.search_index
+import function_tools.get_songs
+from core.library import LibraryStore
+from core.logger import SpotifyLogger
+from function_tools.get_songs import sync_library
+from function_tools.search_songs import search_songs
+
+logger = SpotifyLogger.get_logger()
+
+
+def _track(index):
+    return {
+        "id": f"id{index}",
+        "name": f"Song {index}",
+        "artist": "Artist",
+        "album": "Album",
+        "added_at": f"2024-01-01T00:{index // 60:02d}:{index % 60:02d}Z",
+    }
+
+
+def _saved(track):
+    return {
+        "added_at": track["added_at"],
+        "track": {
+            "id": track["id"],
+            "name": track["name"],
+            "artists": [{"name": track["artist"]}],
+            "album": {"name": track["album"]},
+        },
+    }
+
+
+class FakeSpotify:
+    """Saved tracks endpoint, most recently added first like Spotify's"""
+
+    def __init__(self, tracks, fail=False):
+        self.items = [_saved(t) for t in sorted(tracks, key=lambda t: t["added_at"])]
+        self.items.reverse()
+        self.fail = fail
+        self.requests = []
+
+    def current_user_saved_tracks(self, limit=20, offset=0, market=None):
+        self.requests.append((offset, limit))
+        if self.fail:
+            raise ConnectionError("Spotify is down")
+        return {"items": self.items[offset : offset + limit], "total": len(self.items)}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A LibraryStore on a temporary database in place of the singleton"""
+    monkeypatch.setattr(LibraryStore, "_instance", None)
+    store = LibraryStore(str(tmp_path / "library.db"))
+    yield store
+    store._conn.close()
+
+
+def test_store_orders_and_replaces_tracks(store):
+    """Tracks come back newest first; writes bump the version"""
+    assert store.count() == 0 and store.newest_added_at() is None
+
+    store.add_tracks([_track(1), _track(3), _track(2)])
+    assert [t["id"] for t in store.get_tracks()] == ["id3", "id2", "id1"]
+    assert [t["id"] for t in store.get_tracks(limit=1, offset=1)] == ["id2"]
+    assert store.newest_added_at() == _track(3)["added_at"]
+
+    version = store.version
+    store.replace_all([_track(5)])
+    assert store.count() == 1 and store.version > version
+
+    store.mark_synced()
+    store.clear()
+    assert store.count() == 0 and store.synced_at is None
+
+
+def test_store_persists_across_processes(store, tmp_path, monkeypatch):
+    store.add_tracks([_track(1), _track(2)])
+
+    monkeypatch.setattr(LibraryStore, "_instance", None)
+    reopened = LibraryStore(str(tmp_path / "library.db"))
+    assert reopened is not store
+    assert reopened.count() == 2
+    reopened._conn.close()
+
+
+def test_empty_store_gets_a_full_pull(store):
+    sp = FakeSpotify([_track(i) for i in range(120)])
+
+    assert sync_library(sp) == 120
+    assert store.synced_at is not None
+    assert store.get_tracks(limit=1)[0]["id"] == "id119"
+
+
+def test_incremental_sync_fetches_only_new_tracks(store):
+    """Only the first page is read when a few songs were liked since"""
+    store.add_tracks([_track(i) for i in range(100)])
+    sp = FakeSpotify([_track(i) for i in range(103)])
+
+    assert sync_library(sp) == 103
+    assert sp.requests == [(0, 50)]
+    assert [t["id"] for t in store.get_tracks(limit=3)] == ["id102", "id101", "id100"]
+
+
+def test_unliked_songs_trigger_a_rebuild(store):
+    store.add_tracks([_track(i) for i in range(10)])
+    sp = FakeSpotify([_track(i) for i in range(10) if i != 4])
+
+    assert sync_library(sp) == 9
+    assert "id4" not in {t["id"] for t in store.get_tracks()}
+
+
+def test_failed_full_pull_leaves_the_store_unsynced(store):
+    """A failing pull raises rather than storing an empty library"""
+    with pytest.raises(ConnectionError):
+        sync_library(FakeSpotify([_track(1)], fail=True))
+
+    assert store.count() == 0
+    assert store.synced_at is None
+
+
+def test_library_search_syncs_the_store_first(store, monkeypatch):
+    """library_first searches a freshly synced store, not an empty one"""
+    sp = FakeSpotify([_track(i) for i in range(3)])
+    monkeypatch.setattr(function_tools.get_songs, "get_spotify_client", lambda: sp)
+    monkeypatch.setattr(core.search_index, "_index", None)
+
+    result = search_songs("song 2", library_first=True)
+
+    assert "in your library" in result["message"]
+    assert [t["id"] for t in result["tracks"]] == ["id2"]
+    assert store.synced_at is not None
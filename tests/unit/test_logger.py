@@ -0,0 +1,60 @@
+import logging
+import pytest
+from core.logger import PayloadLimitFilter, SpotifyLogger, log_execution
+
+logger = SpotifyLogger.get_logger()
+
+
+def test_log_execution_forms_and_sampling(caplog):
+    """Both decorator forms log timings; sampled-out calls stay silent"""
+
+    @log_execution
+    def bare(x):
+        return x * 2
+
+    @log_execution(sample_rate=0)
+    def never_sampled(x):
+        return x * 3
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        assert bare(2) == 4
+        assert never_sampled(2) == 6
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(m.startswith("Success: bare completed in") for m in messages)
+    assert not any("never_sampled" in m for m in messages)
+    assert bare.__name__ == "bare"
+
+
+def test_log_execution_always_logs_failures(caplog):
+    """Errors are logged even when the call isn't sampled or INFO is off"""
+
+    @log_execution(sample_rate=0)
+    def broken():
+        raise ValueError("boom")
+
+    with caplog.at_level(logging.ERROR, logger=logger.name):
+        with pytest.raises(ValueError):
+            broken()
+
+    assert any(
+        record.getMessage().startswith("Failed: broken error after")
+        and record.getMessage().endswith("boom")
+        for record in caplog.records
+    )
+
+
+def test_payload_limit_filter_truncates_long_messages():
+    """Long messages are cut to the limit, short ones are left alone"""
+    payload_filter = PayloadLimitFilter(max_chars=10)
+    short = logging.LogRecord("t", logging.INFO, "", 0, "ok %s", ("fine",), None)
+    long = logging.LogRecord("t", logging.INFO, "", 0, "result %s", ("x" * 50,), None)
+
+    assert payload_filter.filter(short) and short.getMessage() == "ok fine"
+    assert payload_filter.filter(long)
+    assert long.getMessage() == "result xxx... [truncated 47 chars]"
+
+    sampled_out = PayloadLimitFilter(max_chars=10, sample_rate=0)
+    assert not sampled_out.filter(
+        logging.LogRecord("t", logging.INFO, "", 0, "x" * 20, None, None)
+    )
@@ -0,0 +1,54 @@
+import pytest
+from core.logger import SpotifyLogger
+from core.metrics import MetricsRegistry, spotify_endpoint
+
+logger = SpotifyLogger.get_logger()
+
+
+def test_histogram_percentiles_and_counters():
+    """Percentiles come from the recorded latencies; counters add up"""
+    metrics = MetricsRegistry()
+    for ms in range(1, 101):
+        metrics.observe("tool_duration_seconds", ms / 1000, tool="search_songs")
+    metrics.increment("cache_requests_total", cache="search_songs", result="hit")
+    metrics.increment("cache_requests_total", cache="search_songs", result="hit")
+
+    snapshot = metrics.snapshot()
+    (histogram,) = snapshot["histograms"]["tool_duration_seconds"]
+    assert histogram["labels"] == {"tool": "search_songs"}
+    assert histogram["count"] == 100
+    assert (histogram["p50"], histogram["p95"], histogram["p99"]) == (
+        0.05,
+        0.095,
+        0.099,
+    )
+    (counter,) = snapshot["counters"]["cache_requests_total"]
+    assert counter["value"] == 2
+
+    text = metrics.render_prometheus()
+    assert "# TYPE tool_duration_seconds summary" in text
+    assert 'tool_duration_seconds{tool="search_songs",quantile="0.99"} 0.099' in text
+    assert 'tool_duration_seconds_count{tool="search_songs"} 100' in text
+    assert 'cache_requests_total{cache="search_songs",result="hit"} 2' in text
+
+
+def test_timer_counts_errors():
+    """A failing block is timed and counted as an error"""
+    metrics = MetricsRegistry()
+    with pytest.raises(RuntimeError):
+        with metrics.timer("spotify_request_seconds", "spotify_errors", endpoint="x"):
+            raise RuntimeError("503")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["histograms"]["spotify_request_seconds"][0]["count"] == 1
+    assert snapshot["counters"]["spotify_errors"][0]["value"] == 1
+
+
+def test_spotify_endpoint_labels():
+    """IDs and query strings are stripped from endpoint labels"""
+    assert spotify_endpoint("tracks/4cOdK2wGLETKBW3PvgPWqT") == "tracks/{id}"
+    assert (
+        spotify_endpoint("https://api.spotify.com/v1/me/tracks?limit=50&offset=100")
+        == "me/tracks"
+    )
+    assert spotify_endpoint("me/player/play") == "me/player/play"
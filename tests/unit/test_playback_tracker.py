@@ -0,0 +1,71 @@
+from core.logger import SpotifyLogger
+from core.playback_tracker import PlaybackTracker
+from core.state_cache import get_state_cache
+
+logger = SpotifyLogger.get_logger()
+
+
+class FakeSpotify:
+    def __init__(self):
+        self.calls = 0
+        self.playback = {
+            "is_playing": True,
+            "shuffle_state": False,
+            "repeat_state": "context",
+            "progress_ms": 200_000,
+            "device": {"id": "desktop", "name": "Desktop"},
+            "item": {"id": "track1", "duration_ms": 201_000},
+        }
+
+    def current_playback(self):
+        self.calls += 1
+        return self.playback
+
+
+def test_snapshot_freshness_and_commands():
+    """Snapshots are served until too old or outdated by a command"""
+    now = [100.0]
+    sp = FakeSpotify()
+    tracker = PlaybackTracker(lambda: sp, clock=lambda: now[0])
+    try:
+        assert tracker.snapshot() is None
+
+        snapshot = tracker.poll()
+        assert snapshot.is_playing and snapshot.repeat_state == "context"
+        assert snapshot.device_name == "Desktop" and snapshot.track_id == "track1"
+        assert tracker.snapshot(max_age=1) is snapshot
+
+        now[0] += 2
+        assert tracker.snapshot(max_age=1) is None
+        assert tracker.snapshot(max_age=5) is snapshot
+
+        # A command outdates the snapshot until the next poll
+        tracker.notify_command()
+        assert tracker.snapshot(max_age=5) is None
+        now[0] += 0.5
+        assert tracker.poll() is tracker.snapshot(max_age=5)
+        assert sp.calls == 2
+    finally:
+        get_state_cache().clear()
+
+
+def test_poll_interval_adapts():
+    """Fast after commands, slow when idle, early near the end of a track"""
+    now = [0.0]
+    sp = FakeSpotify()
+    tracker = PlaybackTracker(
+        lambda: sp, fast_interval=0.5, slow_interval=3.0, clock=lambda: now[0]
+    )
+    try:
+        idle = tracker.poll()._replace(is_playing=False)
+        assert tracker.next_interval(idle) == 3.0
+
+        # 1s left in the track: poll just after it ends
+        assert abs(tracker.next_interval(tracker.poll()) - 1.2) < 1e-9
+
+        tracker.notify_command()
+        assert tracker.next_interval(idle) == 0.5
+        now[0] += tracker.fast_period + 1
+        assert tracker.next_interval(idle) == 3.0
+    finally:
+        get_state_cache().clear()
@@ -0,0 +1,48 @@
+from core.logger import SpotifyLogger
+from core.polling import wait_for
+
+logger = SpotifyLogger.get_logger()
+
+
+class FakeClock:
+    """Clock whose sleep advances time instantly"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_returns_as_soon_as_condition_holds():
+    """Backoff starts small and doubles, so a quick change is seen quickly"""
+    clock = FakeClock()
+    checks = iter([None, None, {"is_playing": True}])
+    result = wait_for(lambda: next(checks), clock=clock, sleep=clock.sleep)
+
+    assert result == {"is_playing": True}
+    assert clock.sleeps == [0.03, 0.06, 0.12]
+    assert abs(clock.now - 0.21) < 1e-9
+
+
+def test_gives_up_at_the_deadline():
+    """The delay is capped and the last check lands exactly on the deadline"""
+    clock = FakeClock()
+    calls = []
+    result = wait_for(
+        lambda: calls.append(clock.now),
+        timeout=2.0,
+        max_delay=0.5,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    assert result is None
+    assert max(clock.sleeps) == 0.5
+    assert abs(clock.now - 2.0) < 1e-9
+    assert abs(calls[-1] - 2.0) < 1e-9
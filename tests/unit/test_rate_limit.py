@@ -0,0 +1,187 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from spotipy.exceptions import SpotifyException
+from core.client import InstrumentedSpotify, SpotifyClientProvider
+from core.logger import SpotifyLogger
+from core.rate_limit import (
+    Priority,
+    RateLimitExceeded,
+    RequestScheduler,
+    current_priority,
+    parse_retry_after,
+    request_priority,
+)
+
+logger = SpotifyLogger.get_logger()
+
+
+def test_bucket_allows_a_burst_then_paces():
+    """The first burst goes straight through, later requests wait for tokens"""
+    scheduler = RequestScheduler(rate=50, burst=2)
+
+    assert scheduler.acquire() < 0.005
+    assert scheduler.acquire() < 0.005
+    waited = scheduler.acquire()
+    assert 0.01 < waited < 0.2
+
+
+def test_interactive_requests_go_ahead_of_bulk():
+    """A waiting interactive request is served before bulk ones queued earlier"""
+    scheduler = RequestScheduler(rate=10, burst=1, bulk_rate=10, bulk_burst=1)
+    scheduler.acquire()  # Empty both buckets
+    scheduler.acquire(Priority.BULK)
+    order = []
+
+    def request(priority):
+        scheduler.acquire(priority)
+        order.append(priority)
+
+    bulk = [threading.Thread(target=request, args=(Priority.BULK,)) for _ in range(2)]
+    for thread in bulk:
+        thread.start()
+    while scheduler.waiting() < 2:
+        time.sleep(0.001)
+    interactive = threading.Thread(target=request, args=(Priority.INTERACTIVE,))
+    interactive.start()
+    for thread in bulk + [interactive]:
+        thread.join()
+
+    assert order == [Priority.INTERACTIVE, Priority.BULK, Priority.BULK]
+
+
+def test_bulk_requests_have_their_own_budget():
+    """A library sync neither uses up nor waits for interactive tokens"""
+    scheduler = RequestScheduler(rate=1, burst=1, bulk_rate=20, bulk_burst=3)
+
+    assert scheduler.acquire(Priority.INTERACTIVE) < 0.005
+    # The shared bucket is empty, bulk requests still run at their burst
+    for _ in range(3):
+        assert scheduler.acquire(Priority.BULK) < 0.005
+    # Then at the bulk rate, not the shared one
+    assert 0.02 < scheduler.acquire(Priority.BULK) < 0.2
+
+    scheduler = RequestScheduler(rate=20, burst=1, bulk_rate=1, bulk_burst=1)
+    scheduler.acquire(Priority.BULK)
+    assert scheduler.acquire(Priority.INTERACTIVE) < 0.005
+
+
+def test_retry_after_pauses_everyone():
+    """After a 429 no request is sent before Retry-After has passed"""
+    scheduler = RequestScheduler(rate=100, burst=10)
+    scheduler.on_rate_limited(0.1)
+
+    assert scheduler.acquire(Priority.INTERACTIVE) >= 0.09
+
+
+def test_long_retry_after_fails_fast():
+    """A pause longer than max_wait raises instead of hanging the turn"""
+    scheduler = RequestScheduler(max_wait=1)
+    scheduler.on_rate_limited(60)
+
+    with pytest.raises(RateLimitExceeded) as error:
+        scheduler.acquire()
+    assert error.value.retry_after > 59
+    assert scheduler.waiting() == 0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after(None) == 1.0
+    assert parse_retry_after("soon", default=2.0) == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+def test_request_priority_context_and_decorator():
+    """The class applies inside the block or function and is restored after"""
+
+    @request_priority(Priority.BULK)
+    def bulk_job():
+        return current_priority()
+
+    assert current_priority() == Priority.DEFAULT
+    with request_priority(Priority.INTERACTIVE):
+        assert current_priority() == Priority.INTERACTIVE
+        assert bulk_job() == Priority.BULK
+        assert current_priority() == Priority.INTERACTIVE
+    assert current_priority() == Priority.DEFAULT
+
+
+class FakeSession(requests.Session):
+    """requests session answering with prepared status codes"""
+
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = self.statuses.pop(0)
+        response.url = url
+        response.headers["Retry-After"] = "0"
+        response._content = b'{"ok": true}'
+        return response
+
+
+def test_client_retries_after_429():
+    """A 429 is waited out and retried rather than failing the tool call"""
+    session = FakeSession([429, 429, 200])
+    sp = InstrumentedSpotify(auth="token", requests_session=session)
+
+    assert sp._get("me/player") == {"ok": True}
+    assert session.calls == 3
+
+
+def test_client_gives_up_after_max_retries():
+    session = FakeSession([429] * 10)
+    sp = InstrumentedSpotify(auth="token", requests_session=session)
+
+    with pytest.raises(SpotifyException) as error:
+        sp._get("me/player")
+    assert error.value.http_status == 429
+    assert session.calls == 4
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Answers every request with 429 and a zero Retry-After"""
+
+    requests_seen = 0
+
+    def do_GET(self):
+        type(self).requests_seen += 1
+        body = b'{"error": {"status": 429, "message": "API rate limit exceeded"}}'
+        self.send_response(429)
+        self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_429_retries_go_only_through_the_scheduler():
+    """With the pooled session urllib3 doesn't retry 429s behind the scheduler"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        sp = InstrumentedSpotify(
+            auth="token",
+            requests_session=SpotifyClientProvider()._build_session(),
+        )
+        sp.prefix = f"http://127.0.0.1:{server.server_address[1]}/v1/"
+
+        with pytest.raises(SpotifyException) as error:
+            sp._get("me/player")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert error.value.http_status == 429
+    # One request per scheduler attempt: the first plus max_retries
+    assert ThrottlingHandler.requests_seen == 4
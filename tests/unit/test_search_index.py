@@ -0,0 +1,54 @@
+from core.search_index import LibraryIndex, tokenize
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+TRACKS = [
+    {
+        "id": "1",
+        "name": "Bohemian Rhapsody",
+        "artist": "Queen",
+        "album": "A Night at the Opera",
+    },
+    {"id": "2", "name": "Don't Stop Me Now", "artist": "Queen", "album": "Jazz"},
+    {
+        "id": "3",
+        "name": "Never Gonna Give You Up",
+        "artist": "Rick Astley",
+        "album": "Whenever You Need Somebody",
+    },
+    {"id": "4", "name": "Thriller", "artist": "Michael Jackson", "album": "Thriller"},
+    {"id": "5", "name": "Beyoncé Medley", "artist": "Various", "album": "Live"},
+]
+
+
+def _ids(results):
+    return [track["id"] for _, track in results]
+
+
+def test_tokenize():
+    """Tokens are lowercased, accent-free and split on punctuation"""
+    assert tokenize("Beyoncé - Don't Stop!") == ["beyonce", "don", "t", "stop"]
+
+
+def test_exact_match_ranks_first():
+    """Name and artist matches outrank album-only matches"""
+    index = LibraryIndex(TRACKS)
+    assert _ids(index.search("bohemian rhapsody queen"))[0] == "1"
+    assert _ids(index.search("thriller"))[0] == "4"
+
+
+def test_prefix_and_fuzzy_match():
+    """Partial words and typos still find the track"""
+    index = LibraryIndex(TRACKS)
+    assert _ids(index.search("bohem rhaps")) == ["1"]
+    assert _ids(index.search("gonn*")) == ["3"]
+    assert _ids(index.search("bohemain rapsody")) == ["1"]
+    assert _ids(index.search("beyonce")) == ["5"]
+
+
+def test_miss_returns_nothing():
+    """Every query word must match, so unrelated queries miss"""
+    index = LibraryIndex(TRACKS)
+    assert index.search("queen thriller xyzzy") == []
+    assert LibraryIndex([]).search("queen") == []
@@ -0,0 +1,63 @@
+import subprocess
+import sys
+from core.logger import SpotifyLogger
+from core.startup_profile import format_report, package_totals, parse_importtime
+from function_tools.registry import ToolRegistry
+
+logger = SpotifyLogger.get_logger()
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     openai._types
+import time:       300 |        420 |   openai
+import time:        80 |         80 |   core.logger
+import time:       100 |        600 | assistant
+Traceback lines and other noise are ignored
+"""
+
+
+def test_parse_importtime():
+    """Timings, nesting depth and module names are read; other lines skipped"""
+    timings = parse_importtime(SAMPLE)
+
+    assert [t.module for t in timings] == [
+        "openai._types",
+        "openai",
+        "core.logger",
+        "assistant",
+    ]
+    assert [t.depth for t in timings] == [2, 1, 1, 0]
+    assert timings[1].self_us == 300 and timings[1].cumulative_us == 420
+
+
+def test_package_totals_and_report():
+    """Self times add up per top-level package, slowest first"""
+    timings = parse_importtime(SAMPLE)
+
+    assert package_totals(timings) == {"openai": 420, "assistant": 100, "core": 80}
+    report = format_report(timings, wall_seconds=0.05, target="assistant")
+    assert "import assistant:           0.6 ms (4 modules imported)" in report
+
+
+def test_registry_imports_tools_on_first_use():
+    """A tool registered by path is imported only when it is looked up"""
+    registry = ToolRegistry()
+    registry.register("join", "os.path:join", "Joining...")
+
+    assert "join" in registry
+    assert registry.progress("join") == "Joining..."
+    assert registry.get("join")("a", "b").endswith("b")
+    assert registry.get("missing") is None
+
+
+def test_assistant_import_skips_heavy_dependencies():
+    """Importing the assistant loads no tool, SDK or web search dependency"""
+    heavy = ["openai", "spotipy", "serpapi", "colorlog", "function_tools.web_search"]
+    code = (
+        "import sys, assistant; "
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    child = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert child.stdout.strip() == ""
@@ -0,0 +1,142 @@
+import threading
+import time
+from core.logger import SpotifyLogger
+from core.state_cache import get_state_cache
+from core.utils import ensure_playback, get_best_device
+
+logger = SpotifyLogger.get_logger()
+
+
+class FakeSpotify:
+    """Counts device and playback lookups"""
+
+    def __init__(self):
+        self.calls = {"devices": 0, "current_playback": 0}
+        self.device_list = [
+            {"id": "web", "name": "Web Player (Chrome)", "type": "Computer"},
+            {"id": "phone", "name": "Phone", "type": "Smartphone"},
+            {"id": "desktop", "name": "Desktop", "type": "Computer"},
+        ]
+
+    def devices(self):
+        self.calls["devices"] += 1
+        return {"devices": self.device_list}
+
+    def current_playback(self):
+        self.calls["current_playback"] += 1
+        return {"is_playing": True, "device": {"id": "desktop", "name": "Desktop"}}
+
+
+def test_state_is_fetched_once_per_ttl():
+    """Repeated lookups within the TTL share one API request"""
+    now = [0.0]
+    state = get_state_cache()
+    state.clear()
+    state._clock = lambda: now[0]
+    sp = FakeSpotify()
+    try:
+        for _ in range(3):
+            state.get_playback(sp)
+            get_best_device(sp)
+        assert sp.calls == {"devices": 1, "current_playback": 1}
+
+        # A playback command drops the playback state but keeps the devices
+        state.invalidate()
+        state.get_playback(sp)
+        get_best_device(sp)
+        assert sp.calls == {"devices": 1, "current_playback": 2}
+
+        # Entries expire after their TTL
+        now[0] += state.devices_ttl + 1
+        state.get_playback(sp)
+        get_best_device(sp)
+        assert sp.calls == {"devices": 2, "current_playback": 3}
+    finally:
+        state.clear()
+        state._clock = time.monotonic
+
+
+def test_last_device_is_preferred():
+    """The device we last played on wins over the type priority"""
+    state = get_state_cache()
+    state.clear()
+    sp = FakeSpotify()
+    try:
+        assert get_best_device(sp) == ("desktop", "Desktop")
+        state.remember_device("phone", "Phone")
+        assert get_best_device(sp) == ("phone", "Phone")
+
+        # A device that went away is ignored
+        state.remember_device("gone", "Old Speaker")
+        assert get_best_device(sp) == ("desktop", "Desktop")
+    finally:
+        state.clear()
+
+
+class StoppedSpotify(FakeSpotify):
+    """Nothing is playing; every lookup waits for the others to start"""
+
+    def __init__(self):
+        super().__init__()
+        self.barrier = threading.Barrier(4, timeout=2)
+        self.started = []
+
+    def _lookup(self, value):
+        self.barrier.wait()  # Raises BrokenBarrierError unless all 4 run at once
+        return value
+
+    def devices(self):
+        return self._lookup({"devices": self.device_list})
+
+    def current_playback(self):
+        if self.started:
+            return {"is_playing": True, "device": {"id": "desktop", "name": "Desktop"}}
+        return self._lookup(None)
+
+    def current_user_recently_played(self, limit=50):
+        return self._lookup({"items": [{"track": {"id": "recent"}}]})
+
+    def current_user_saved_tracks(self, limit=20):
+        return self._lookup({"items": [{"track": {"id": "saved"}}]})
+
+    def start_playback(self, device_id=None, uris=None):
+        self.started.append((device_id, uris))
+
+
+def test_recovery_lookups_run_concurrently():
+    """ensure_playback issues its lookups together and plays the first viable track"""
+    state = get_state_cache()
+    state.clear()
+    sp = StoppedSpotify()
+    try:
+        restored, playback = ensure_playback(sp)
+        assert restored and playback["is_playing"]
+        assert sp.started == [("desktop", ["spotify:track:recent"])]
+        assert state.last_device == ("desktop", "Desktop")
+    finally:
+        state.clear()
+
+
+class FlakyConfirmSpotify(StoppedSpotify):
+    """The playback check after the first start fails with an API error"""
+
+    def current_playback(self):
+        if len(self.started) == 1:
+            raise ConnectionError("Spotify is down")
+        return super().current_playback()
+
+
+def test_failed_confirmation_moves_on_to_the_next_strategy():
+    """An error while confirming one strategy doesn't skip the others"""
+    state = get_state_cache()
+    state.clear()
+    sp = FlakyConfirmSpotify()
+    try:
+        restored, playback = ensure_playback(sp)
+        assert restored and playback["is_playing"]
+        assert sp.started == [
+            ("desktop", ["spotify:track:recent"]),
+            ("desktop", ["spotify:track:saved"]),
+        ]
+    finally:
+        state.clear()
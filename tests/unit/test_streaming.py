@@ -0,0 +1,49 @@
+from types import SimpleNamespace as NS
+from core.streaming import collect_stream
+from core.logger import SpotifyLogger
+
+logger = SpotifyLogger.get_logger()
+
+
+def _chunk(content=None, tool_calls=None):
+    return NS(choices=[NS(delta=NS(content=content, tool_calls=tool_calls))])
+
+
+def _tool_delta(index, id=None, name=None, arguments=None):
+    return NS(
+        index=index,
+        id=id,
+        type="function" if id else None,
+        function=NS(name=name, arguments=arguments),
+    )
+
+
+def test_text_deltas_are_forwarded():
+    """Text is passed on as it arrives and joined into the message"""
+    seen = []
+    message = collect_stream(
+        [_chunk("Hel"), _chunk("lo"), _chunk()], on_text=seen.append
+    )
+    assert seen == ["Hel", "lo"]
+    assert message.content == "Hello"
+    assert message.tool_calls is None
+
+
+def test_tool_calls_start_when_complete():
+    """Each tool call is handed over as soon as the next one begins"""
+    events = []
+
+    def chunks():
+        yield _chunk(tool_calls=[_tool_delta(0, "c0", "search_songs", '{"que')])
+        yield _chunk(tool_calls=[_tool_delta(0, arguments='ry": "a"}')])
+        yield _chunk(
+            tool_calls=[_tool_delta(1, "c1", "search_songs", '{"query": "b"}')]
+        )
+        events.append("stream still open")
+        yield _chunk()
+
+    message = collect_stream(
+        chunks(), on_tool_call=lambda tc: events.append(tc.function.arguments)
+    )
+    assert events == ['{"query": "a"}', "stream still open", '{"query": "b"}']
+    assert [tc.id for tc in message.tool_calls] == ["c0", "c1"]
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from core.logger import SpotifyLogger
+from core.tracing import Tracer, bind_context, format_waterfall, load_traces
+
+logger = SpotifyLogger.get_logger()
+
+
+def test_spans_nest_across_threads(tmp_path):
+    """Spans started in a pool through bind_context join the submitting trace"""
+    path = str(tmp_path / "traces.jsonl")
+    tracer = Tracer()
+    with tracer.span("ignored") as span:
+        assert span is None  # Disabled tracers record nothing
+
+    tracer.enable(path)
+    try:
+
+        def tool(name):
+            with tracer.span(f"tool {name}"):
+                with tracer.span("spotify GET search"):
+                    pass
+
+        with tracer.span("turn", new_trace=True, user_input="play something"):
+            with tracer.span("openai completion"):
+                pass
+            with ThreadPoolExecutor(2) as executor:
+                futures = [
+                    executor.submit(bind_context(tool), name) for name in ("a", "b")
+                ]
+                [future.result() for future in futures]
+        with tracer.span("turn", new_trace=True):
+            pass
+    finally:
+        tracer.disable()
+
+    traces = load_traces(path)
+    assert len(traces) == 2
+    spans = next(spans for spans in traces.values() if len(spans) > 1)
+    by_name = {span["name"]: span for span in spans}
+    turn = by_name["turn"]
+    assert turn["parent_id"] is None
+    assert by_name["openai completion"]["parent_id"] == turn["span_id"]
+    assert by_name["tool a"]["parent_id"] == turn["span_id"]
+    searches = [span for span in spans if span["name"] == "spotify GET search"]
+    assert {span["parent_id"] for span in searches} == {
+        by_name["tool a"]["span_id"],
+        by_name["tool b"]["span_id"],
+    }
+
+    waterfall = format_waterfall(spans).splitlines()
+    assert waterfall[0].startswith(f"trace {turn['trace_id']}  turn")
+    assert waterfall[1].endswith("turn")
+    assert any(line.endswith("    spotify GET search") for line in waterfall)